@@ -0,0 +1,324 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import Counter
+
+from board import SNAPSHOT_SIZE, Board, move_name
+from pgn import RESULTS, decode_san, encode_san, format_game, iter_games, san_tokens
+
+# ─── 이진 기보 아카이브 ─────────────────────────────────
+# 파일: [파일 헤더] [판 레코드 ...] [색인: 판마다 u64 오프셋] [꼬리: 색인 오프셋, 판 수, 매직]
+# 판 레코드: [판 헤더] [시작 포지션 스냅샷 (표준 시작이 아닐 때만)] [메타 JSON] [수 u16 × 반수]
+# 수 u16: from sq (6비트) | to sq << 6 | 승격 << 12, sq = y*8 + x (Board.grid 좌표)
+# 추가 쓰기: 기존 꼬리 뒤에 새 판을 이어 쓰고 닫을 때 전체 색인·꼬리를 다시 쓴다
+# → 추가 도중 죽어도 예전 꼬리가 그대로 남아 있어 그때까지의 판은 읽힌다
+MAGIC = b'CGA1'
+FILE_HEADER = struct.Struct('<4sI') # 매직, 버전
+FOOTER      = struct.Struct('<QQ4s') # 색인 오프셋, 판 수, 매직
+GAME_HEADER = struct.Struct('<BBHH') # 결과, 플래그, 반수, 메타 길이
+OFFSET      = struct.Struct('<Q')
+VERSION = 1
+
+FLAG_START = 0x01 # 표준 시작 포지션이 아님 → 스냅샷이 따라온다
+
+PROMO_CODES = {'knight': 1, 'bishop': 2, 'rook': 3, 'queen': 4}
+PROMO_TYPES = (None, 'knight', 'bishop', 'rook', 'queen', None, None, None)
+SQUARES = tuple((sq % 8, sq // 8) for sq in range(64))
+
+_LITTLE = sys.byteorder == 'little'
+_standard_start = None
+
+
+def encode_move(move):
+    # (from_pos, to_pos, promotion) → u16
+    (fx, fy), (tx, ty), promo = move
+    return fy*8 + fx | (ty*8 + tx) << 6 | PROMO_CODES.get(promo, 0) << 12
+
+
+def decode_move(code):
+    return (SQUARES[code & 63], SQUARES[code >> 6 & 63], PROMO_TYPES[code >> 12 & 7])
+
+
+def _standard_snapshot():
+    global _standard_start
+    if _standard_start is None:
+        _standard_start = Board(cache_size=16).to_snapshot()
+    return _standard_start
+
+
+def board_game(board):
+    # Board → (시작 포지션 스냅샷, [수]) — 전부 되돌렸다가 다시 두므로 보드는 그대로 돌아온다
+    moves = list(board.move_history)
+    for _ in moves:
+        board.unmake_move()
+    start = board.to_snapshot()
+    for move in moves:
+        board.make_move(*move)
+    return start, moves
+
+
+# ─── 쓰기 ───────────────────────────────────────────
+class ArchiveWriter:
+    # 파일이 있으면 이어 쓰고 없으면 새로 만든다, close() 때 색인을 쓴다
+    def __init__(self, path):
+        self.path = path
+        self.index = array('Q')
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with ArchiveReader(path) as reader:
+                self.index.frombytes(reader.mm[reader.index_offset:reader.index_offset + 8 * len(reader)])
+                if not _LITTLE:
+                    self.index.byteswap()
+                end = reader.footer_offset + FOOTER.size
+            self.file = open(path, 'r+b')
+            # 예전 꼬리 뒤에 끊긴 추가분이 있으면 그 자리부터 덮어쓴다
+            self.file.seek(end)
+        else:
+            self.file = open(path, 'w+b')
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+    def add(self, moves, result='*', headers=None, start=None):
+        # 수 목록 한 판 추가 — start: 시작 포지션 스냅샷 (None 이면 표준 시작)
+        if start is not None and start == _standard_snapshot():
+            start = None
+        meta = json.dumps(headers, ensure_ascii=False, separators=(',', ':')).encode() if headers else b''
+        if len(moves) > 0xFFFF or len(meta) > 0xFFFF:
+            raise ValueError(f'판이 너무 김: {len(moves)} 반수, 메타 {len(meta)} 바이트')
+        codes = array('H', [encode_move(m) for m in moves])
+        if not _LITTLE:
+            codes.byteswap()
+        self.index.append(self.file.tell())
+        self.file.write(GAME_HEADER.pack(RESULTS.index(result), FLAG_START if start else 0, len(moves), len(meta)))
+        if start:
+            self.file.write(start)
+        self.file.write(meta)
+        self.file.write(codes.tobytes())
+        return len(self.index) - 1
+
+    def add_board(self, board, result=None, headers=None):
+        # Board 에 둔 수를 그대로 한 판으로 (result 가 없으면 메이트·스테일메이트로 판정)
+        start, moves = board_game(board)
+        if result is None:
+            status = board.status()
+            if status == 'checkmate':
+                result = '0-1' if board.white_to_move else '1-0'
+            else:
+                result = '1/2-1/2' if status == 'stalemate' else '*'
+        return self.add(moves, result, headers, start)
+
+    def close(self):
+        if self.file.closed:
+            return
+        index_offset = self.file.tell()
+        index = array('Q', self.index)
+        if not _LITTLE:
+            index.byteswap()
+        self.file.write(index.tobytes())
+        self.file.write(FOOTER.pack(index_offset, len(self.index), MAGIC))
+        self.file.truncate()
+        self.file.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ─── 읽기 ───────────────────────────────────────────
+def _valid_footer(mm, pos):
+    # pos 의 꼬리가 진짜인지: 매직이 맞고 색인이 꼬리 바로 앞에서 끝나야 한다
+    index_offset, count, magic = FOOTER.unpack_from(mm, pos)
+    return magic == MAGIC and FILE_HEADER.size <= index_offset and index_offset + 8 * count == pos
+
+
+def _find_footer(mm):
+    # 보통은 파일 끝, 추가 쓰기가 중간에 끊긴 파일이면 뒤에서부터 마지막 온전한 꼬리를 찾는다
+    pos = len(mm) - FOOTER.size
+    if _valid_footer(mm, pos):
+        return pos
+    end = len(mm)
+    while True:
+        i = mm.rfind(MAGIC, FILE_HEADER.size, end)
+        if i < 0:
+            return None
+        pos = i + 4 - FOOTER.size
+        if pos >= FILE_HEADER.size and _valid_footer(mm, pos):
+            return pos
+        end = i + 3
+
+
+class ArchiveReader:
+    # mmap 으로 열어 두고 색인으로 i 번째 판에 바로 간다 (판 수와 무관하게 O(1))
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        size = len(self.mm)
+        if size < FILE_HEADER.size + FOOTER.size or FILE_HEADER.unpack_from(self.mm, 0)[0] != MAGIC:
+            self.close()
+            raise ValueError(f'아카이브 파일이 아님: {path}')
+        self.footer_offset = _find_footer(self.mm)
+        if self.footer_offset is None:
+            self.close()
+            raise ValueError(f'색인이 없음 (쓰다가 중단된 파일?): {path}')
+        self.index_offset, self.count, _ = FOOTER.unpack_from(self.mm, self.footer_offset)
+
+    def __len__(self):
+        return self.count
+
+    def _record(self, i):
+        # i 번째 판 → (결과, 시작 스냅샷 또는 None, 메타 바이트, 수 시작 오프셋, 반수)
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        offset = OFFSET.unpack_from(self.mm, self.index_offset + 8 * i)[0]
+        result, flags, plies, meta_len = GAME_HEADER.unpack_from(self.mm, offset)
+        pos = offset + GAME_HEADER.size
+        start = None
+        if flags & FLAG_START:
+            start = self.mm[pos:pos + SNAPSHOT_SIZE]
+            pos += SNAPSHOT_SIZE
+        meta = self.mm[pos:pos + meta_len]
+        return RESULTS[result], start, meta, pos + meta_len, plies
+
+    def header(self, i):
+        # 수를 읽지 않고 결과·반수·메타만
+        result, start, meta, _, plies = self._record(i)
+        return {'result': result, 'plies': plies,
+                'fen': Board.from_snapshot(start).to_fen() if start else None,
+                'headers': json.loads(meta) if meta else {}}
+
+    def moves(self, i):
+        _, _, _, pos, plies = self._record(i)
+        codes = array('H', self.mm[pos:pos + 2 * plies])
+        if not _LITTLE:
+            codes.byteswap()
+        return [decode_move(code) for code in codes]
+
+    def board(self, i, use_bitboards=True, check=False):
+        # i 번째 판을 Board 로 재생 — check 면 한 수씩 합법수 표로 확인
+        _, start, _, _, _ = self._record(i)
+        board = Board.from_snapshot(start, use_bitboards) if start else Board(use_bitboards)
+        for ply, move in enumerate(self.moves(i)):
+            if check and move not in board.move_table()[1]:
+                raise ValueError(f'game {i} ply {ply + 1}: 불법 수 {move_name(move)} @ {board.to_fen()}')
+            board.make_move(*move)
+        return board
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ─── PGN ↔ 아카이브 ─────────────────────────────────
+def import_pgn(pgn_paths, out_path):
+    # PGN 판들을 SAN 해석해서 아카이브에 추가 → (추가한 판, 건너뛴 판)
+    added = skipped = 0
+    with ArchiveWriter(out_path) as writer:
+        for path in pgn_paths:
+            for headers, movetext in iter_games(path):
+                fen = headers.get('FEN')
+                board = Board.from_fen(fen) if fen else Board()
+                start = board.to_snapshot() if fen else None
+                moves = []
+                try:
+                    for san in san_tokens(movetext):
+                        move = decode_san(board, san)
+                        board.make_move(*move)
+                        moves.append(move)
+                except ValueError:
+                    skipped += 1
+                    continue
+                result = headers.get('Result', '*')
+                writer.add(moves, result if result in RESULTS else '*', headers, start)
+                added += 1
+    return added, skipped
+
+
+def export_game(reader, i):
+    # i 번째 판 → PGN 텍스트
+    info = reader.header(i)
+    headers = dict(info['headers'])
+    headers['Result'] = info['result']
+    if info['fen']:
+        headers['FEN'] = info['fen']
+    board = Board.from_fen(info['fen']) if info['fen'] else Board()
+    sans = []
+    for move in reader.moves(i):
+        sans.append(encode_san(board, move))
+        board.make_move(*move)
+    return format_game(headers, sans, info['result'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='이진 기보 아카이브 (판당 수 u16, mmap 색인)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_import = sub.add_parser('import', help='PGN 을 아카이브에 추가')
+    p_import.add_argument('archive')
+    p_import.add_argument('pgn', nargs='+')
+
+    p_info = sub.add_parser('info', help='판 수 · 결과 통계')
+    p_info.add_argument('archive')
+
+    p_export = sub.add_parser('export', help='판을 PGN 으로')
+    p_export.add_argument('archive')
+    p_export.add_argument('games', nargs='*', type=int, help='판 번호 (기본: 전부)')
+
+    p_verify = sub.add_parser('verify', help='모든 판을 Board 로 재생해 합법성 확인 · 처리량 측정')
+    p_verify.add_argument('archive')
+    p_verify.add_argument('--grid', action='store_true', help='비트보드 없이 grid 경로로 실행')
+    args = parser.parse_args(argv)
+
+    if args.command == 'import':
+        start = time.perf_counter()
+        added, skipped = import_pgn(args.pgn, args.archive)
+        print(f'{added} games added, {skipped} skipped  {time.perf_counter() - start:.2f}s  → {args.archive}')
+        return 0
+
+    with ArchiveReader(args.archive) as reader:
+        if args.command == 'info':
+            results = Counter()
+            plies = 0
+            for i in range(len(reader)):
+                result, _, _, _, n = reader._record(i)
+                results[result] += 1
+                plies += n
+            size = os.path.getsize(args.archive)
+            print(f'{len(reader)} games  {plies} plies  {size} bytes  '
+                  f'({size / max(plies, 1):.2f} bytes/ply)')
+            print('results:', '  '.join(f'{k} {v}' for k, v in sorted(results.items())))
+        elif args.command == 'export':
+            for i in args.games or range(len(reader)):
+                sys.stdout.write(export_game(reader, i))
+        else:
+            errors = plies = 0
+            start = time.perf_counter()
+            for i in range(len(reader)):
+                try:
+                    plies += len(reader.board(i, not args.grid, check=True).move_history)
+                except ValueError as e:
+                    errors += 1
+                    print(e, file=sys.stderr)
+            elapsed = time.perf_counter() - start
+            print(f'{len(reader)} games  {plies} plies  {errors} errors  {elapsed:.3f}s  '
+                  f'{int(plies / elapsed) if elapsed > 0 else 0} plies/s')
+            return 1 if errors else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,176 @@
+# ─── 비트보드 표현 ──────────────────────────────────
+# 칸 번호 sq = y*8 + x (Board.grid[y][x] 와 같은 좌표, y=0 이 검은색 진영)
+# 색·기물 종류마다 64비트 정수 하나 → 총 12개 + 색별/전체 점유 마스크
+
+COLORS = ('white', 'black')
+PTYPES = ('pawn', 'knight', 'bishop', 'rook', 'queen', 'king')
+COLOR_INDEX = {c: i for i, c in enumerate(COLORS)}
+PTYPE_INDEX = {p: i for i, p in enumerate(PTYPES)}
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+WHITE, BLACK = 0, 1
+
+FULL = (1 << 64) - 1
+
+# ─── 방향 (dx, dy) ──────────────────────────────────
+# sq 가 증가하는 방향(POS_DIRS)은 가장 낮은 비트, 나머지는 가장 높은 비트가 첫 블로커
+ROOK_DIRS   = [(1,0),(0,1),(-1,0),(0,-1)]
+BISHOP_DIRS = [(1,1),(-1,1),(-1,-1),(1,-1)]
+POS_DIRS    = {(1,0),(0,1),(1,1),(-1,1)}
+
+
+def _mask(offsets, sq):
+    # sq 에서 offsets 만큼 떨어진 (판 안의) 칸들의 비트마스크
+    x0, y0 = sq % 8, sq // 8
+    m = 0
+    for dx, dy in offsets:
+        x, y = x0 + dx, y0 + dy
+        if 0 <= x < 8 and 0 <= y < 8:
+            m |= 1 << (y*8 + x)
+    return m
+
+
+def _ray(d, sq):
+    # sq 에서 d 방향으로 판 끝까지의 칸들 (sq 자신 제외)
+    dx, dy = d
+    x, y = sq % 8 + dx, sq // 8 + dy
+    m = 0
+    while 0 <= x < 8 and 0 <= y < 8:
+        m |= 1 << (y*8 + x)
+        x += dx; y += dy
+    return m
+
+
+# ─── 미리 계산한 공격 테이블 ────────────────────────
+KNIGHT_ATTACKS = [_mask([(2,1),(2,-1),(-2,1),(-2,-1),(1,2),(1,-2),(-1,2),(-1,-2)], sq) for sq in range(64)]
+KING_ATTACKS   = [_mask([(dx,dy) for dx in (-1,0,1) for dy in (-1,0,1) if dx or dy], sq) for sq in range(64)]
+# PAWN_ATTACKS[color][sq] : color 폰이 sq 에서 공격하는 칸 (흰색은 위쪽 y-1)
+PAWN_ATTACKS   = [[_mask([(-1,-1),(1,-1)], sq) for sq in range(64)],
+                  [_mask([(-1,1),(1,1)], sq) for sq in range(64)]]
+RAYS = {d: [_ray(d, sq) for sq in range(64)] for d in ROOK_DIRS + BISHOP_DIRS}
+# BETWEEN[a][b] : 두 칸 사이(양끝 제외) — 체크 차단 칸·핀 판정용
+# LINE[a][b]    : 두 칸을 지나는 직선 전체 — 핀된 기물이 움직일 수 있는 칸
+BETWEEN = [[0]*64 for _ in range(64)]
+LINE    = [[0]*64 for _ in range(64)]
+for _d in ROOK_DIRS + BISHOP_DIRS:
+    _back = (-_d[0], -_d[1])
+    for _a in range(64):
+        for _b in range(64):
+            if RAYS[_d][_a] >> _b & 1:
+                BETWEEN[_a][_b] = RAYS[_d][_a] & RAYS[_back][_b]
+                LINE[_a][_b] = RAYS[_d][_a] | RAYS[_back][_a] | (1 << _a)
+
+
+def lsb(b):
+    return (b & -b).bit_length() - 1
+
+
+def iter_bits(b):
+    # 켜진 비트의 칸 번호를 낮은 순서로
+    while b:
+        low = b & -b
+        yield low.bit_length() - 1
+        b ^= low
+
+
+def _slide(dirs, sq, occ):
+    # 레이 룩업: 첫 번째 막는 기물 뒤쪽 레이를 지워서 공격 칸을 구한다
+    attacks = 0
+    for d in dirs:
+        ray = RAYS[d][sq]
+        blockers = ray & occ
+        if blockers:
+            if d in POS_DIRS:
+                first = (blockers & -blockers).bit_length() - 1
+            else:
+                first = blockers.bit_length() - 1
+            ray ^= RAYS[d][first]
+        attacks |= ray
+    return attacks
+
+
+def rook_attacks(sq, occ):
+    return _slide(ROOK_DIRS, sq, occ)
+
+
+def bishop_attacks(sq, occ):
+    return _slide(BISHOP_DIRS, sq, occ)
+
+
+class Bitboards:
+    def __init__(self):
+        self.pieces = [[0]*6 for _ in range(2)] # [색][종류] 12개 비트보드
+        self.occ    = [0, 0] # 색별 점유
+        self.all    = 0 # 전체 점유
+
+    def copy(self):
+        bb = Bitboards()
+        bb.pieces = [row[:] for row in self.pieces]
+        bb.occ    = self.occ[:]
+        bb.all    = self.all
+        return bb
+
+    def put(self, sq, ci, pi):
+        bit = 1 << sq
+        self.pieces[ci][pi] |= bit
+        self.occ[ci] |= bit
+        self.all |= bit
+
+    def remove(self, sq, ci, pi):
+        bit = ~(1 << sq)
+        self.pieces[ci][pi] &= bit
+        self.occ[ci] &= bit
+        self.all &= bit
+
+    def king_square(self, ci):
+        k = self.pieces[ci][KING]
+        return lsb(k) if k else None
+
+    def attackers(self, sq, by_ci, occ=None):
+        # sq 를 공격하는 by_ci 색 기물들의 비트마스크
+        if occ is None:
+            occ = self.all
+        p = self.pieces[by_ci]
+        queens = p[QUEEN]
+        return ((PAWN_ATTACKS[by_ci ^ 1][sq] & p[PAWN])
+                | (KNIGHT_ATTACKS[sq] & p[KNIGHT])
+                | (KING_ATTACKS[sq] & p[KING])
+                | (rook_attacks(sq, occ) & (p[ROOK] | queens))
+                | (bishop_attacks(sq, occ) & (p[BISHOP] | queens)))
+
+    def attacked(self, sq, by_ci):
+        # 싼 검사부터: 점프 기물 → 슬라이딩 기물
+        p = self.pieces[by_ci]
+        if PAWN_ATTACKS[by_ci ^ 1][sq] & p[PAWN]:
+            return True
+        if KNIGHT_ATTACKS[sq] & p[KNIGHT] or KING_ATTACKS[sq] & p[KING]:
+            return True
+        queens = p[QUEEN]
+        if rook_attacks(sq, self.all) & (p[ROOK] | queens):
+            return True
+        return bool(bishop_attacks(sq, self.all) & (p[BISHOP] | queens))
+
+    def pawn_targets(self, sq, ci):
+        # 폰의 전진(1·2칸)과 대각선 캡처 마스크 (앙파상 제외)
+        empty = ~self.all
+        if ci == WHITE:
+            one = ((1 << sq) >> 8) & empty
+            two = (one >> 8) & empty if 48 <= sq < 56 else 0
+        else:
+            one = ((1 << sq) << 8) & FULL & empty
+            two = (one << 8) & empty if 8 <= sq < 16 else 0
+        return one | two | (PAWN_ATTACKS[ci][sq] & self.occ[ci ^ 1])
+
+    def targets(self, sq, ci, pi):
+        # 폰 이외 기물의 의사합법(pseudo-legal) 도착 칸 마스크
+        own = ~self.occ[ci]
+        if pi == KNIGHT:
+            return KNIGHT_ATTACKS[sq] & own
+        if pi == KING:
+            return KING_ATTACKS[sq] & own
+        if pi == ROOK:
+            return rook_attacks(sq, self.all) & own
+        if pi == BISHOP:
+            return bishop_attacks(sq, self.all) & own
+        if pi == QUEEN:
+            return (rook_attacks(sq, self.all) | bishop_attacks(sq, self.all)) & own
+        return 0
@@ -1,183 +1,719 @@
-import copy
-from pieces import Pawn, Rook, Knight, Bishop, Queen, King
-
-class Board:
-    def __init__(self):
-        self.grid = [[None]*8 for _ in range(8)] # 8×8 격자
-        self.move_history = [] # (piece, from, to) 기록
-        self.white_to_move = True # 다음 수는 흰색
-        self.setup_initial_positions() # 기물 배치
-
-    def setup_initial_positions(self):
-        # 초기 기물 배치
-        for i in range(8):
-            self.grid[1][i] = Pawn('black')
-            self.grid[6][i] = Pawn('white')
-        back_rank = [Rook, Knight, Bishop, Queen, King, Bishop, Knight, Rook]
-        for col, cls in enumerate(back_rank):
-            self.grid[0][col] = cls('black')
-            self.grid[7][col] = cls('white')
-
-    def move_piece(self, from_pos, to_pos):
-        fx, fy = from_pos
-        tx, ty = to_pos
-        # 1) 유효 기물인지 & get_valid_moves 에 포함된 수인지 검사
-        piece = self.grid[fy][fx]
-        if not piece or to_pos not in piece.get_valid_moves(from_pos, self):
-            return False
-        # 2) 실제 이동 로직 적용
-        self._apply_move(piece, from_pos, to_pos)
-        # 3) 기록·상태 업데이트
-        self.move_history.append((piece, from_pos, to_pos))
-        piece.has_moved = True
-        self.white_to_move = not self.white_to_move
-        return True
-
-    def _apply_move(self, piece, from_pos, to_pos):
-        fx, fy = from_pos
-        tx, ty = to_pos
-
-        # 1) 캐슬링: King이 두 칸 이동한 경우
-        if isinstance(piece, King) and abs(tx - fx) == 2:
-            rook_src = 7 if tx > fx else 0
-            rook_dst = fx + (1 if tx > fx else -1)
-            rook = self.grid[fy][rook_src]
-            self.grid[fy][rook_dst] = rook
-            self.grid[fy][rook_src] = None
-            rook.has_moved = True
-
-        # 2) 앙파상 캡처: Pawn이 대각선 이동했는데 이동 칸이 비어있다면
-        if isinstance(piece, Pawn) and fx != tx and self.grid[ty][tx] is None:
-            self.grid[fy][tx] = None
-
-        # 3) 일반 이동
-        self.grid[fy][fx] = None
-        self.grid[ty][tx] = piece
-
-    def is_in_check(self, color):
-         # 1) 해당 색의 King 위치 찾기
-        king_pos = next(((x, y) for y in range(8) for x in range(8)
-                         if isinstance(self.grid[y][x], King) and self.grid[y][x].color == color), None)
-        if not king_pos:
-            return False
-
-        # 2) 상대 색을 attacker 로 지정
-        attacker = 'black' if color == 'white' else 'white'
-        return self._square_attacked(king_pos, attacker)
-
-    def _square_attacked(self, square, attacker_color):
-        x0, y0 = square
-
-        # 1) Pawn 공격 (한 칸 대각선)
-        step = -1 if attacker_color == 'white' else 1
-        for dx in (-1, 1):
-            x, y = x0 + dx, y0 + step
-            if 0 <= x < 8 and 0 <= y < 8:
-                p = self.grid[y][x]
-                if isinstance(p, Pawn) and p.color == attacker_color:
-                    return True
-
-        # 2) Knight 공격 (8가지 L자 점프)
-        for dx, dy in [(2,1),(2,-1),(-2,1),(-2,-1),(1,2),(1,-2),(-1,2),(-1,-2)]:
-            x, y = x0 + dx, y0 + dy
-            if 0 <= x < 8 and 0 <= y < 8:
-                p = self.grid[y][x]
-                if isinstance(p, Knight) and p.color == attacker_color:
-                    return True
-
-        # 3) Rook/Queen 슬라이딩 (직선 4방향)
-        for dx, dy, types in [
-            (1,0,(Rook,Queen)),(-1,0,(Rook,Queen)),(0,1,(Rook,Queen)),(0,-1,(Rook,Queen)),
-            (1,1,(Bishop,Queen)),(1,-1,(Bishop,Queen)),(-1,1,(Bishop,Queen)),(-1,-1,(Bishop,Queen))
-        ]:
-            x, y = x0, y0
-            while True:
-                x += dx; y += dy
-                if not (0 <= x < 8 and 0 <= y < 8):
-                    break
-                p = self.grid[y][x]
-                if p and p.color == attacker_color and isinstance(p, types):
-                    return True
-                if p:
-                    break # 다른 기물에 막힘
-
-        # 4) King 인접 공격 (8칸)
-        for dx in (-1,0,1):
-            for dy in (-1,0,1):
-                if dx == 0 and dy == 0:
-                    continue
-                x, y = x0 + dx, y0 + dy
-                # 인접 8칸 체크
-                if 0 <= x < 8 and 0 <= y < 8:
-                    p = self.grid[y][x]
-                    if isinstance(p, King) and p.color == attacker_color:
-                        return True
-        return False
-
-
-    def _would_cause_check(self, from_pos, to_pos):
-    # 체크 유발되는 수가 있는지 검사
-        b2 = copy.deepcopy(self)
-        piece = b2.grid[from_pos[1]][from_pos[0]]
-        b2._apply_move(piece, from_pos, to_pos)
-        return b2.is_in_check('white' if self.white_to_move else 'black')
-
-    def has_any_legal_moves(self, color):
-    # 스테일메이트(무승부) 검사
-        for y in range(8):
-            for x in range(8):
-                p = self.grid[y][x]
-                if p and p.color == color and p.get_valid_moves((x, y), self):
-                    return True
-        return False
-
-    def is_checkmate(self, color):
-        # 체크메이트
-        return self.is_in_check(color) and not self.has_any_legal_moves(color)
-
-    def is_stalemate(self, color):
-        # 스테일메이트
-        return not self.is_in_check(color) and not self.has_any_legal_moves(color)
-
-    def _can_castle_kingside(self, color):
-        y = 7 if color == 'white' else 0
-        king = self.grid[y][4]
-        rook = self.grid[y][7]
-        # 1) King·Rook 존재 및 미이동
-        # 2) 중간 칸(5,6)이 비어야 함
-        # 3) (4,5,6)칸이 공격받지 않아야 함
-       
-        if not (isinstance(king, King) and isinstance(rook, Rook)):
-            return False
-       
-        if king.has_moved or rook.has_moved:
-            return False
-        
-        for x in (5, 6):
-            if self.grid[y][x] is not None:
-                return False
-       
-        for x in (4, 5, 6):
-            if self._square_attacked((x, y), color):
-                return False
-        return True
-
-    def _can_castle_queenside(self, color):
-        # 유사 로직, 칸 인덱스(1,2,3) 및 (2,3,4) 체크
-        y = 7 if color == 'white' else 0
-        king = self.grid[y][4]
-        rook = self.grid[y][0]
-        if not (isinstance(king, King) and isinstance(rook, Rook)):
-            return False
-        if king.has_moved or rook.has_moved:
-            return False
-       
-        for x in (1, 2, 3):
-            if self.grid[y][x] is not None:
-                return False
-        
-        for x in (2, 3, 4):
-            if self._square_attacked((x, y), color):
-                return False
-        return True
-
+import struct
+from pieces import Pawn, Rook, Knight, Bishop, Queen, King
+from bitboard import (Bitboards, COLORS, COLOR_INDEX, PTYPE_INDEX, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING,
+                      WHITE, FULL, KING_ATTACKS, PAWN_ATTACKS, BETWEEN, LINE,
+                      rook_attacks, bishop_attacks, iter_bits, lsb)
+from zobrist import (PIECE_KEYS, SIDE_KEY, CASTLE_KEYS, EP_KEYS,
+                     CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ, PositionCache)
+from evaluation import PIECE_VALUES, SQUARE_SCORES
+
+# 승진 가능한 기물 (legal_moves 가 이 순서로 생성)
+PROMOTIONS = ('queen', 'rook', 'bishop', 'knight')
+PROMOTION_CLASSES = {'queen': Queen, 'rook': Rook, 'bishop': Bishop, 'knight': Knight}
+# FEN 기물 문자 ↔ 기물 클래스
+FEN_PIECES = {'p': Pawn, 'n': Knight, 'b': Bishop, 'r': Rook, 'q': Queen, 'k': King}
+FEN_LETTERS = {'pawn': 'p', 'knight': 'n', 'bishop': 'b', 'rook': 'r', 'queen': 'q', 'king': 'k'}
+# 스냅샷: 헤더(플래그, 앙파상 칸, 반수, 수 번호) + 칸당 1바이트 (0=빈칸, 1+색*6+종류)
+SNAPSHOT_HEADER = struct.Struct('<BBHH')
+SNAPSHOT_SIZE   = SNAPSHOT_HEADER.size + 64
+NO_EP = 0xFF
+SNAPSHOT_CLASSES = (Pawn, Knight, Bishop, Rook, Queen, King) # bitboard.PTYPES 순서
+# 스냅샷 코드 - 1 → 플라이웨이트 기물 (복원할 때 기물을 새로 만들지 않음)
+SNAPSHOT_PIECES = tuple(cls(color) for color in COLORS for cls in SNAPSHOT_CLASSES)
+# 캐슬링 권한 비트 → (색, 룩 칸)
+CASTLE_ROOKS = ((CASTLE_WK, 'white', (7, 7)), (CASTLE_WQ, 'white', (0, 7)),
+                (CASTLE_BK, 'black', (7, 0)), (CASTLE_BQ, 'black', (0, 0)))
+# 칸 → 그 칸에서 출발하거나 그 칸에 도착하는 수가 남기는 캐슬링 권한 (킹·룩 시작 칸만 지운다)
+CASTLE_KEEP = [0xF] * 64
+for _bit, _color, (_rx, _ry) in CASTLE_ROOKS:
+    CASTLE_KEEP[_ry*8 + _rx] &= ~_bit
+    CASTLE_KEEP[_ry*8 + 4] &= ~_bit
+# 색·종류 → 재료 점수 (흰색 +, 검은색 -)
+SIGNED_VALUES = (tuple(PIECE_VALUES), tuple(-v for v in PIECE_VALUES))
+
+
+def square_name(pos):
+    # (x, y) → 'e4'
+    x, y = pos
+    return 'abcdefgh'[x] + str(8 - y)
+
+
+def move_name(move):
+    # (from, to, promotion) → UCI 표기 'e7e8q'
+    from_pos, to_pos, promo = move
+    return square_name(from_pos) + square_name(to_pos) + (FEN_LETTERS[promo] if promo else '')
+
+
+class Board:
+    def __init__(self, use_bitboards=True, cache_size=4096, setup=True):
+        self.grid = [[None]*8 for _ in range(8)] # 8×8 격자 (game.py 가 보는 뷰)
+        self.bb = Bitboards() if use_bitboards else None # 공격 판정·수 생성용 비트보드
+        self.move_history = [] # 둔 수 (from, to, promotion) 기록 — 기물 객체는 담지 않는다 (archive 로 저장)
+        self.white_to_move = True # 다음 수는 흰색
+        self.undo_stack = [] # make_move 되돌리기용 기록
+        self.hash = 0 # Zobrist 키 (make/unmake 에서 증분 갱신)
+        self.hash_history = [] # 지금까지 지나온 포지션 해시
+        self.repetitions = {} # 해시 → 등장 횟수 (3회 반복 O(1) 판정)
+        self.halfmove_clock = 0 # 마지막 폰 이동/캡처 이후 반수 (50수 규칙)
+        self.fullmove_number = 1 # 흑이 둘 때마다 1 증가
+        self.ep_square = None # 직전 수가 폰 두 칸 전진이면 그 사이 칸
+        self.castling = 0 # 캐슬링 권한 비트 (CASTLE_WK | WQ | BK | BQ)
+        self.cache = PositionCache(cache_size) # 해시 → [합법수, 체크 여부]
+        self.ply_table = None # 현재 포지션의 (해시, 합법수, 칸별 도착 칸, 상태) — move_table()
+        # 기물이 놓이고 빠질 때(_index_put/_index_remove) 함께 갱신하는 색인
+        self.piece_lists = {'white': {}, 'black': {}} # 색 → {(x, y): 기물}, 판 위 기물만
+        self.king_pos = {'white': None, 'black': None} # 색 → 킹 칸 (x, y)
+        self.material = 0 # 재료 합 (흰색 - 검은색, 센티폰)
+        self.psq_score = 0 # 재료 + 기물-칸 점수 합 (흰색 기준, evaluation.SQUARE_SCORES)
+        if setup:
+            self.setup_initial_positions() # 기물 배치
+        else:
+            self._rebuild_indices() # 빈 판 (from_fen 등에서 채움)
+
+    def setup_initial_positions(self):
+        # 초기 기물 배치
+        for i in range(8):
+            self.grid[1][i] = Pawn('black')
+            self.grid[6][i] = Pawn('white')
+        back_rank = [Rook, Knight, Bishop, Queen, King, Bishop, Knight, Rook]
+        for col, cls in enumerate(back_rank):
+            self.grid[0][col] = cls('black')
+            self.grid[7][col] = cls('white')
+        self.castling = CASTLE_WK | CASTLE_WQ | CASTLE_BK | CASTLE_BQ
+        self._rebuild_indices()
+
+    def _rebuild_indices(self):
+        # grid 전체를 비트보드·해시로 다시 옮긴다 (배치를 통째로 바꾼 뒤에만 사용)
+        if self.bb is not None:
+            self.bb = Bitboards()
+        self.hash = 0
+        self.piece_lists = {'white': {}, 'black': {}}
+        self.king_pos = {'white': None, 'black': None}
+        self.material = 0
+        self.psq_score = 0
+        for y in range(8):
+            for x in range(8):
+                if self.grid[y][x]:
+                    self._index_put(x, y, self.grid[y][x])
+        self.hash ^= self._state_key()
+        self.hash_history = [self.hash]
+        self.repetitions = {self.hash: 1}
+
+    @classmethod
+    def from_fen(cls, fen, use_bitboards=True):
+        # FEN → Board (배치, 차례, 캐슬링 권한, 앙파상 칸, 반수·수 번호)
+        parts = fen.split()
+        placement, side = parts[0], parts[1] if len(parts) > 1 else 'w'
+        rights = parts[2] if len(parts) > 2 else '-'
+        ep = parts[3] if len(parts) > 3 else '-'
+        board = cls(use_bitboards=use_bitboards, setup=False)
+        rows = placement.split('/')
+        if len(rows) != 8:
+            raise ValueError(f"잘못된 FEN 배치: {placement!r}")
+        for y, row in enumerate(rows):
+            x = 0
+            for ch in row:
+                if ch.isdigit():
+                    x += int(ch)
+                    continue
+                if ch.lower() not in FEN_PIECES or x > 7:
+                    raise ValueError(f"잘못된 FEN 배치: {placement!r}")
+                board.grid[y][x] = FEN_PIECES[ch.lower()]('white' if ch.isupper() else 'black')
+                x += 1
+        board._set_castling_rights(rights)
+        board.white_to_move = side == 'w'
+        board.ep_square = None if ep == '-' else ('abcdefgh'.index(ep[0]), 8 - int(ep[1]))
+        board.halfmove_clock = int(parts[4]) if len(parts) > 4 else 0
+        board.fullmove_number = int(parts[5]) if len(parts) > 5 else 1
+        board._rebuild_indices()
+        return board
+
+    def _set_castling_rights(self, rights):
+        # 권한 표기('KQkq' 또는 비트) → self.castling, 킹·룩이 제자리에 없는 권한은 버린다
+        if isinstance(rights, str):
+            rights = sum(bit for ch, bit in zip('KQkq', (CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ)) if ch in rights)
+        for bit, color, (rx, ry) in CASTLE_ROOKS:
+            king, rook = self.grid[ry][4], self.grid[ry][rx]
+            if not (isinstance(king, King) and king.color == color
+                    and isinstance(rook, Rook) and rook.color == color):
+                rights &= ~bit
+        self.castling = rights
+
+    def to_fen(self):
+        rows = []
+        for y in range(8):
+            row, empty = '', 0
+            for x in range(8):
+                p = self.grid[y][x]
+                if p is None:
+                    empty += 1
+                    continue
+                if empty:
+                    row += str(empty); empty = 0
+                letter = FEN_LETTERS[p.ptype]
+                row += letter.upper() if p.color == 'white' else letter
+            if empty:
+                row += str(empty)
+            rows.append(row)
+        rights = self.castling_rights()
+        castling = ''.join(ch for ch, bit in zip('KQkq', (CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ)) if rights & bit)
+        ep = '-' if self.ep_square is None else 'abcdefgh'[self.ep_square[0]] + str(8 - self.ep_square[1])
+        return ' '.join(['/'.join(rows), 'w' if self.white_to_move else 'b', castling or '-', ep,
+                         str(self.halfmove_clock), str(self.fullmove_number)])
+
+    def to_snapshot(self):
+        # 64바이트 배치 + 6바이트 상태 헤더 (Piece 객체를 만들지 않음)
+        squares = bytearray(64)
+        for y in range(8):
+            row = self.grid[y]
+            for x in range(8):
+                p = row[x]
+                if p:
+                    squares[y*8 + x] = 1 + COLOR_INDEX[p.color]*6 + PTYPE_INDEX[p.ptype]
+        flags = self.castling_rights() | (0 if self.white_to_move else 0x10)
+        ep = NO_EP if self.ep_square is None else self.ep_square[1]*8 + self.ep_square[0]
+        header = SNAPSHOT_HEADER.pack(flags, ep, self.halfmove_clock, self.fullmove_number)
+        return header + bytes(squares)
+
+    @classmethod
+    def from_snapshot(cls, data, use_bitboards=True):
+        flags, ep, halfmove, fullmove = SNAPSHOT_HEADER.unpack_from(data)
+        squares = data[SNAPSHOT_HEADER.size:SNAPSHOT_SIZE]
+        board = cls(use_bitboards=use_bitboards, setup=False)
+        for sq, code in enumerate(squares):
+            if code:
+                board.grid[sq // 8][sq % 8] = SNAPSHOT_PIECES[code - 1]
+        board._set_castling_rights(flags & 0xF)
+        board.white_to_move = not flags & 0x10
+        board.ep_square = None if ep == NO_EP else (ep % 8, ep // 8)
+        board.halfmove_clock, board.fullmove_number = halfmove, fullmove
+        board._rebuild_indices()
+        return board
+
+    def copy(self):
+        # 다른 스레드·탐색용 독립 사본 (반복 판정용 해시 기록까지 복사, move_history·undo 는 제외)
+        # 기물은 불변 플라이웨이트라 격자는 얕은 복사로 충분하다
+        board = Board(self.bb is not None, self.cache.maxsize, setup=False)
+        board.grid = [row[:] for row in self.grid]
+        if self.bb is not None:
+            board.bb = self.bb.copy()
+        board.white_to_move = self.white_to_move
+        board.castling = self.castling
+        board.ep_square = self.ep_square
+        board.halfmove_clock = self.halfmove_clock
+        board.fullmove_number = self.fullmove_number
+        board.hash = self.hash
+        board.hash_history = list(self.hash_history)
+        board.repetitions = dict(self.repetitions)
+        board.piece_lists = {color: dict(squares) for color, squares in self.piece_lists.items()}
+        board.king_pos = dict(self.king_pos)
+        board.material = self.material
+        board.psq_score = self.psq_score
+        return board
+
+    def set_hash_history(self, hashes):
+        # 반복 판정용 해시 기록을 통째로 바꾼다 (마지막 항목 == 현재 해시)
+        self.hash_history = list(hashes)
+        self.repetitions = {}
+        for h in self.hash_history:
+            self.repetitions[h] = self.repetitions.get(h, 0) + 1
+
+    def trim_history(self, keep):
+        # 긴 대국에서 기록이 끝없이 늘지 않게 최근 keep 수만 unmake 할 수 있게 남긴다
+        # 해시 기록은 되돌릴 수 있는 만큼 + 마지막 폰 이동·캡처 이후 (반복 판정에 필요한 만큼)
+        if len(self.undo_stack) > keep:
+            del self.undo_stack[:len(self.undo_stack) - keep]
+            del self.move_history[:len(self.move_history) - keep]
+        window = max(len(self.undo_stack), self.halfmove_clock) + 1
+        if len(self.hash_history) > window:
+            self.set_hash_history(self.hash_history[-window:])
+
+    def _index_put(self, x, y, piece):
+        # 칸에 기물이 놓일 때 비트보드·해시·기물 목록·킹 칸·점수 갱신
+        # (캐슬링 룩, 앙파상, 승진도 모두 여기와 _index_remove 를 거친다)
+        ci, pi = COLOR_INDEX[piece.color], PTYPE_INDEX[piece.ptype]
+        sq = y*8 + x
+        if self.bb is not None:
+            self.bb.put(sq, ci, pi)
+        self.hash ^= PIECE_KEYS[ci][pi][sq]
+        self.piece_lists[piece.color][(x, y)] = piece
+        if pi == KING:
+            self.king_pos[piece.color] = (x, y)
+        self.material += SIGNED_VALUES[ci][pi]
+        self.psq_score += SQUARE_SCORES[ci][pi][sq]
+
+    def _index_remove(self, x, y, piece):
+        ci, pi = COLOR_INDEX[piece.color], PTYPE_INDEX[piece.ptype]
+        sq = y*8 + x
+        if self.bb is not None:
+            self.bb.remove(sq, ci, pi)
+        self.hash ^= PIECE_KEYS[ci][pi][sq]
+        del self.piece_lists[piece.color][(x, y)]
+        if pi == KING:
+            self.king_pos[piece.color] = None
+        self.material -= SIGNED_VALUES[ci][pi]
+        self.psq_score -= SQUARE_SCORES[ci][pi][sq]
+
+    def castling_rights(self):
+        # 남아 있는 캐슬링 권한 비트
+        return self.castling
+
+    def piece_count(self):
+        # 판 위 기물 수 (엔드게임 테이블 조회 여부 판단용)
+        return len(self.piece_lists['white']) + len(self.piece_lists['black'])
+
+    def pieces_of(self, color):
+        # color 기물 [((x, y), 기물)] — grid 와 같은 순서 (위 줄부터, 왼쪽부터)
+        return sorted(self.piece_lists[color].items(), key=lambda item: (item[0][1], item[0][0]))
+
+    def evaluate(self):
+        # 분석용 정적 평가 (재료·PST·기동력·폰 구조), 차례인 쪽 기준 센티폰
+        # evaluation.evaluate_batch 를 포지션 1개로 부르므로 배치 결과와 항상 같다 (numpy 필요)
+        from evaluation import encode_boards, evaluate_batch
+        return int(evaluate_batch(*encode_boards([self]))[0])
+
+    def probe_tablebase(self):
+        # 엔드게임 테이블 조회 → (wdl, dtm) 또는 None, 차례인 쪽 기준 (tablebase.probe)
+        from tablebase import probe
+        return probe(self)
+
+    def _state_key(self):
+        # 기물 외 상태(차례·캐슬링·앙파상)의 해시 성분
+        key = CASTLE_KEYS[self.castling_rights()]
+        if not self.white_to_move:
+            key ^= SIDE_KEY
+        # 앙파상 열은 차례인 쪽 폰이 실제로 잡을 수 있을 때만 (아니면 두 칸 전진 여부로 반복이 갈린다)
+        if self.ep_square is not None:
+            ex, ey = self.ep_square
+            color = 'white' if self.white_to_move else 'black'
+            row = self.grid[ey + (1 if self.white_to_move else -1)]
+            for px in (ex - 1, ex + 1):
+                p = row[px] if 0 <= px < 8 else None
+                if p and p.ptype == 'pawn' and p.color == color:
+                    key ^= EP_KEYS[ex]
+                    break
+        return key
+
+    def set_piece(self, pos, piece):
+        # grid 에 직접 쓰는 대신 사용 (승진 등) → 비트보드도 함께 갱신
+        x, y = pos
+        old = self.grid[y][x]
+        if old:
+            self._index_remove(x, y, old)
+        self.grid[y][x] = piece
+        if piece:
+            self._index_put(x, y, piece)
+
+    def move_piece(self, from_pos, to_pos, promotion=None):
+        # 1) (from, to, 승진) 전체가 합법수 표에 있는지 검사
+        #    → 차례가 아닌 기물, 승진이 아닌 수의 promotion, 끝 줄 폰 전진의 promotion 누락을 모두 거른다
+        if (from_pos, to_pos, promotion) not in self.move_table()[1]:
+            return False
+        # 2) 실제 이동 + 기록·상태 업데이트
+        self.make_move(from_pos, to_pos, promotion)
+        # 3) 새 포지션의 합법수 표·상태를 바로 계산 (하이라이트·검증·종료 판정이 공유)
+        self.move_table()
+        return True
+
+    def move_table(self):
+        # 차례인 쪽의 합법수 표를 포지션당 한 번만 계산
+        # (해시, [(from, to, promo)], {from: [to, ...]}, 'ongoing' | 'check' | 'checkmate' | 'stalemate')
+        table = self.ply_table
+        if table is None or table[0] != self.hash:
+            color = 'white' if self.white_to_move else 'black'
+            moves = self.legal_moves(color)
+            by_square = {}
+            for from_pos, to_pos, promo in moves:
+                if promo is None or promo == PROMOTIONS[0]:
+                    by_square.setdefault(from_pos, []).append(to_pos)
+            in_check = self.is_in_check(color)
+            if moves:
+                status = 'check' if in_check else 'ongoing'
+            else:
+                status = 'checkmate' if in_check else 'stalemate'
+            table = self.ply_table = (self.hash, moves, by_square, status)
+        return table
+
+    def status(self):
+        # 현재 포지션 상태: 'ongoing' / 'check' / 'checkmate' / 'stalemate'
+        return self.move_table()[3]
+
+    def make_move(self, from_pos, to_pos, promotion=None):
+        # 검증 없이 수를 두고, unmake_move 로 되돌릴 수 있도록 undo 기록을 쌓는다
+        # promotion: 폰이 끝 줄에 닿을 때 바꿀 ptype ('queen' 등), None 이면 폰 그대로
+        fx, fy = from_pos
+        piece = self.grid[fy][fx]
+        prev = (self.hash, self.halfmove_clock, self.ep_square, self.fullmove_number, self.castling)
+        self.hash ^= self._state_key()
+        undo = self._apply_move(piece, from_pos, to_pos)
+        if promotion:
+            self.set_piece(to_pos, PROMOTION_CLASSES[promotion](piece.color))
+        self.move_history.append((from_pos, to_pos, promotion))
+        # 킹·룩 시작 칸에서 떠나거나 그 칸의 룩을 잡으면 해당 권한이 사라진다
+        self.castling &= CASTLE_KEEP[fy*8 + fx] & CASTLE_KEEP[to_pos[1]*8 + to_pos[0]]
+        # 앙파상 칸: 폰 두 칸 전진일 때만
+        if isinstance(piece, Pawn) and abs(to_pos[1] - fy) == 2:
+            self.ep_square = (fx, (fy + to_pos[1]) // 2)
+        else:
+            self.ep_square = None
+        if not self.white_to_move:
+            self.fullmove_number += 1
+        self.white_to_move = not self.white_to_move
+        self.hash ^= self._state_key()
+        # 50수 규칙 카운터: 폰 이동이나 캡처면 0 으로
+        if isinstance(piece, Pawn) or undo[3] is not None:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        self.hash_history.append(self.hash)
+        self.repetitions[self.hash] = self.repetitions.get(self.hash, 0) + 1
+        undo += prev
+        self.undo_stack.append(undo)
+        return undo
+
+    def unmake_move(self):
+        # 마지막 make_move 를 정확히 되돌린다 (캐슬링 룩, 앙파상, 캐슬링 권한 포함)
+        piece, from_pos, to_pos, captured, cap_pos, castle, prev_hash, prev_clock, prev_ep, prev_fullmove, prev_castling = self.undo_stack.pop()
+        fx, fy = from_pos
+        tx, ty = to_pos
+        self.hash_history.pop()
+        count = self.repetitions[self.hash] - 1
+        if count:
+            self.repetitions[self.hash] = count
+        else:
+            del self.repetitions[self.hash]
+        self.move_history.pop()
+        self.white_to_move = not self.white_to_move
+
+        # 1) 이동한 기물 원위치 (승진했더라도 원래 Pawn 객체로 복구)
+        self._index_remove(tx, ty, self.grid[ty][tx])
+        self.grid[ty][tx] = None
+        self.grid[fy][fx] = piece
+        self._index_put(fx, fy, piece)
+        # 2) 잡힌 기물 복구 (앙파상이면 cap_pos 가 도착 칸과 다름)
+        if captured is not None:
+            cx, cy = cap_pos
+            self.grid[cy][cx] = captured
+            self._index_put(cx, cy, captured)
+        # 3) 캐슬링 룩 복구
+        if castle is not None:
+            rook, rook_src, rook_dst = castle
+            self.grid[fy][rook_dst] = None
+            self.grid[fy][rook_src] = rook
+            self._index_remove(rook_dst, fy, rook)
+            self._index_put(rook_src, fy, rook)
+        # 4) 해시·카운터는 저장해 둔 값으로 (차례·캐슬링·앙파상 성분까지 한 번에)
+        self.hash = prev_hash
+        self.halfmove_clock = prev_clock
+        self.ep_square = prev_ep
+        self.fullmove_number = prev_fullmove
+        self.castling = prev_castling
+
+    def _apply_move(self, piece, from_pos, to_pos):
+        # 보드 배치만 바꾸고, 되돌리기에 필요한 최소 정보를 튜플로 반환
+        fx, fy = from_pos
+        tx, ty = to_pos
+        captured, cap_pos, castle = self.grid[ty][tx], to_pos, None
+
+        # 1) 캐슬링: King이 두 칸 이동한 경우
+        if isinstance(piece, King) and abs(tx - fx) == 2:
+            rook_src = 7 if tx > fx else 0
+            rook_dst = fx + (1 if tx > fx else -1)
+            rook = self.grid[fy][rook_src]
+            castle = (rook, rook_src, rook_dst)
+            self.grid[fy][rook_dst] = rook
+            self.grid[fy][rook_src] = None
+            self._index_remove(rook_src, fy, rook)
+            self._index_put(rook_dst, fy, rook)
+
+        # 2) 앙파상 캡처: Pawn이 대각선 이동했는데 이동 칸이 비어있다면
+        if isinstance(piece, Pawn) and fx != tx and captured is None:
+            captured, cap_pos = self.grid[fy][tx], (tx, fy)
+            self.grid[fy][tx] = None
+
+        # 3) 일반 이동
+        if captured is not None:
+            self._index_remove(cap_pos[0], cap_pos[1], captured)
+        self._index_remove(fx, fy, piece)
+        self._index_put(tx, ty, piece)
+        self.grid[fy][fx] = None
+        self.grid[ty][tx] = piece
+        return (piece, from_pos, to_pos, captured, cap_pos, castle)
+
+    def _cache_entry(self, color):
+        # 차례인 쪽만 캐시 (해시에 차례가 들어 있으므로)
+        if (color == 'white') != self.white_to_move:
+            return None
+        entry = self.cache.get(self.hash)
+        if entry is None:
+            entry = [None, None] # [합법수 튜플, 체크 여부]
+            self.cache.put(self.hash, entry)
+        return entry
+
+    def is_in_check(self, color):
+        entry = self._cache_entry(color)
+        if entry is not None:
+            if entry[1] is None:
+                entry[1] = self._compute_in_check(color)
+            return entry[1]
+        return self._compute_in_check(color)
+
+    def _compute_in_check(self, color):
+        # 1) 킹 위치는 king_pos 에서 바로
+        king_pos = self.king_pos[color]
+        if not king_pos:
+            return False
+
+        # 2) 상대 색을 attacker 로 지정
+        attacker = 'black' if color == 'white' else 'white'
+        return self._square_attacked(king_pos, attacker)
+
+    def _square_attacked(self, square, attacker_color):
+        x0, y0 = square
+        if self.bb is not None:
+            # 비트보드: 미리 계산한 공격 테이블 + 레이 룩업
+            return self.bb.attacked(y0*8 + x0, COLOR_INDEX[attacker_color])
+
+        # 1) Pawn 공격 (한 칸 대각선)
+        step = 1 if attacker_color == 'white' else -1 # 흰 폰은 아래쪽(y+1)에서 공격
+        for dx in (-1, 1):
+            x, y = x0 + dx, y0 + step
+            if 0 <= x < 8 and 0 <= y < 8:
+                p = self.grid[y][x]
+                if isinstance(p, Pawn) and p.color == attacker_color:
+                    return True
+
+        # 2) Knight 공격 (8가지 L자 점프)
+        for dx, dy in [(2,1),(2,-1),(-2,1),(-2,-1),(1,2),(1,-2),(-1,2),(-1,-2)]:
+            x, y = x0 + dx, y0 + dy
+            if 0 <= x < 8 and 0 <= y < 8:
+                p = self.grid[y][x]
+                if isinstance(p, Knight) and p.color == attacker_color:
+                    return True
+
+        # 3) Rook/Queen 슬라이딩 (직선 4방향)
+        for dx, dy, types in [
+            (1,0,(Rook,Queen)),(-1,0,(Rook,Queen)),(0,1,(Rook,Queen)),(0,-1,(Rook,Queen)),
+            (1,1,(Bishop,Queen)),(1,-1,(Bishop,Queen)),(-1,1,(Bishop,Queen)),(-1,-1,(Bishop,Queen))
+        ]:
+            x, y = x0, y0
+            while True:
+                x += dx; y += dy
+                if not (0 <= x < 8 and 0 <= y < 8):
+                    break
+                p = self.grid[y][x]
+                if p and p.color == attacker_color and isinstance(p, types):
+                    return True
+                if p:
+                    break # 다른 기물에 막힘
+
+        # 4) King 인접 공격 (8칸)
+        for dx in (-1,0,1):
+            for dy in (-1,0,1):
+                if dx == 0 and dy == 0:
+                    continue
+                x, y = x0 + dx, y0 + dy
+                # 인접 8칸 체크
+                if 0 <= x < 8 and 0 <= y < 8:
+                    p = self.grid[y][x]
+                    if isinstance(p, King) and p.color == attacker_color:
+                        return True
+        return False
+
+
+    def _would_cause_check(self, from_pos, to_pos):
+    # 체크 유발되는 수가 있는지 검사 (복사 없이 make → 검사 → unmake)
+        color = self.grid[from_pos[1]][from_pos[0]].color
+        self.make_move(from_pos, to_pos)
+        in_check = self.is_in_check(color)
+        self.unmake_move()
+        return in_check
+
+    def legal_moves(self, color, from_pos=None):
+        # color 의 모든 합법수 [(from_pos, to_pos, promotion), ...]
+        # from_pos 를 주면 그 칸의 기물 수만
+        entry = self._cache_entry(color)
+        if entry is not None:
+            if entry[0] is None:
+                entry[0] = tuple(self._compute_legal_moves(color))
+            if from_pos is None:
+                return list(entry[0])
+            return [m for m in entry[0] if m[0] == from_pos]
+        return self._compute_legal_moves(color, from_pos)
+
+    def _compute_legal_moves(self, color, from_pos=None):
+        if self.bb is not None:
+            return list(self._gen_legal(color, from_pos))
+        moves = []
+        if from_pos is not None:
+            p = self.piece_lists[color].get(from_pos)
+            pieces = [(from_pos, p)] if p else []
+        else:
+            pieces = self.pieces_of(color) # get_valid_moves 가 make/unmake 하므로 사본으로 돈다
+        for pos, p in pieces:
+            for to in p.get_valid_moves(pos, self):
+                if isinstance(p, Pawn) and to[1] in (0, 7):
+                    moves += [(pos, to, promo) for promo in PROMOTIONS]
+                else:
+                    moves.append((pos, to, None))
+        return moves
+
+    def legal_targets(self, pos):
+        # pos 기물이 갈 수 있는 칸 목록 (승진 종류는 하나로 합침)
+        piece = self.grid[pos[1]][pos[0]]
+        if not piece:
+            return []
+        if (piece.color == 'white') == self.white_to_move:
+            return list(self.move_table()[2].get(pos, ()))
+        targets = []
+        for _, to, promo in self.legal_moves(piece.color, pos):
+            if promo is None or promo == PROMOTIONS[0]:
+                targets.append(to)
+        return targets
+
+    def _gen_legal(self, color, from_pos=None):
+        # 비트보드 합법수 생성기: 체크·핀을 포지션당 한 번 계산하고 합법수만 내보낸다
+        bb = self.bb
+        us = COLOR_INDEX[color]; them = us ^ 1
+        mine, theirs = bb.pieces[us], bb.pieces[them]
+        occ, own = bb.all, bb.occ[us]
+        only = FULL if from_pos is None else 1 << (from_pos[1]*8 + from_pos[0])
+        their_rq = theirs[ROOK] | theirs[QUEEN]
+        their_bq = theirs[BISHOP] | theirs[QUEEN]
+
+        kpos = self.king_pos[color]
+        ksq = None if kpos is None else kpos[1]*8 + kpos[0]
+        checkers, evasion, pinned = 0, FULL, {}
+        if ksq is not None:
+            checkers = bb.attackers(ksq, them)
+            # 1) 킹 이동: 킹을 뺀 점유로 검사해야 슬라이더 방향으로 물러나는 수를 막는다
+            if only >> ksq & 1:
+                occ_wo_king = occ ^ (1 << ksq)
+                for t in iter_bits(KING_ATTACKS[ksq] & ~own):
+                    if not bb.attackers(t, them, occ_wo_king):
+                        yield (kpos, (t % 8, t // 8), None)
+                if not checkers and self.castling & (CASTLE_WK | CASTLE_WQ if us == WHITE else CASTLE_BK | CASTLE_BQ):
+                    if self._can_castle_kingside(color): yield (kpos, (kpos[0]+2, kpos[1]), None)
+                    if self._can_castle_queenside(color): yield (kpos, (kpos[0]-2, kpos[1]), None)
+            # 2) 더블 체크면 킹만 움직일 수 있다
+            if checkers & (checkers - 1):
+                return
+            # 3) 싱글 체크: 체커를 잡거나 사이 칸을 막는 수만
+            if checkers:
+                evasion = checkers | BETWEEN[ksq][lsb(checkers)]
+            # 4) 핀: 킹과 상대 슬라이더 사이에 내 기물이 정확히 하나
+            snipers = (rook_attacks(ksq, 0) & their_rq) | (bishop_attacks(ksq, 0) & their_bq)
+            for s in iter_bits(snipers):
+                between = BETWEEN[ksq][s] & occ
+                if between and not between & (between - 1) and between & own:
+                    pinned[lsb(between)] = LINE[ksq][s]
+
+        # 5) 킹 이외 기물
+        last_rank = 0 if us == WHITE else 7
+        for pi in (PAWN, KNIGHT, BISHOP, ROOK, QUEEN):
+            for sq in iter_bits(mine[pi] & only):
+                if pi == PAWN:
+                    mask = bb.pawn_targets(sq, us)
+                else:
+                    mask = bb.targets(sq, us, pi)
+                mask &= evasion & pinned.get(sq, FULL)
+                src = (sq % 8, sq // 8)
+                for t in iter_bits(mask):
+                    to = (t % 8, t // 8)
+                    if pi == PAWN and to[1] == last_rank:
+                        for promo in PROMOTIONS:
+                            yield (src, to, promo)
+                    else:
+                        yield (src, to, None)
+
+        # 6) 앙파상: 두 폰이 동시에 빠지는 수평 핀까지 점유를 바꿔서 직접 검사
+        ep = self.ep_square if (color == 'white') == self.white_to_move else None
+        if ep is not None:
+            t = ep[1]*8 + ep[0]
+            cap = t + 8 if us == WHITE else t - 8
+            for sq in iter_bits(PAWN_ATTACKS[them][t] & mine[PAWN] & only):
+                if ksq is not None:
+                    occ2 = (occ ^ (1 << sq) ^ (1 << cap)) | (1 << t)
+                    if rook_attacks(ksq, occ2) & their_rq or bishop_attacks(ksq, occ2) & their_bq:
+                        continue
+                    if checkers & ~(1 << cap) & (theirs[KNIGHT] | theirs[PAWN]):
+                        continue
+                yield ((sq % 8, sq // 8), ep, None)
+
+    def has_any_legal_moves(self, color):
+    # 스테일메이트(무승부) 검사
+        entry = self._cache_entry(color)
+        if entry is not None and entry[0] is not None:
+            return bool(entry[0])
+        if self.bb is not None:
+            # 첫 합법수가 나오면 바로 종료
+            return next(self._gen_legal(color), None) is not None
+        for pos, p in self.pieces_of(color):
+            if p.get_valid_moves(pos, self):
+                return True
+        return False
+
+    def is_checkmate(self, color):
+        # 체크메이트
+        if (color == 'white') == self.white_to_move:
+            return self.status() == 'checkmate'
+        return self.is_in_check(color) and not self.has_any_legal_moves(color)
+
+    def is_stalemate(self, color):
+        # 스테일메이트
+        if (color == 'white') == self.white_to_move:
+            return self.status() == 'stalemate'
+        return not self.is_in_check(color) and not self.has_any_legal_moves(color)
+
+    def is_threefold_repetition(self):
+        # 현재 포지션이 3번째 등장했는가 (해시 카운터 조회 한 번)
+        return self.repetitions.get(self.hash, 0) >= 3
+
+    def is_fifty_move_draw(self):
+        # 폰 이동·캡처 없이 50수(100 반수)
+        return self.halfmove_clock >= 100
+
+    def _can_castle_kingside(self, color):
+        y = 7 if color == 'white' else 0
+        king = self.grid[y][4]
+        rook = self.grid[y][7]
+        # 1) King·Rook 존재 및 캐슬링 권한
+        # 2) 중간 칸(5,6)이 비어야 함
+        # 3) (4,5,6)칸이 공격받지 않아야 함
+       
+        if not (isinstance(king, King) and isinstance(rook, Rook)):
+            return False
+       
+        if not self.castling & (CASTLE_WK if color == 'white' else CASTLE_BK):
+            return False
+        
+        for x in (5, 6):
+            if self.grid[y][x] is not None:
+                return False
+       
+        enemy = 'black' if color == 'white' else 'white'
+        for x in (4, 5, 6):
+            if self._square_attacked((x, y), enemy):
+                return False
+        return True
+
+    def _can_castle_queenside(self, color):
+        # 유사 로직, 칸 인덱스(1,2,3) 및 (2,3,4) 체크
+        y = 7 if color == 'white' else 0
+        king = self.grid[y][4]
+        rook = self.grid[y][0]
+        if not (isinstance(king, King) and isinstance(rook, Rook)):
+            return False
+        if not self.castling & (CASTLE_WQ if color == 'white' else CASTLE_BQ):
+            return False
+       
+        for x in (1, 2, 3):
+            if self.grid[y][x] is not None:
+                return False
+        
+        enemy = 'black' if color == 'white' else 'white'
+        for x in (2, 3, 4):
+            if self._square_attacked((x, y), enemy):
+                return False
+        return True
+
@@ -0,0 +1,391 @@
+import argparse
+import queue
+import threading
+import time
+
+from board import Board, move_name
+from bitboard import PTYPE_INDEX
+from evaluation import evaluate, PIECE_VALUES
+import tablebase
+
+# ─── 점수 상수 ──────────────────────────────────────
+MATE    = 100000 # 메이트 점수 (MATE - ply 로 빠른 메이트 선호)
+INF     = 1000000
+MAX_PLY = 128
+
+# TT 경계 종류
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class SearchTimeout(Exception):
+    # 시간·노드 예산 초과 또는 stop() → 현재 반복을 버리고 이전 깊이 결과 사용
+    pass
+
+
+class TranspositionTable:
+    # 고정 크기 배열, 인덱스 = hash & mask
+    # 항목: (key, depth, score, flag, move, generation)
+    def __init__(self, size_bits=18):
+        self.size       = 1 << size_bits
+        self.mask       = self.size - 1
+        self.entries    = [None] * self.size
+        self.generation = 0
+
+    def probe(self, key):
+        entry = self.entries[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, score, flag, move):
+        idx = key & self.mask
+        old = self.entries[idx]
+        # 교체 정책: 빈 칸 / 같은 포지션 / 이전 탐색의 항목 / 같거나 더 깊은 탐색이면 덮어쓴다
+        if old is None or old[0] == key or old[5] != self.generation or depth >= old[1]:
+            if move is None and old is not None and old[0] == key:
+                move = old[4] # 수 정보가 없으면 기존 최선수 유지
+            self.entries[idx] = (key, depth, score, flag, move, self.generation)
+
+    def new_search(self):
+        self.generation += 1
+
+    def clear(self):
+        self.entries = [None] * self.size
+        self.generation = 0
+
+
+class SearchResult:
+    def __init__(self, move, score, depth, nodes, elapsed, infos, pv=None):
+        self.move    = move # (from, to, promotion) 또는 None (둘 수 없는 포지션)
+        self.score   = score # 차례인 쪽 기준 센티폰
+        self.depth   = depth
+        self.nodes   = nodes
+        self.elapsed = elapsed
+        self.infos   = infos # 반복마다의 info dict 목록
+        self.pv      = pv or ([move] if move else []) # 마지막으로 끝낸 깊이의 PV (수 튜플)
+
+
+def format_info(info):
+    # UCI info 줄과 같은 모양으로
+    score = info['score']
+    if abs(score) >= MATE - MAX_PLY:
+        plies = MATE - abs(score)
+        score_text = f"mate {(plies + 1) // 2 if score > 0 else -((plies + 1) // 2)}"
+    else:
+        score_text = f"cp {score}"
+    return (f"info depth {info['depth']} score {score_text} nodes {info['nodes']} "
+            f"nps {info['nps']} time {int(info['time'] * 1000)} pv {' '.join(info['pv'])}")
+
+
+class Engine:
+    def __init__(self, tt_bits=18):
+        self.tt       = TranspositionTable(tt_bits)
+        self.killers  = [[None, None] for _ in range(MAX_PLY)]
+        self.history  = {} # (from, to) → 컷오프 가중치
+        self.nodes    = 0
+        self.deadline = None
+        self.node_limit = None
+        self.root_moves = None
+        self.soft_deadline  = None # 반복 종료 후 다음 깊이를 시작하지 않을 시각
+        self.stop_requested = False # 다른 스레드에서 stop() 으로 세움
+        self.tb_pieces = tablebase.max_pieces() # 이 기물 수 이하면 엔드게임 테이블 조회 (0 = 표 없음)
+
+    # ─── 공개 API ──────────────────────────────────
+    def search(self, board, max_depth=64, time_limit=None, node_limit=None, on_iteration=None, moves=None):
+        # 반복 심화: 깊이 1 부터 예산이 남는 동안 깊게
+        # moves: 루트에서 이 수들만 탐색 (병렬 탐색의 루트 분할용)
+        color = 'white' if board.white_to_move else 'black'
+        root_moves = board.legal_moves(color) if moves is None else list(moves)
+        self.root_moves = None if moves is None else root_moves
+        start = time.perf_counter()
+        self.nodes = 0
+        self.deadline = start + time_limit if time_limit else None
+        self.soft_deadline = start + time_limit * 0.5 if time_limit else None
+        self.node_limit = node_limit
+        self.tt.new_search()
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = {}
+
+        # 표에 있는 엔드게임은 탐색 없이 표의 최선수
+        if moves is None and self.tb_pieces and board.piece_count() <= self.tb_pieces:
+            hit = tablebase.best_move(board)
+            if hit is not None:
+                move, wdl, dtm = hit
+                score = wdl * (MATE - dtm) if wdl else 0
+                elapsed = time.perf_counter() - start
+                info = {'depth': 0, 'score': score, 'nodes': 0, 'nps': 0,
+                        'time': elapsed, 'pv': [move_name(move)]}
+                return SearchResult(move, score, 0, 0, elapsed, [info])
+
+        best_move = root_moves[0] if root_moves else None
+        best_score, best_depth, infos, pv = 0, 0, [], []
+        base = len(board.undo_stack)
+        # 수가 하나뿐이면 탐색 생략 (단, 루트 분할이면 점수가 필요하므로 탐색)
+        if len(root_moves) > 1 or (root_moves and moves is not None):
+            for depth in range(1, max_depth + 1):
+                try:
+                    score = self._negamax(board, depth, -INF, INF, 0)
+                except SearchTimeout:
+                    # 예산 초과 → 탐색 중 둔 수들을 모두 되돌리고 이전 깊이 결과 사용
+                    while len(board.undo_stack) > base:
+                        board.unmake_move()
+                    break
+                entry = self.tt.probe(board.hash)
+                if entry is not None and entry[4] is not None:
+                    best_move = entry[4]
+                best_score, best_depth = score, depth
+                pv = self.principal_variation(board, depth)
+                elapsed = time.perf_counter() - start
+                info = {'depth': depth, 'score': score, 'nodes': self.nodes,
+                        'nps': int(self.nodes / elapsed) if elapsed > 0 else 0,
+                        'time': elapsed, 'pv': [move_name(m) for m in pv]}
+                infos.append(info)
+                if on_iteration:
+                    on_iteration(info)
+                if abs(score) >= MATE - MAX_PLY:
+                    break # 메이트를 찾음
+                if self.soft_deadline and time.perf_counter() > self.soft_deadline:
+                    break # 다음 깊이는 끝내지 못할 가능성이 큼
+        elapsed = time.perf_counter() - start
+        return SearchResult(best_move, best_score, best_depth, self.nodes, elapsed, infos, pv)
+
+    def stop(self):
+        # 다른 스레드에서 호출: 진행 중인 탐색을 마지막으로 끝낸 깊이 결과로 종료
+        self.stop_requested = True
+
+    def ponderhit(self, time_limit):
+        # 시간 제한 없이 폰더링하던 탐색에 지금부터의 시간 예산을 건다
+        now = time.perf_counter()
+        self.soft_deadline = now + time_limit * 0.5
+        self.deadline = now + time_limit
+
+    def principal_variation(self, board, max_len):
+        # TT 최선수를 따라가며 PV 재구성 (합법성 확인 후 make/unmake)
+        pv = []
+        for _ in range(max_len):
+            entry = self.tt.probe(board.hash)
+            if entry is None or entry[4] is None:
+                break
+            move = entry[4]
+            color = 'white' if board.white_to_move else 'black'
+            if move not in board.legal_moves(color, move[0]):
+                break
+            pv.append(move)
+            board.make_move(*move)
+        for _ in pv:
+            board.unmake_move()
+        return pv
+
+    # ─── 탐색 ──────────────────────────────────────
+    def _tick(self):
+        self.nodes += 1
+        if self.stop_requested:
+            raise SearchTimeout()
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchTimeout()
+        if self.deadline is not None and self.nodes & 1023 == 0 and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+
+    def _negamax(self, board, depth, alpha, beta, ply):
+        self._tick()
+        # 반복·50수 무승부 (루트 제외)
+        if ply > 0 and (board.repetitions.get(board.hash, 0) >= 2 or board.halfmove_clock >= 100):
+            return 0
+        # 엔드게임 테이블: 정확한 메이트 거리
+        if ply > 0 and self.tb_pieces and board.piece_count() <= self.tb_pieces:
+            hit = board.probe_tablebase()
+            if hit is not None:
+                wdl, dtm = hit
+                return wdl * (MATE - ply - dtm) if wdl else 0
+        color = 'white' if board.white_to_move else 'black'
+        in_check = board.is_in_check(color)
+        if in_check and ply < MAX_PLY // 2:
+            depth += 1 # 체크 연장
+        if depth <= 0 or ply >= MAX_PLY - 1:
+            return self._quiesce(board, alpha, beta, ply)
+
+        key = board.hash
+        tt_move = None
+        entry = self.tt.probe(key)
+        if entry is not None:
+            tt_move = entry[4]
+            if ply > 0 and entry[1] >= depth:
+                score = _from_tt(entry[2], ply)
+                flag = entry[3]
+                if flag == EXACT:
+                    return score
+                if flag == LOWER and score >= beta:
+                    return score
+                if flag == UPPER and score <= alpha:
+                    return score
+
+        moves = self.root_moves if ply == 0 and self.root_moves is not None else board.legal_moves(color)
+        if not moves:
+            return -MATE + ply if in_check else 0
+
+        alpha0 = alpha
+        best, best_move = -INF, None
+        for move in self._order_moves(board, moves, tt_move, ply):
+            board.make_move(*move)
+            score = -self._negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            board.unmake_move()
+            if score > best:
+                best, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        if not self._is_capture(board, move):
+                            self._remember_quiet(move, depth, ply)
+                        break
+
+        if best <= alpha0:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(key, depth, _to_tt(best, ply), flag, best_move)
+        return best
+
+    def _quiesce(self, board, alpha, beta, ply):
+        # 잡는 수(와 퀸 승진)만 계속 읽어 수평선 효과 완화
+        self._tick()
+        stand = evaluate(board)
+        if stand >= beta:
+            return stand
+        if stand > alpha:
+            alpha = stand
+        color = 'white' if board.white_to_move else 'black'
+        noisy = [m for m in board.legal_moves(color) if m[2] == 'queen' or self._is_capture(board, m)]
+        noisy.sort(key=lambda m: self._mvv_lva(board, m), reverse=True)
+        for move in noisy:
+            board.make_move(*move)
+            score = -self._quiesce(board, -beta, -alpha, ply + 1)
+            board.unmake_move()
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    # ─── 수 정렬 ────────────────────────────────────
+    def _is_capture(self, board, move):
+        (fx, fy), (tx, ty), _ = move
+        if board.grid[ty][tx] is not None:
+            return True
+        # 앙파상: 폰이 빈 앙파상 칸으로 대각선 이동
+        return board.ep_square == (tx, ty) and fx != tx and board.grid[fy][fx].ptype == 'pawn'
+
+    def _mvv_lva(self, board, move):
+        # 가장 값진 피해자, 가장 싼 공격자 먼저
+        (fx, fy), (tx, ty), promo = move
+        victim = board.grid[ty][tx]
+        victim_value = PIECE_VALUES[PTYPE_INDEX[victim.ptype]] if victim else PIECE_VALUES[0]
+        attacker_value = PIECE_VALUES[PTYPE_INDEX[board.grid[fy][fx].ptype]]
+        score = victim_value * 10 - attacker_value
+        if promo:
+            score += PIECE_VALUES[PTYPE_INDEX[promo]] * 10
+        return score
+
+    def _order_moves(self, board, moves, tt_move, ply):
+        # TT 수 → 잡는 수(MVV-LVA) → 승진 → 킬러 → history
+        killers = self.killers[ply]
+        scored = []
+        for move in moves:
+            if move == tt_move:
+                score = 10_000_000
+            elif self._is_capture(board, move) or move[2]:
+                score = 1_000_000 + self._mvv_lva(board, move)
+            elif move == killers[0]:
+                score = 900_000
+            elif move == killers[1]:
+                score = 800_000
+            else:
+                score = self.history.get((move[0], move[1]), 0)
+            scored.append((score, move))
+        scored.sort(key=lambda t: t[0], reverse=True)
+        return [m for _, m in scored]
+
+    def _remember_quiet(self, move, depth, ply):
+        # 베타 컷을 낸 조용한 수 → 킬러·history 갱신
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        key = (move[0], move[1])
+        self.history[key] = self.history.get(key, 0) + depth * depth
+
+
+class BackgroundSearch:
+    # 엔진 탐색을 백그라운드 스레드에서 돌리고, 결과는 queue 로 메인 루프에 넘긴다
+    # 탐색은 보드 사본에서 하므로 메인 스레드는 원래 보드를 그대로 그리고 조작할 수 있다
+    def __init__(self, engine):
+        self.engine  = engine
+        self.results = queue.Queue() # (tag, SearchResult)
+        self.thread  = None
+
+    def start(self, board, time_limit=None, tag=None, ponder_move=None, max_depth=64):
+        # ponder_move 가 있으면 그 수를 둔 뒤의 포지션을 시간 제한 없이 탐색 (폰더링)
+        self.stop(wait=True)
+        work = board.copy()
+        if ponder_move is not None:
+            work.make_move(*ponder_move)
+        self.engine.stop_requested = False
+        self.thread = threading.Thread(target=self._run, args=(work, time_limit, tag, max_depth), daemon=True)
+        self.thread.start()
+
+    def _run(self, board, time_limit, tag, max_depth):
+        result = self.engine.search(board, max_depth, time_limit)
+        self.results.put((tag, result))
+
+    def busy(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def stop(self, wait=False):
+        # 진행 중인 탐색 중단 (결과는 그래도 queue 로 들어온다)
+        if self.busy():
+            self.engine.stop()
+            if wait:
+                self.thread.join()
+
+    def poll(self):
+        # 메인 루프에서 매 프레임 호출: 끝난 탐색 결과 하나 또는 None
+        try:
+            return self.results.get_nowait()
+        except queue.Empty:
+            return None
+
+
+def _to_tt(score, ply):
+    # 메이트 점수는 “현재 노드로부터의 거리”로 저장
+    if score >= MATE - MAX_PLY:
+        return score + ply
+    if score <= -MATE + MAX_PLY:
+        return score - ply
+    return score
+
+
+def _from_tt(score, ply):
+    if score >= MATE - MAX_PLY:
+        return score - ply
+    if score <= -MATE + MAX_PLY:
+        return score + ply
+    return score
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='알파-베타 탐색 엔진')
+    parser.add_argument('--fen', default=None, help='시작 포지션 (기본: 초기 배치)')
+    parser.add_argument('--depth', type=int, default=64)
+    parser.add_argument('--time', type=float, default=5.0, help='초 단위 시간 예산')
+    parser.add_argument('--nodes', type=int, default=None, help='노드 예산')
+    args = parser.parse_args(argv)
+
+    board = Board.from_fen(args.fen) if args.fen else Board()
+    result = Engine().search(board, args.depth, args.time, args.nodes,
+                             on_iteration=lambda info: print(format_info(info), flush=True))
+    print('bestmove', move_name(result.move) if result.move else '(none)')
+
+
+if __name__ == '__main__':
+    main()
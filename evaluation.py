@@ -0,0 +1,217 @@
+from bitboard import (PTYPE_INDEX, PAWN, KNIGHT, BISHOP, ROOK, QUEEN,
+                      ROOK_DIRS, BISHOP_DIRS)
+
+# numpy 는 배치 평가를 처음 부를 때 임포트한다 (탐색용 evaluate 는 순수 파이썬,
+# 엔진·헤드리스 도구의 시작 시간에 numpy 임포트 ~100ms 를 더하지 않는다)
+np = None
+
+# ─── 기물 가치 (센티폰) ─────────────────────────────
+# bitboard.PTYPES 순서: pawn, knight, bishop, rook, queen, king
+PIECE_VALUES = [100, 320, 330, 500, 900, 0]
+
+# ─── 기물-칸 점수표 (흰색 기준, sq = y*8 + x, y=0 이 8랭크) ──
+# 검은색은 sq ^ 56 (위아래 뒤집기) 으로 같은 표를 쓴다
+PST = [
+    # pawn
+    [  0,  0,  0,  0,  0,  0,  0,  0,
+      50, 50, 50, 50, 50, 50, 50, 50,
+      10, 10, 20, 30, 30, 20, 10, 10,
+       5,  5, 10, 25, 25, 10,  5,  5,
+       0,  0,  0, 20, 20,  0,  0,  0,
+       5, -5,-10,  0,  0,-10, -5,  5,
+       5, 10, 10,-20,-20, 10, 10,  5,
+       0,  0,  0,  0,  0,  0,  0,  0],
+    # knight
+    [-50,-40,-30,-30,-30,-30,-40,-50,
+     -40,-20,  0,  0,  0,  0,-20,-40,
+     -30,  0, 10, 15, 15, 10,  0,-30,
+     -30,  5, 15, 20, 20, 15,  5,-30,
+     -30,  0, 15, 20, 20, 15,  0,-30,
+     -30,  5, 10, 15, 15, 10,  5,-30,
+     -40,-20,  0,  5,  5,  0,-20,-40,
+     -50,-40,-30,-30,-30,-30,-40,-50],
+    # bishop
+    [-20,-10,-10,-10,-10,-10,-10,-20,
+     -10,  0,  0,  0,  0,  0,  0,-10,
+     -10,  0,  5, 10, 10,  5,  0,-10,
+     -10,  5,  5, 10, 10,  5,  5,-10,
+     -10,  0, 10, 10, 10, 10,  0,-10,
+     -10, 10, 10, 10, 10, 10, 10,-10,
+     -10,  5,  0,  0,  0,  0,  5,-10,
+     -20,-10,-10,-10,-10,-10,-10,-20],
+    # rook
+    [  0,  0,  0,  0,  0,  0,  0,  0,
+       5, 10, 10, 10, 10, 10, 10,  5,
+      -5,  0,  0,  0,  0,  0,  0, -5,
+      -5,  0,  0,  0,  0,  0,  0, -5,
+      -5,  0,  0,  0,  0,  0,  0, -5,
+      -5,  0,  0,  0,  0,  0,  0, -5,
+      -5,  0,  0,  0,  0,  0,  0, -5,
+       0,  0,  0,  5,  5,  0,  0,  0],
+    # queen
+    [-20,-10,-10, -5, -5,-10,-10,-20,
+     -10,  0,  0,  0,  0,  0,  0,-10,
+     -10,  0,  5,  5,  5,  5,  0,-10,
+      -5,  0,  5,  5,  5,  5,  0, -5,
+       0,  0,  5,  5,  5,  5,  0, -5,
+     -10,  5,  5,  5,  5,  5,  0,-10,
+     -10,  0,  5,  0,  0,  0,  0,-10,
+     -20,-10,-10, -5, -5,-10,-10,-20],
+    # king (중반)
+    [-30,-40,-40,-50,-50,-40,-40,-30,
+     -30,-40,-40,-50,-50,-40,-40,-30,
+     -30,-40,-40,-50,-50,-40,-40,-30,
+     -30,-40,-40,-50,-50,-40,-40,-30,
+     -20,-30,-30,-40,-40,-30,-30,-20,
+     -10,-20,-20,-20,-20,-20,-20,-10,
+      20, 20,  0,  0,  0,  0, 20, 20,
+      20, 30, 10,  0,  0, 10, 30, 20],
+]
+
+# 색·종류·칸 → 가치+점수 (흰색 +, 검은색 -) 를 미리 합쳐 둔 표
+SQUARE_SCORES = [[[(PIECE_VALUES[pi] + PST[pi][sq]) for sq in range(64)] for pi in range(6)],
+                 [[-(PIECE_VALUES[pi] + PST[pi][sq ^ 56]) for sq in range(64)] for pi in range(6)]]
+
+
+def evaluate(board):
+    # 정적 평가 (센티폰, 차례인 쪽 기준 → negamax 에서 그대로 사용)
+    # 재료 + 기물-칸 점수는 Board 가 기물을 놓고 뺄 때마다 psq_score 에 증분으로 더해 둔다
+    score = board.psq_score
+    return score if board.white_to_move else -score
+
+
+# ─── 배치 평가 (numpy) ───────────────────────────────
+# 포지션 N 개를 (N, 64) int8 배열로: 0 = 빈칸, 흰색 +(종류+1), 검은색 -(종류+1) (종류는 bitboard.PTYPES 순서)
+# 재료·PST 에 기동력(의사합법 도착 칸 수)과 폰 구조(겹폰·고립폰·통과폰)를 더한 분석용 평가
+# 탐색은 위의 evaluate 를 쓰고, Board.evaluate() 는 이 함수를 포지션 1개로 부른다
+MOBILITY_WEIGHTS = {KNIGHT: 4, BISHOP: 5, ROOK: 2, QUEEN: 1} # 도착 칸 하나당 센티폰
+DOUBLED_PAWN  = -10
+ISOLATED_PAWN = -15
+PASSED_PAWN   = [0, 10, 15, 25, 40, 60, 90, 0] # 자기 쪽에서 센 랭크 (0 = 1랭크)
+KNIGHT_OFFSETS = [(2,1),(2,-1),(-2,1),(-2,-1),(1,2),(1,-2),(-1,2),(-1,-2)]
+
+# 스냅샷 칸 코드 (0, 1 + 색*6 + 종류) → 부호 있는 코드
+SNAPSHOT_TO_SIGNED = [0] + [pi + 1 for pi in range(6)] + [-(pi + 1) for pi in range(6)]
+
+
+def _require_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError('배치 평가에는 numpy 가 필요합니다 (pip install numpy)') from None
+        np = numpy
+
+
+_tables = None
+
+
+def _batch_tables():
+    # numpy 표는 처음 쓸 때 한 번만 만든다
+    global _tables
+    if _tables is None:
+        _require_numpy()
+        scores = np.zeros((13, 64), dtype=np.int32) # [부호 코드 + 6, sq]
+        for pi in range(6):
+            scores[6 + pi + 1] = SQUARE_SCORES[0][pi]
+            scores[6 - pi - 1] = SQUARE_SCORES[1][pi]
+        _tables = {
+            'scores': scores,
+            'snapshot': np.array(SNAPSHOT_TO_SIGNED, dtype=np.int8),
+            'passed': np.array(PASSED_PAWN, dtype=np.int32),
+        }
+    return _tables
+
+
+def encode_boards(boards):
+    # [Board] → ((N, 64) int8 칸 배열, (N,) bool 흰색 차례)
+    _require_numpy()
+    squares = np.zeros((len(boards), 64), dtype=np.int8)
+    for n, board in enumerate(boards):
+        row = squares[n]
+        for color, sign in (('white', 1), ('black', -1)):
+            for (x, y), p in board.piece_lists[color].items():
+                row[y*8 + x] = sign * (PTYPE_INDEX[p.ptype] + 1)
+    return squares, np.array([b.white_to_move for b in boards], dtype=bool)
+
+
+def encode_snapshots(snapshots):
+    # [Board.to_snapshot() 바이트] → encode_boards 와 같은 배열 (Board 를 만들지 않음)
+    t = _batch_tables()
+    raw = np.frombuffer(b''.join(snapshots), dtype=np.uint8).reshape(len(snapshots), -1)
+    squares = t['snapshot'][raw[:, -64:]]
+    return squares, (raw[:, 0] & 0x10) == 0
+
+
+def _shift(a, dx, dy):
+    # (N, 8, 8) [y, x] 배열을 (dx, dy) 만큼 민다, 판 밖으로 나간 칸은 버리고 빈 자리는 0
+    out = np.zeros_like(a)
+    out[:, max(dy, 0):8 + min(dy, 0), max(dx, 0):8 + min(dx, 0)] = \
+        a[:, max(-dy, 0):8 + min(-dy, 0), max(-dx, 0):8 + min(-dx, 0)]
+    return out
+
+
+def _mobility(weights, white, black, empty, offsets, sliding):
+    # weights: (N, 8, 8) 기물 칸의 가중치 (흰색 +, 검은색 -), 나머지 0
+    # 방향마다 배열째로 한 칸씩 밀면서 자기 기물이 아닌 도착 칸을 센다 (슬라이더는 빈칸에서만 계속)
+    total = np.zeros(len(weights), dtype=np.int32)
+    for dx, dy in offsets:
+        w = weights
+        for _ in range(7 if sliding else 1):
+            w = _shift(w, dx, dy)
+            valid = np.where(w > 0, ~white, ~black)
+            total += (w * valid).sum(axis=(1, 2), dtype=np.int32)
+            w = w * empty
+            if not w.any():
+                break
+    return total
+
+
+def _pawn_structure(pawns, enemy_pawns, forward):
+    # pawns/enemy_pawns: (N, 8, 8) bool [y, x], forward: 전진 방향으로 본 행 순서로 뒤집은 배열
+    # → 겹폰·고립폰·통과폰 점수 (N,)
+    t = _batch_tables()
+    files = pawns.sum(axis=1) # (N, 8) 파일별 폰 수
+    doubled = np.maximum(files - 1, 0).sum(axis=1)
+    has = files > 0
+    neighbours = np.zeros_like(has)
+    neighbours[:, 1:] |= has[:, :-1]
+    neighbours[:, :-1] |= has[:, 1:]
+    isolated = (files * ~neighbours).sum(axis=1)
+    # 통과폰: 앞쪽(자기 진행 방향) 같은·옆 파일에 상대 폰이 없음
+    own, enemy = pawns[:, forward], enemy_pawns[:, forward] # 행 0 = 가장 앞(승진 줄)
+    spread = enemy.copy()
+    spread[:, :, 1:] |= enemy[:, :, :-1]
+    spread[:, :, :-1] |= enemy[:, :, 1:]
+    ahead = np.logical_or.accumulate(spread, axis=1)
+    blocked = np.zeros_like(ahead)
+    blocked[:, 1:] = ahead[:, :-1]
+    passed = own & ~blocked
+    # 행 r (앞에서 r 번째) 은 자기 쪽 랭크 7 - r
+    bonus = (passed.sum(axis=2) * t['passed'][::-1]).sum(axis=1)
+    return doubled * DOUBLED_PAWN + isolated * ISOLATED_PAWN + bonus
+
+
+def evaluate_batch(squares, white_to_move):
+    # (N, 64) 칸 배열 + (N,) 차례 → (N,) int32 점수 (센티폰, 차례인 쪽 기준)
+    t = _batch_tables()
+    squares = np.asarray(squares, dtype=np.int8)
+    n = len(squares)
+    # 1) 재료 + 기물-칸 점수표
+    score = t['scores'][squares.astype(np.intp) + 6, np.arange(64)].sum(axis=1)
+    # 2) 기동력 (부호 있는 가중치 배열을 방향별로 밀어 한 번에 흰색·검은색)
+    board = squares.reshape(n, 8, 8)
+    white, black, empty = board > 0, board < 0, board == 0
+    kind = np.abs(board)
+    sign = np.sign(board).astype(np.int16)
+    weight = {pi: sign * (kind == pi + 1) * w for pi, w in MOBILITY_WEIGHTS.items()}
+    score += _mobility(weight[KNIGHT], white, black, empty, KNIGHT_OFFSETS, False)
+    score += _mobility(weight[ROOK] + weight[QUEEN], white, black, empty, ROOK_DIRS, True)
+    score += _mobility(weight[BISHOP] + weight[QUEEN], white, black, empty, BISHOP_DIRS, True)
+    # 3) 폰 구조 (흰색은 y 가 작을수록 앞, 검은색은 반대)
+    wp = (squares == PAWN + 1).reshape(n, 8, 8)
+    bp = (squares == -(PAWN + 1)).reshape(n, 8, 8)
+    score += _pawn_structure(wp, bp, slice(None))
+    score -= _pawn_structure(bp, wp, slice(None, None, -1))
+    return np.where(np.asarray(white_to_move, dtype=bool), score, -score).astype(np.int32)
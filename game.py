@@ -1,292 +1,533 @@
-﻿import os
-import sys
-import pygame
-from board import Board
-from pieces import Pawn, Queen, Rook, Bishop, Knight, IMAGE_FILES
-
-# ─── frozen vs. 개발 환경 분기 ─────────────────────────
-if getattr(sys, 'frozen', False):
-    # PyInstaller onefile 로 묶였을 때
-    BASE_DIR = sys._MEIPASS
-else:
-    # .py로 실행할 때
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-
-
-# ─── assets 폴더 위치 결정 ────────────────────────────
-# 기본: BASE_DIR/../assets
-ASSETS_DIR = os.path.normpath(os.path.join(BASE_DIR, '..', 'assets'))
-# 없으면: BASE_DIR/assets
-if not os.path.isdir(ASSETS_DIR):
-    alt = os.path.join(BASE_DIR, 'assets')
-    if os.path.isdir(alt):
-        ASSETS_DIR = alt
-    else:
-        raise FileNotFoundError(f"assets 폴더를 찾을 수 없습니다: {ASSETS_DIR!r} 또는 {alt!r}") 
-
-# ─── 리소스 경로 상수 ─────────────────────────────────
-BOARD_IMG_PATH = os.path.join(ASSETS_DIR,    'board.png')
-PIECES_DIR     = os.path.join(ASSETS_DIR, 'pieces')
-
-# ─── 상수 정의 ─────────────────────────────────────────
-WINDOW_SIZE   = 640
-SQUARE_SIZE   = WINDOW_SIZE // 8
-PANEL_WIDTH   = 200
-SCREEN_WIDTH  = WINDOW_SIZE + PANEL_WIDTH
-SCREEN_HEIGHT = WINDOW_SIZE
-
-class Button:
-    def __init__(self, rect, text, font, callback):
-        self.rect      = pygame.Rect(rect)
-        self.text      = text
-        self.font      = font
-        self.callback  = callback
-        self.text_surf = font.render(text, True, (255,255,255))
-        self.text_rect = self.text_surf.get_rect(center=self.rect.center)
-
-    def draw(self, screen):
-        pygame.draw.rect(screen, (70,70,70), self.rect)
-        pygame.draw.rect(screen, (200,200,200), self.rect, 2)
-        screen.blit(self.text_surf, self.text_rect)
-
-    def handle_event(self, event):
-        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            if self.rect.collidepoint(event.pos):
-                self.callback()
-
-class Game:
-    def __init__(self):
-        pygame.init()
-        self.screen    = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Python Chess")
-        self.clock     = pygame.time.Clock()
-        self.font      = pygame.font.SysFont(None, 24)
-        self.restart_game = False
-
-        # 보드 이미지 로드 & 스케일
-        board_img_orig = pygame.image.load(BOARD_IMG_PATH)
-        self.board_img = pygame.transform.scale(board_img_orig, (WINDOW_SIZE, WINDOW_SIZE))
-
-        # 체스판 로직 초기화
-        self.board    = Board()
-        self.selected = None
-
-    def prompt_promotion(self, color):
-        # 1) 승진 후보(queen, rook, bishop, knight) 이미지 로드
-        # 2) 반투명 검은 오버레이
-        # 3) 후보 이미지를 보드 중앙에 가로로 배치
-        # 4) 클릭 대기 → 선택된 ptype 반환
-        choices   = ['queen', 'rook', 'bishop', 'knight']
-        imgs      = []
-        for ptype in choices:
-            fname = IMAGE_FILES[color][ptype]
-            img   = pygame.image.load(os.path.join(PIECES_DIR, fname))
-            img   = pygame.transform.scale(img, (SQUARE_SIZE, SQUARE_SIZE))
-            imgs.append(img)
-
-        # 반투명 오버레이
-        overlay = pygame.Surface((WINDOW_SIZE, WINDOW_SIZE), pygame.SRCALPHA)
-        overlay.fill((0,0,0,180))
-        self.screen.blit(overlay, (0,0))
-
-        # 후보 이미지 배치
-        start_x = (WINDOW_SIZE - 4*SQUARE_SIZE) // 2
-        y       = (WINDOW_SIZE - SQUARE_SIZE) // 2
-        rects   = []
-        for i, img in enumerate(imgs):
-            x = start_x + i * SQUARE_SIZE
-            self.screen.blit(img, (x, y))
-            rects.append(pygame.Rect(x, y, SQUARE_SIZE, SQUARE_SIZE))
-        pygame.display.flip()
-
-        # 클릭 대기
-        while True:
-            for ev in pygame.event.get():
-                if ev.type == pygame.QUIT:
-                    pygame.quit(); sys.exit()
-                if ev.type == pygame.MOUSEBUTTONDOWN and ev.button == 1:
-                    mx, my = ev.pos
-                    for idx, rect in enumerate(rects):
-                        if rect.collidepoint(mx, my):
-                            return choices[idx]
-
-    def draw(self):
-        # 보드
-        self.screen.blit(self.board_img, (0,0))
-        # 기물
-        for y in range(8):
-            for x in range(8):
-                piece = self.board.grid[y][x]
-                if piece:
-                    p_img = pygame.image.load(piece.image_path)
-                    p_img = pygame.transform.scale(p_img, (SQUARE_SIZE, SQUARE_SIZE))
-                    self.screen.blit(p_img, (x*SQUARE_SIZE, y*SQUARE_SIZE))
-        # 하이라이트 / 사이드패널
-        self.draw_highlights()
-        self.draw_side_panel()
-
-    def draw_highlights(self):
-        if not self.selected: return
-        sx, sy = self.selected
-        piece  = self.board.grid[sy][sx]
-
-        # 선택된 칸 녹색 반투명으로 표시
-        sel = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
-        sel.fill((0,255,0,100))
-        self.screen.blit(sel, (sx*SQUARE_SIZE, sy*SQUARE_SIZE))
-
-        for mx, my in piece.get_valid_moves((sx, sy), self.board):
-            mv = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
-            mv.fill((255,255,0,80))
-            self.screen.blit(mv, (mx*SQUARE_SIZE, my*SQUARE_SIZE))
-
-    def draw_side_panel(self):
-        panel = pygame.Surface((PANEL_WIDTH, WINDOW_SIZE))
-        panel.fill((30,30,30))
-        self.screen.blit(panel, (WINDOW_SIZE,0))
-        # 턴에 따라 움직일 순서 표시
-        turn_text = "White to move" if self.board.white_to_move else "Black to move"
-        surf = self.font.render(turn_text, True, (255,255,255))
-        self.screen.blit(surf, (WINDOW_SIZE+10,20))
-
-    def handle_events(self):
-        for ev in pygame.event.get():
-            if ev.type == pygame.QUIT:
-                pygame.quit(); sys.exit() 
-
-            # ESC → Pause 메뉴
-            if ev.type == pygame.KEYDOWN and ev.key == pygame.K_ESCAPE:
-                action = self.show_pause_menu()
-                if action == 'resume':
-                    return True
-                if action == 'restart':
-                    self.restart_game = True
-                    return False
-                if action == 'quit':
-                    pygame.quit(); sys.exit()
-
-            # 마우스 클릭
-            if ev.type == pygame.MOUSEBUTTONDOWN and ev.button == 1:
-                mx, my = ev.pos
-                x, y   = mx//SQUARE_SIZE, my//SQUARE_SIZE
-                if 0 <= x < 8 and 0 <= y < 8:
-                    if self.selected is None:
-                        piece = self.board.grid[y][x]
-                        if piece and (piece.color=='white') == self.board.white_to_move:
-                            self.selected = (x, y)
-                    else:
-                        moved = self.board.move_piece(self.selected, (x,y))
-                        if moved:
-                            piece = self.board.grid[y][x]
-                            if isinstance(piece, Pawn) and (y==0 or y==7):
-                                ptype = self.prompt_promotion(piece.color)
-                                cls_map = {
-                                    'queen': Queen, 'rook': Rook,
-                                    'bishop': Bishop, 'knight': Knight
-                                }
-                                self.board.grid[y][x] = cls_map[ptype](piece.color)
-                        self.selected = None
-        return True
-
-    def show_pause_menu(self):
-        overlay    = pygame.Surface((WINDOW_SIZE, WINDOW_SIZE), pygame.SRCALPHA)
-        overlay.fill((0,0,0,180)); self.screen.blit(overlay,(0,0))
-        title_surf = pygame.font.SysFont(None,48).render("Paused",True,(255,255,255))
-        self.screen.blit(title_surf, title_surf.get_rect(center=(WINDOW_SIZE//2,WINDOW_SIZE//2-80)))
-
-        btn_font   = pygame.font.SysFont(None,32)
-        W, H       = 140, 40; mid = WINDOW_SIZE//2
-        self.pause_action = None
-
-        # 버튼 클릭하면 상태 반환
-        resume_btn = Button((mid-W//2,WINDOW_SIZE//2-20,W,H),"Resume",btn_font,
-                            lambda: setattr(self,'pause_action','resume'))
-        restart_btn= Button((mid-W-10,WINDOW_SIZE//2+40,W,H),"Restart",btn_font,
-                            lambda: setattr(self,'pause_action','restart'))
-        quit_btn   = Button((mid+10,WINDOW_SIZE//2+40,W,H),"Quit",btn_font,
-                            lambda: setattr(self,'pause_action','quit'))
-
-        while True:
-            for ev in pygame.event.get():
-                if ev.type==pygame.QUIT: return 'quit'
-                if ev.type==pygame.KEYDOWN and ev.key==pygame.K_ESCAPE: return 'resume'
-                resume_btn.handle_event(ev)
-                restart_btn.handle_event(ev)
-                quit_btn.handle_event(ev)
-
-            resume_btn.draw(self.screen)
-            restart_btn.draw(self.screen)
-            quit_btn.draw(self.screen)
-            pygame.display.flip(); self.clock.tick(30)
-            if self.pause_action: return self.pause_action
-
-    def run(self):
-        while True:
-            # Restart 버튼 눌렀을 때 새판 생성
-            self.board        = Board()
-            self.selected     = None
-            self.restart_game = False
-            result = None
-
-            # 플레이 루프 입력·그리기·판정 반복
-            while True:
-                cont = self.handle_events()
-                if not cont:
-                    break
-                self.draw(); pygame.display.flip(); self.clock.tick(30)
-                to_move = 'white' if self.board.white_to_move else 'black'
-                if self.board.is_checkmate(to_move):
-                    winner = 'Black' if to_move=='white' else 'White'
-                    result = f"Checkmate! {winner} wins"; break
-                if self.board.is_stalemate(to_move):
-                    result = "Stalemate! Draw"; break
-
-            if self.restart_game:
-                continue
-            if result is None:
-                continue
-
-            # result 가 채워지면(게임 오버) show_game_over 호출
-            action = self.show_game_over(result)
-            if action=='restart':
-                continue
-            else:
-                break
-
-        pygame.quit()
-
-    def show_game_over(self, text):
-        # 오버레이 + 메시지
-        # Restart/Quit 버튼 생성
-        overlay  = pygame.Surface((WINDOW_SIZE, WINDOW_SIZE), pygame.SRCALPHA)
-        overlay.fill((0,0,0,180)); self.screen.blit(overlay,(0,0))
-        surf     = pygame.font.SysFont(None,48).render(text,True,(255,255,255))
-        self.screen.blit(surf, surf.get_rect(center=(WINDOW_SIZE//2,WINDOW_SIZE//2-50)))
-
-        font_btn = pygame.font.SysFont(None,32)
-        W,H      = 120,40; mid=WINDOW_SIZE//2
-        restart_btn = Button((mid-W-10,WINDOW_SIZE//2+10,W,H),"Restart",font_btn,self._on_restart)
-        quit_btn    = Button((mid+10,WINDOW_SIZE//2+10,W,H),"Quit",font_btn,self._on_quit)
-
-        self.restart_game = False
-        while True:
-            for ev in pygame.event.get():
-                if ev.type==pygame.QUIT:
-                    pygame.quit(); sys.exit()
-                restart_btn.handle_event(ev)
-                quit_btn.handle_event(ev)
-            restart_btn.draw(self.screen)
-            quit_btn.draw(self.screen)
-            pygame.display.flip(); self.clock.tick(30)
-            if self.restart_game:
-                self.restart_game=False
-                return 'restart'
-    
-    # 재시작
-    def _on_restart(self):
-        self.restart_game = True
-
-    # 종료
-    def _on_quit(self):
-        pygame.quit()
-        sys.exit()
+﻿import sys
+import pygame
+from board import move_name
+from engine import Engine, BackgroundSearch, SearchResult
+from book import OpeningBook
+from history import GameHistory
+import instrument
+import resources
+from pieces import Pawn
+
+# ─── 상수 정의 ─────────────────────────────────────────
+WINDOW_SIZE   = 640
+SQUARE_SIZE   = WINDOW_SIZE // 8
+PANEL_WIDTH   = 200
+SCREEN_WIDTH  = WINDOW_SIZE + PANEL_WIDTH
+SCREEN_HEIGHT = WINDOW_SIZE
+# 사이드패널 수순 목록
+MOVE_LIST_TOP = 160
+ROW_HEIGHT    = 22
+
+class Button:
+    def __init__(self, rect, text, font, callback):
+        self.rect      = pygame.Rect(rect)
+        self.text      = text
+        self.font      = font
+        self.callback  = callback
+        self.text_surf = font.render(text, True, (255,255,255))
+        self.text_rect = self.text_surf.get_rect(center=self.rect.center)
+
+    def draw(self, screen):
+        pygame.draw.rect(screen, (70,70,70), self.rect)
+        pygame.draw.rect(screen, (200,200,200), self.rect, 2)
+        screen.blit(self.text_surf, self.text_rect)
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            if self.rect.collidepoint(event.pos):
+                self.callback()
+
+class SpriteCache:
+    # (color, ptype) → 칸 크기로 스케일한 기물 Surface
+    # PNG 디코딩은 resources.images 가 백그라운드에서 한 번, 스케일은 칸 크기가 바뀔 때만
+    def __init__(self):
+        self.size      = None
+        self.originals = {}
+        self.sprites   = {}
+
+    def get(self, color, ptype, size):
+        if size != self.size:
+            self._rebuild(size)
+        return self.sprites[(color, ptype)]
+
+    def _rebuild(self, size):
+        if not self.originals:
+            for color, files in resources.IMAGE_FILES.items():
+                for ptype in files:
+                    self.originals[(color, ptype)] = resources.images.get((color, ptype)).convert_alpha()
+        self.sprites = {key: pygame.transform.scale(img, (size, size)).convert_alpha()
+                        for key, img in self.originals.items()}
+        self.size = size
+
+class Game:
+    def __init__(self, ai_color=None, think_time=1.0, ponder=True, book_path=None):
+        # 이미지 디코딩은 창·폰트를 만드는 동안 백그라운드에서
+        resources.images.preload()
+        pygame.init()
+        self.screen    = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("Python Chess")
+        self.clock     = pygame.time.Clock()
+        self.font      = pygame.font.SysFont(None, 24)
+        self.restart_game = False
+
+        # 보드 이미지 로드 & 스케일
+        board_img_orig = resources.images.get('board')
+        self.board_img = pygame.transform.scale(board_img_orig, (WINDOW_SIZE, WINDOW_SIZE)).convert()
+        # 기물 이미지는 시작할 때 한 번 만들어 두고 매 프레임 blit 만
+        self.sprites = SpriteCache()
+        self.sprites.get('white', 'pawn', SQUARE_SIZE)
+
+        # 하이라이트 오버레이·사이드패널 Surface 는 한 번만 만들어 재사용
+        self.overlays = {
+            'selected': pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA),
+            'move':     pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA),
+        }
+        self.overlays['selected'].fill((0,255,0,100))
+        self.overlays['move'].fill((255,255,0,80))
+        self.panel = pygame.Surface((PANEL_WIDTH, WINDOW_SIZE))
+
+        # 더티 렉트 렌더링 상태: 칸마다 마지막으로 그린 (기물, 하이라이트)
+        self.full_redraw  = True
+        self.drawn        = [[None]*8 for _ in range(8)]
+        self.panel_state  = None
+        self.hl_key       = None # 하이라이트 맵을 만든 (선택 칸, 포지션 해시)
+        self.hl_map       = {}
+
+        # 체스판 로직 초기화 (수순 기록이 보드를 들고 있다 — 되돌리기·이동하면 보드가 바뀔 수 있음)
+        self.history  = GameHistory()
+        self.board    = self.history.board
+        self.selected = None
+        self.move_rects = [] # 사이드패널 수순 목록의 (rect, 그 수를 둔 뒤 ply)
+
+        # 컴퓨터 상대 ('white' / 'black' / None = 사람끼리)
+        self.ai_color    = ai_color
+        self.think_time  = think_time
+        self.engine      = Engine() if ai_color else None
+        self.last_search = None
+        # 오프닝 북 (mmap) — 북에 있는 포지션이면 탐색 없이 바로 둔다
+        self.book        = OpeningBook(book_path) if ai_color and book_path else None
+        # 탐색은 백그라운드 스레드에서 → 결과는 queue 로 받아 메인 루프에서 둔다
+        self.searcher      = BackgroundSearch(self.engine) if ai_color else None
+        self.search_tag    = 0 # 지금 기다리는 탐색 결과의 tag (이전 탐색 결과는 무시)
+        self.thinking      = False # 컴퓨터 차례 탐색 중
+        self.ponder        = ponder # 상대 차례에 미리 생각하기
+        self.ponder_move   = None # 폰더링 중 예상한 상대 수
+        self.ponder_result = None # 상대가 두기 전에 끝난 폰더링 결과
+
+    def prompt_promotion(self, color):
+        # 1) 승진 후보(queen, rook, bishop, knight) 이미지 (스프라이트 캐시)
+        # 2) 반투명 검은 오버레이
+        # 3) 후보 이미지를 보드 중앙에 가로로 배치
+        # 4) 클릭 대기 → 선택된 ptype 반환
+        choices   = ['queen', 'rook', 'bishop', 'knight']
+        imgs      = [self.sprites.get(color, ptype, SQUARE_SIZE) for ptype in choices]
+
+        # 반투명 오버레이
+        overlay = pygame.Surface((WINDOW_SIZE, WINDOW_SIZE), pygame.SRCALPHA)
+        overlay.fill((0,0,0,180))
+        self.screen.blit(overlay, (0,0))
+
+        # 후보 이미지 배치
+        start_x = (WINDOW_SIZE - 4*SQUARE_SIZE) // 2
+        y       = (WINDOW_SIZE - SQUARE_SIZE) // 2
+        rects   = []
+        for i, img in enumerate(imgs):
+            x = start_x + i * SQUARE_SIZE
+            self.screen.blit(img, (x, y))
+            rects.append(pygame.Rect(x, y, SQUARE_SIZE, SQUARE_SIZE))
+        pygame.display.flip()
+
+        # 클릭 대기
+        while True:
+            for ev in pygame.event.get():
+                if ev.type == pygame.QUIT:
+                    pygame.quit(); sys.exit()
+                if ev.type == pygame.MOUSEBUTTONDOWN and ev.button == 1:
+                    mx, my = ev.pos
+                    for idx, rect in enumerate(rects):
+                        if rect.collidepoint(mx, my):
+                            return choices[idx]
+
+    def draw(self):
+        # 바뀐 칸만 다시 그리고, 다시 그린 영역(rect) 목록을 돌려준다
+        rects = []
+        if self.full_redraw:
+            self.screen.blit(self.board_img, (0,0))
+            self.drawn = [[None]*8 for _ in range(8)]
+            self.panel_state = None
+        highlights = self.highlight_map()
+        for y in range(8):
+            row = self.board.grid[y]
+            for x in range(8):
+                piece = row[x]
+                state = ((piece.color, piece.ptype) if piece else None, highlights.get((x, y)))
+                if state != self.drawn[y][x]:
+                    rects.append(self.draw_square(x, y, piece, state[1]))
+                    self.drawn[y][x] = state
+        # 사이드패널은 표시 내용이 바뀔 때만
+        panel_state = (self.board.white_to_move, self.board.status(), self.thinking, self.ponder_move is not None, id(self.last_search),
+                       self.history.ply, len(self.history), instrument.frame_summary())
+        if panel_state != self.panel_state:
+            self.draw_side_panel()
+            self.panel_state = panel_state
+            rects.append(pygame.Rect(WINDOW_SIZE, 0, PANEL_WIDTH, WINDOW_SIZE))
+        if self.full_redraw:
+            self.full_redraw = False
+            rects = [pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)]
+        return rects
+
+    def draw_square(self, x, y, piece, highlight):
+        # 보드 배경 해당 부분 → 기물 → 하이라이트 오버레이
+        rect = pygame.Rect(x*SQUARE_SIZE, y*SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
+        self.screen.blit(self.board_img, rect, rect)
+        if piece:
+            self.screen.blit(self.sprites.get(piece.color, piece.ptype, SQUARE_SIZE), rect)
+        if highlight:
+            self.screen.blit(self.overlays[highlight], rect)
+        return rect
+
+    def highlight_map(self):
+        # {(x, y): 'selected' | 'move'} — 선택이나 포지션이 바뀔 때만 다시 계산
+        key = (self.selected, self.board.hash)
+        if key != self.hl_key:
+            self.hl_key = key
+            self.hl_map = {}
+            if self.selected:
+                sx, sy = self.selected
+                piece  = self.board.grid[sy][sx]
+                if piece:
+                    for pos in piece.get_valid_moves((sx, sy), self.board):
+                        self.hl_map[pos] = 'move'
+                self.hl_map[self.selected] = 'selected'
+        return self.hl_map
+
+    def draw_side_panel(self):
+        self.panel.fill((30,30,30))
+        self.screen.blit(self.panel, (WINDOW_SIZE,0))
+        # 턴에 따라 움직일 순서 표시
+        turn_text = "White to move" if self.board.white_to_move else "Black to move"
+        if self.board.status() == 'check':
+            turn_text += " (check)"
+        surf = self.font.render(turn_text, True, (255,255,255))
+        self.screen.blit(surf, (WINDOW_SIZE+10,20))
+        # 엔진 상태 / 마지막 탐색 결과
+        if self.engine:
+            status = ("Thinking... (Space: move now)" if self.thinking
+                      else "Pondering..." if self.ponder_move else "")
+            surf = self.font.render(status, True, (180,180,180))
+            self.screen.blit(surf, (WINDOW_SIZE+10, 130))
+        if self.last_search and self.last_search.move:
+            r = self.last_search
+            # 북에서 둔 수는 탐색 반복(infos)이 없다
+            lines = ((f"Engine: {move_name(r.move)}", f"depth {r.depth}  score {r.score}", f"{r.nodes} nodes")
+                     if r.infos else (f"Book: {move_name(r.move)}",))
+            for i, line in enumerate(lines):
+                surf = self.font.render(line, True, (180,180,180))
+                self.screen.blit(surf, (WINDOW_SIZE+10, 60 + i*22))
+        # 계측이 켜져 있으면 직전 프레임 시간과 단계별 시간 (ms)
+        summary = instrument.frame_summary()
+        bottom = WINDOW_SIZE - 10
+        if summary:
+            bottom -= len(summary)*22
+            for i, line in enumerate(summary):
+                surf = self.font.render(line, True, (120,200,120))
+                self.screen.blit(surf, (WINDOW_SIZE+10, bottom + i*22))
+        self.draw_move_list(bottom)
+
+    def draw_move_list(self, bottom):
+        # 수순 목록: 지금 ply 의 수를 강조, 그 뒤(되돌린 수)는 흐리게, 클릭하면 그 수 뒤로 이동
+        history = self.history
+        self.move_rects = []
+        surf = self.font.render("Moves (<- -> Home End)", True, (140,140,140))
+        self.screen.blit(surf, (WINDOW_SIZE+10, MOVE_LIST_TOP))
+        top     = MOVE_LIST_TOP + ROW_HEIGHT
+        visible = max(1, (bottom - top) // ROW_HEIGHT)
+        rows    = (len(history) + 1) // 2
+        current = max(history.ply - 1, 0) // 2
+        first   = max(0, min(current - visible // 2, rows - visible))
+        for row in range(first, min(rows, first + visible)):
+            y = top + (row - first) * ROW_HEIGHT
+            surf = self.font.render(f"{row + 1}.", True, (140,140,140))
+            self.screen.blit(surf, (WINDOW_SIZE+10, y))
+            for side in (0, 1):
+                ply = row*2 + side
+                if ply >= len(history):
+                    break
+                color = ((255,220,100) if ply == history.ply - 1
+                         else (200,200,200) if ply < history.ply else (110,110,110))
+                surf = self.font.render(move_name(history.move_at(ply)), True, color)
+                pos  = (WINDOW_SIZE + 50 + side*70, y)
+                self.screen.blit(surf, pos)
+                self.move_rects.append((surf.get_rect(topleft=pos), ply + 1))
+
+    def navigate(self, ply):
+        # 되돌리기·다시하기·수순 클릭: 탐색을 멈추고 해당 ply 의 보드로
+        if ply == self.history.ply:
+            return
+        self.reset_engine()
+        self.board    = self.history.go_to(ply)
+        self.selected = None
+
+    def next_events(self):
+        # 한가하면 이벤트가 올 때까지 잠들고(CPU 0), 엔진이 돌 때는 결과 확인을 위해 짧게 깬다
+        if self.engine and (self.searcher.busy() or not self.searcher.results.empty()):
+            first = pygame.event.wait(50)
+        else:
+            first = pygame.event.wait()
+        events = [] if first.type == pygame.NOEVENT else [first]
+        return events + pygame.event.get()
+
+    def handle_events(self, events=None):
+        for ev in (pygame.event.get() if events is None else events):
+            if ev.type == pygame.QUIT:
+                pygame.quit(); sys.exit() 
+
+            # 창이 가려졌다 다시 보이면 전체 다시 그리기
+            if ev.type == pygame.VIDEOEXPOSE:
+                self.full_redraw = True
+
+            # ESC → Pause 메뉴
+            if ev.type == pygame.KEYDOWN and ev.key == pygame.K_ESCAPE:
+                action = self.show_pause_menu()
+                self.full_redraw = True
+                if action == 'resume':
+                    return True
+                if action == 'restart':
+                    self.restart_game = True
+                    return False
+                if action == 'quit':
+                    pygame.quit(); sys.exit()
+
+            # Space → 컴퓨터에게 지금까지의 최선수를 바로 두게 함
+            # (지난 수를 보는 중이면 그 뒤 수순을 버리고 여기서부터 컴퓨터가 이어 둔다)
+            if ev.type == pygame.KEYDOWN and ev.key == pygame.K_SPACE:
+                if self.thinking:
+                    self.engine.stop()
+                elif self.engine and not self.history.at_end():
+                    self.history.truncate()
+
+            # ← / → 되돌리기·다시하기, Home / End 처음·마지막 수로
+            if ev.type == pygame.KEYDOWN:
+                target = {pygame.K_LEFT: self.history.ply - 1, pygame.K_RIGHT: self.history.ply + 1,
+                          pygame.K_HOME: 0, pygame.K_END: len(self.history)}.get(ev.key)
+                if target is not None:
+                    self.navigate(target)
+
+            # 마우스 클릭
+            if ev.type == pygame.MOUSEBUTTONDOWN and ev.button == 1:
+                mx, my = ev.pos
+                x, y   = mx//SQUARE_SIZE, my//SQUARE_SIZE
+                for rect, ply in self.move_rects:
+                    if rect.collidepoint(mx, my):
+                        self.navigate(ply)
+                        break
+                if 0 <= x < 8 and 0 <= y < 8:
+                    if self.selected is None:
+                        piece = self.board.grid[y][x]
+                        if (piece and (piece.color=='white') == self.board.white_to_move
+                                and piece.color != self.ai_color):
+                            self.selected = (x, y)
+                    else:
+                        # 승진 수라면 이동 전에 기물 선택 → move_piece 에 함께 전달
+                        sx, sy = self.selected
+                        piece  = self.board.grid[sy][sx]
+                        promotion = None
+                        if (isinstance(piece, Pawn) and (y==0 or y==7)
+                                and (x, y) in piece.get_valid_moves(self.selected, self.board)):
+                            promotion = self.prompt_promotion(piece.color)
+                            self.full_redraw = True
+                        if self.board.move_piece(self.selected, (x,y), promotion):
+                            self.history.push((self.selected, (x,y), promotion))
+                            self.on_opponent_move((self.selected, (x,y), promotion))
+                        self.selected = None
+        return True
+
+    def update_engine(self):
+        # 매 프레임 호출: 끝난 탐색 결과를 받아 두고, 컴퓨터 차례면 탐색을 시작
+        if not self.engine:
+            return
+        item = self.searcher.poll()
+        while item is not None:
+            tag, result = item
+            if tag == self.search_tag:
+                if self.ponder_move is not None:
+                    self.ponder_result = result # 상대 수를 기다린다
+                elif self.thinking:
+                    self.thinking = False
+                    self.play_engine_result(result)
+            item = self.searcher.poll()
+        # 지난 수를 보는 중에는 두지 않는다 (Space 나 사람이 새 수를 두면 이어 간다)
+        ai_to_move = (self.ai_color == 'white') == self.board.white_to_move and self.history.at_end()
+        if ai_to_move and not self.thinking:
+            move = self.book.choose(self.board) if self.book else None
+            if move is not None:
+                self.play_engine_result(SearchResult(move, 0, 0, 0, 0.0, []))
+                return
+            self.search_tag += 1
+            self.thinking = True
+            self.searcher.start(self.board, self.think_time, self.search_tag)
+
+    def play_engine_result(self, result):
+        self.last_search = result
+        if result.move is None:
+            return
+        self.board.move_piece(*result.move)
+        self.history.push(result.move)
+        # 폰더링: PV 의 다음 수(예상 응수)를 둔 포지션을 상대가 생각하는 동안 탐색
+        if self.ponder and len(result.pv) > 1:
+            self.ponder_move   = result.pv[1]
+            self.ponder_result = None
+            self.search_tag += 1
+            self.searcher.start(self.board, None, self.search_tag, ponder_move=self.ponder_move)
+
+    def on_opponent_move(self, move):
+        # 사람이 둔 수가 예상 응수면 폰더링을 그대로 이어가고(ponderhit), 아니면 버린다
+        if not self.engine or self.ponder_move is None:
+            return
+        hit = move == self.ponder_move
+        self.ponder_move = None
+        if not hit:
+            self.searcher.stop(wait=True)
+            self.search_tag += 1
+            self.ponder_result = None
+            return
+        self.thinking = True
+        if self.ponder_result is not None:
+            result, self.ponder_result = self.ponder_result, None
+            self.thinking = False
+            self.play_engine_result(result)
+        else:
+            self.engine.ponderhit(self.think_time)
+
+    def reset_engine(self):
+        # 새 판·게임 오버: 진행 중인 탐색을 멈추고 남은 결과는 버린다
+        if not self.engine:
+            return
+        self.searcher.stop(wait=True)
+        self.search_tag += 1
+        self.thinking = False
+        self.ponder_move = self.ponder_result = None
+
+    def show_pause_menu(self):
+        overlay    = pygame.Surface((WINDOW_SIZE, WINDOW_SIZE), pygame.SRCALPHA)
+        overlay.fill((0,0,0,180)); self.screen.blit(overlay,(0,0))
+        title_surf = pygame.font.SysFont(None,48).render("Paused",True,(255,255,255))
+        self.screen.blit(title_surf, title_surf.get_rect(center=(WINDOW_SIZE//2,WINDOW_SIZE//2-80)))
+
+        btn_font   = pygame.font.SysFont(None,32)
+        W, H       = 140, 40; mid = WINDOW_SIZE//2
+        self.pause_action = None
+
+        # 버튼 클릭하면 상태 반환
+        resume_btn = Button((mid-W//2,WINDOW_SIZE//2-20,W,H),"Resume",btn_font,
+                            lambda: setattr(self,'pause_action','resume'))
+        restart_btn= Button((mid-W-10,WINDOW_SIZE//2+40,W,H),"Restart",btn_font,
+                            lambda: setattr(self,'pause_action','restart'))
+        quit_btn   = Button((mid+10,WINDOW_SIZE//2+40,W,H),"Quit",btn_font,
+                            lambda: setattr(self,'pause_action','quit'))
+
+        while True:
+            for ev in pygame.event.get():
+                if ev.type==pygame.QUIT: return 'quit'
+                if ev.type==pygame.KEYDOWN and ev.key==pygame.K_ESCAPE: return 'resume'
+                resume_btn.handle_event(ev)
+                restart_btn.handle_event(ev)
+                quit_btn.handle_event(ev)
+
+            resume_btn.draw(self.screen)
+            restart_btn.draw(self.screen)
+            quit_btn.draw(self.screen)
+            pygame.display.flip(); self.clock.tick(30)
+            if self.pause_action: return self.pause_action
+
+    def run(self):
+        while True:
+            # Restart 버튼 눌렀을 때 새판 생성
+            self.reset_engine()
+            self.history      = GameHistory()
+            self.board        = self.history.board
+            self.selected     = None
+            self.restart_game = False
+            self.full_redraw  = True
+            result = None
+
+            # 플레이 루프: 엔진 결과 반영·바뀐 부분만 그리기·판정 → 입력 대기
+            # (계측이 켜져 있으면 단계별 시간을 잰다 — 입력 대기 시간은 제외)
+            while True:
+                with instrument.timer('frame.engine'):
+                    self.update_engine()
+                with instrument.timer('frame.draw'):
+                    rects = self.draw()
+                with instrument.timer('frame.display'):
+                    if rects:
+                        pygame.display.update(rects)
+                instrument.count('frame.dirty_rects', len(rects))
+                # 종료 판정: 수를 둘 때 계산해 둔 포지션 상태를 그대로 사용
+                with instrument.timer('frame.status'):
+                    status = self.board.status()
+                if status == 'checkmate':
+                    winner = 'Black' if self.board.white_to_move else 'White'
+                    result = f"Checkmate! {winner} wins"; break
+                if status == 'stalemate':
+                    result = "Stalemate! Draw"; break
+                if self.board.is_threefold_repetition():
+                    result = "Threefold repetition! Draw"; break
+                if self.board.is_fifty_move_draw():
+                    result = "Fifty-move rule! Draw"; break
+                events = self.next_events()
+                with instrument.timer('frame.events'):
+                    cont = self.handle_events(events)
+                instrument.end_frame()
+                if not cont:
+                    break
+
+            if self.restart_game:
+                continue
+            if result is None:
+                continue
+
+            # result 가 채워지면(게임 오버) show_game_over 호출
+            self.reset_engine()
+            action = self.show_game_over(result)
+            if action=='restart':
+                continue
+            else:
+                break
+
+        pygame.quit()
+
+    def show_game_over(self, text):
+        # 오버레이 + 메시지
+        # Restart/Quit 버튼 생성
+        overlay  = pygame.Surface((WINDOW_SIZE, WINDOW_SIZE), pygame.SRCALPHA)
+        overlay.fill((0,0,0,180)); self.screen.blit(overlay,(0,0))
+        surf     = pygame.font.SysFont(None,48).render(text,True,(255,255,255))
+        self.screen.blit(surf, surf.get_rect(center=(WINDOW_SIZE//2,WINDOW_SIZE//2-50)))
+
+        font_btn = pygame.font.SysFont(None,32)
+        W,H      = 120,40; mid=WINDOW_SIZE//2
+        restart_btn = Button((mid-W-10,WINDOW_SIZE//2+10,W,H),"Restart",font_btn,self._on_restart)
+        quit_btn    = Button((mid+10,WINDOW_SIZE//2+10,W,H),"Quit",font_btn,self._on_quit)
+
+        self.restart_game = False
+        while True:
+            for ev in pygame.event.get():
+                if ev.type==pygame.QUIT:
+                    pygame.quit(); sys.exit()
+                restart_btn.handle_event(ev)
+                quit_btn.handle_event(ev)
+            restart_btn.draw(self.screen)
+            quit_btn.draw(self.screen)
+            pygame.display.flip(); self.clock.tick(30)
+            if self.restart_game:
+                self.restart_game=False
+                return 'restart'
+    
+    # 재시작
+    def _on_restart(self):
+        self.restart_game = True
+
+    # 종료
+    def _on_quit(self):
+        pygame.quit()
+        sys.exit()
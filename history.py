@@ -0,0 +1,92 @@
+from array import array
+
+from archive import decode_move, encode_move
+from board import Board
+
+# ─── 수순 기록 · 되돌리기/다시하기 · 임의 ply 이동 ─────────────
+# 본선 수는 u16 (archive 인코딩), 포지션 해시는 u64 로만 들고 있고
+# CHECKPOINT_EVERY 반수마다 보드 스냅샷(70바이트)을 남긴다
+# 임의 ply 로 이동: 가까우면 unmake/make, 멀면 가장 가까운 앞쪽 스냅샷 + 최대 interval 수 재생
+CHECKPOINT_EVERY = 16
+MAX_CHECKPOINTS  = 256 # 넘으면 간격을 두 배로 늘리고 스냅샷을 반으로 솎는다
+UNDO_KEEP        = 64 # 라이브 Board 가 들고 있는 undo 기록 수
+
+
+class GameHistory:
+    def __init__(self, board=None):
+        self.board = board if board is not None else Board()
+        self.use_bitboards = self.board.bb is not None
+        self.moves = array('H') # 본선 수
+        self.hashes = array('Q', [self.board.hash]) # ply → 포지션 해시 (반복 판정 복원용)
+        self.ply = 0 # 지금 보드가 보여 주는 ply
+        self.interval = CHECKPOINT_EVERY
+        self.checkpoints = {0: self.board.to_snapshot()} # ply → 스냅샷
+
+    def __len__(self):
+        return len(self.moves)
+
+    def at_end(self):
+        return self.ply == len(self.moves)
+
+    def move_at(self, ply):
+        # ply 번째 수 (ply 0 이 첫 수) → (from, to, promotion)
+        return decode_move(self.moves[ply])
+
+    def push(self, move):
+        # self.board 에 방금 둔 수를 기록 — 지난 ply 에서 두었으면 그 뒤 수순은 버린다
+        if self.ply < len(self.moves):
+            self.truncate()
+        self.moves.append(encode_move(move))
+        self.hashes.append(self.board.hash)
+        self.ply += 1
+        if self.ply % self.interval == 0:
+            self.checkpoints[self.ply] = self.board.to_snapshot()
+            if len(self.checkpoints) > MAX_CHECKPOINTS:
+                self.interval *= 2
+                self.checkpoints = {p: s for p, s in self.checkpoints.items() if p % self.interval == 0}
+        self.board.trim_history(UNDO_KEEP)
+
+    def truncate(self):
+        # 현재 ply 이후 수순 버리기
+        del self.moves[self.ply:]
+        del self.hashes[self.ply + 1:]
+        for p in [p for p in self.checkpoints if p > self.ply]:
+            del self.checkpoints[p]
+
+    def undo(self):
+        return self.go_to(self.ply - 1)
+
+    def redo(self):
+        return self.go_to(self.ply + 1)
+
+    def go_to(self, target):
+        # target ply 의 보드를 돌려준다 (스냅샷에서 다시 만들면 새 Board 객체)
+        target = max(0, min(target, len(self.moves)))
+        distance = abs(target - self.ply)
+        if distance == 0:
+            return self.board
+        if target < self.ply and distance <= min(len(self.board.undo_stack), self.interval):
+            for _ in range(distance):
+                self.board.unmake_move()
+        elif target > self.ply and distance <= self.interval:
+            for ply in range(self.ply, target):
+                self.board.make_move(*decode_move(self.moves[ply]))
+        else:
+            self.board = self._restore(target)
+        self.ply = target
+        self.board.trim_history(UNDO_KEEP)
+        self.board.move_table()
+        return self.board
+
+    def _restore(self, target):
+        # target 이하에서 가장 가까운 스냅샷 + 남은 수 재생
+        base = target - target % self.interval
+        while base not in self.checkpoints:
+            base -= self.interval
+        board = Board.from_snapshot(self.checkpoints[base], self.use_bitboards)
+        for ply in range(base, target):
+            board.make_move(*decode_move(self.moves[ply]))
+        # 스냅샷 이전 포지션도 반복 판정에 들어가도록 해시 기록을 이어 붙인다
+        start = max(0, min(base, target - board.halfmove_clock))
+        board.set_hash_history(self.hashes[start:target + 1])
+        return board
@@ -0,0 +1,194 @@
+import atexit
+import cProfile
+import importlib
+import json
+import sys
+import time
+from collections import defaultdict
+
+# ─── 저비용 계측 (기본 꺼짐) ────────────────────────────
+# 꺼져 있을 때: 핫패스 메서드는 원래 함수 그대로 (패치 없음), timer() 는 공용 빈 컨텍스트
+# 켜면: HOT_PATHS 메서드를 시간 재는 래퍼로 바꾸고, 프레임 단계별 시간을 모은다
+enabled = False
+counters = defaultdict(int) # 이름 → 횟수
+timers = {} # 이름 → [호출 수, 총 초, 최대 초]
+last_frame = {} # 직전 프레임의 단계 → 초 (사이드패널 오버레이용)
+
+# (모듈, 클래스, 메서드, 타이머 이름)
+HOT_PATHS = [
+    ('board',  'Board',       'legal_moves',          'movegen.legal_moves'),
+    ('board',  'Board',       '_compute_legal_moves', 'movegen.compute'),
+    ('board',  'Board',       'has_any_legal_moves',  'movegen.any_legal'),
+    ('board',  'Board',       'move_table',           'movegen.ply_table'),
+    ('pieces', 'Piece',       'get_valid_moves',      'movegen.get_valid_moves'),
+    ('board',  'Board',       'is_in_check',          'legality.is_in_check'),
+    ('board',  'Board',       '_compute_in_check',    'legality.compute_in_check'),
+    ('board',  'Board',       '_square_attacked',     'legality.square_attacked'),
+    ('board',  'Board',       '_would_cause_check',   'legality.would_cause_check'),
+    ('board',  'Board',       'make_move',            'board.make_move'),
+    ('board',  'Board',       'unmake_move',          'board.unmake_move'),
+    ('board',  'Board',       'copy',                 'board.copy'),
+    ('game',   'SpriteCache', '_rebuild',             'draw.sprite_rebuild'),
+]
+
+_patched = [] # (클래스, 메서드 이름, 원래 함수)
+_frame = {} # 진행 중인 프레임의 단계 → 초
+_profiler = None
+_started = None
+_dump_paths = (None, None)
+
+
+class _Timer:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        _record(self.name, elapsed)
+        if self.name.startswith('frame.'):
+            _frame[self.name[6:]] = _frame.get(self.name[6:], 0.0) + elapsed
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullTimer()
+
+
+def _record(name, elapsed):
+    entry = timers.get(name)
+    if entry is None:
+        timers[name] = [1, elapsed, elapsed]
+    else:
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed > entry[2]:
+            entry[2] = elapsed
+
+
+def _wrap(func, name):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _record(name, time.perf_counter() - start)
+    wrapper.__wrapped__ = func
+    wrapper.__name__ = func.__name__
+    return wrapper
+
+
+# ─── 공개 API ──────────────────────────────────────
+def timer(name):
+    # with instrument.timer('frame.draw'): ... — 꺼져 있으면 아무것도 하지 않는 공용 객체
+    return _Timer(name) if enabled else _NULL
+
+
+def count(name, n=1):
+    if enabled:
+        counters[name] += n
+
+
+def end_frame():
+    # 한 프레임의 단계 시간을 묶어 'frame' 타이머와 last_frame 에 남긴다
+    if not enabled or not _frame:
+        return
+    total = sum(_frame.values())
+    _record('frame', total)
+    last_frame.clear()
+    last_frame.update(_frame)
+    last_frame['total'] = total
+    _frame.clear()
+
+
+def frame_summary():
+    # 오버레이용: ('frame 1.2 ms', 'draw 0.8', ...) — 꺼져 있으면 None
+    if not enabled or not last_frame:
+        return None
+    lines = [f"frame {last_frame['total'] * 1000:.1f} ms"]
+    for phase, secs in last_frame.items():
+        if phase != 'total':
+            lines.append(f'{phase} {secs * 1000:.2f}')
+    return tuple(lines)
+
+
+def enable(json_path=None, profile_path=None):
+    # 계측 켜기: 핫패스 패치, profile_path 가 있으면 cProfile 도 함께, 종료 시 자동 덤프
+    global enabled, _profiler, _started, _dump_paths
+    if enabled:
+        return
+    enabled = True
+    _started = time.perf_counter()
+    for module_name, class_name, attr, name in HOT_PATHS:
+        # 아직 임포트되지 않은 모듈(예: 헤드리스에서 game)은 건너뛴다
+        if module_name != 'board' and module_name != 'pieces' and module_name not in sys.modules:
+            continue
+        cls = getattr(importlib.import_module(module_name), class_name)
+        func = cls.__dict__.get(attr)
+        if func is None:
+            continue
+        _patched.append((cls, attr, func))
+        setattr(cls, attr, _wrap(func, name))
+    if profile_path:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    _dump_paths = (json_path, profile_path)
+    if json_path or profile_path:
+        atexit.register(dump)
+
+
+def disable():
+    # 원래 메서드로 되돌린다 (모은 값은 reset() 전까지 남는다)
+    global enabled, _profiler
+    for cls, attr, func in reversed(_patched):
+        setattr(cls, attr, func)
+    _patched.clear()
+    if _profiler is not None:
+        _profiler.disable()
+    enabled = False
+
+
+def reset():
+    counters.clear()
+    timers.clear()
+    last_frame.clear()
+    _frame.clear()
+
+
+def report():
+    # 타이머는 총 시간 내림차순
+    rows = {}
+    for name, (calls, total, worst) in sorted(timers.items(), key=lambda kv: -kv[1][1]):
+        rows[name] = {'calls': calls, 'total_ms': round(total * 1000, 3),
+                      'mean_us': round(total / calls * 1e6, 2), 'max_ms': round(worst * 1000, 3)}
+    return {
+        'seconds': round(time.perf_counter() - _started, 3) if _started else 0.0,
+        'counters': dict(counters),
+        'timers': rows,
+    }
+
+
+def dump(json_path=None, profile_path=None):
+    # JSON 보고서 / cProfile 통계 파일 (pstats·snakeviz 로 열 수 있음)
+    json_path = json_path or _dump_paths[0]
+    profile_path = profile_path or _dump_paths[1]
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(report(), f, indent=2)
+    if profile_path and _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(profile_path)
@@ -1,5 +1,19 @@
-import os, sys
-
-sys.path.append(os.path.dirname(__file__))
-from game import Game
-Game().run()
\ No newline at end of file
+import os, sys
+import argparse
+
+sys.path.append(os.path.dirname(__file__))
+from game import Game
+
+parser = argparse.ArgumentParser(description='Python Chess')
+parser.add_argument('--ai', choices=['white', 'black'], help='컴퓨터가 둘 색')
+parser.add_argument('--think', type=float, default=1.0, help='컴퓨터의 한 수당 생각 시간(초)')
+parser.add_argument('--no-ponder', action='store_true', help='상대 차례에 미리 생각하지 않음')
+parser.add_argument('--book', help='Polyglot 형식 오프닝 북 (.bin) 경로')
+parser.add_argument('--instrument', action='store_true', help='계측 켜기: 사이드패널에 프레임·단계별 시간 표시')
+parser.add_argument('--profile-json', help='종료 시 계측 보고서를 JSON 으로 저장 (계측 켜짐)')
+parser.add_argument('--profile-stats', help='종료 시 cProfile 통계 파일 저장 (pstats 로 열기, 계측 켜짐)')
+args = parser.parse_args()
+if args.instrument or args.profile_json or args.profile_stats:
+    import instrument
+    instrument.enable(args.profile_json, args.profile_stats)
+Game(ai_color=args.ai, think_time=args.think, ponder=not args.no_ponder, book_path=args.book).run()
\ No newline at end of file
@@ -0,0 +1,136 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from board import Board, move_name
+from engine import MATE, MAX_PLY, Engine, SearchResult
+
+# ─── 워커 프로세스 쪽 ────────────────────────────────
+# 프로세스마다 엔진(TT 포함) 하나를 만들어 재사용
+_worker_engine = None
+
+
+def _warm_up():
+    # 풀 생성 직후 호출: 임포트·테이블 계산·엔진 생성을 미리 끝낸다
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = Engine()
+    return os.getpid()
+
+
+def _warm_up_task(_):
+    return _warm_up()
+
+
+def _search_subset(snapshot, moves, max_depth, time_limit):
+    # 스냅샷 바이트 → Board, 주어진 루트 수들만 탐색
+    _warm_up()
+    board = Board.from_snapshot(snapshot)
+    result = _worker_engine.search(board, max_depth, time_limit, moves=moves)
+    return result.move, result.score, result.depth, result.nodes
+
+
+# ─── 메인 프로세스 쪽 ────────────────────────────────
+def _rank(score, depth):
+    # 워커 결과 비교 키: 이기는 메이트 점수는 깊이와 무관하게 확정
+    if score >= MATE - MAX_PLY:
+        return (1, score, depth)
+    return (0, depth, score)
+
+
+class ParallelSearch:
+    # 루트 수 분할 병렬 탐색: 루트 수를 워커 수만큼 나눠 각자 반복 심화
+    # 포지션은 Board.to_snapshot() 바이트로 넘긴다 (Board/Piece 객체 pickle 없음)
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        # 워커를 미리 띄워 둔다
+        list(self.pool.map(_warm_up_task, range(self.workers)))
+
+    def search(self, board, max_depth=64, time_limit=None):
+        start = time.perf_counter()
+        color = 'white' if board.white_to_move else 'black'
+        root_moves = board.legal_moves(color)
+        if not root_moves:
+            return SearchResult(None, 0, 0, 0, 0.0, [])
+        snapshot = board.to_snapshot()
+        chunks = [root_moves[i::self.workers] for i in range(self.workers)]
+        futures = [self.pool.submit(_search_subset, snapshot, chunk, max_depth, time_limit)
+                   for chunk in chunks if chunk]
+
+        # 각 부분의 최선수 중, 메이트를 증명한 결과가 있으면 가장 빠른 메이트
+        # 아니면 가장 깊이 끝낸 결과 → 그중 최고 점수
+        # (엔진은 메이트를 찾으면 더 깊이 가지 않으므로 메이트 결과는 깊이가 얕다)
+        best = None
+        nodes = 0
+        for future in futures:
+            move, score, depth, n = future.result()
+            nodes += n
+            if move is None:
+                continue
+            if best is None or _rank(score, depth) > _rank(best[1], best[2]):
+                best = (move, score, depth)
+        elapsed = time.perf_counter() - start
+        info = {'depth': best[2], 'score': best[1], 'nodes': nodes,
+                'nps': int(nodes / elapsed) if elapsed > 0 else 0,
+                'time': elapsed, 'pv': [move_name(best[0])]}
+        return SearchResult(best[0], best[1], best[2], nodes, elapsed, [info])
+
+    def close(self):
+        self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def speedup_curve(fen, depth, worker_counts):
+    # 같은 포지션·같은 깊이를 워커 수별로 풀어 벽시계 시간 비교
+    board = Board.from_fen(fen) if fen else Board()
+    rows = []
+    base_time = None
+    for n in worker_counts:
+        with ParallelSearch(n) as searcher:
+            result = searcher.search(board, max_depth=depth)
+        if base_time is None:
+            base_time = result.elapsed
+        rows.append({
+            'workers': n, 'seconds': round(result.elapsed, 4), 'nodes': result.nodes,
+            'nps': int(result.nodes / result.elapsed) if result.elapsed > 0 else 0,
+            'speedup': round(base_time / result.elapsed, 2) if result.elapsed > 0 else 0.0,
+            'move': move_name(result.move) if result.move else None, 'score': result.score,
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='프로세스 풀 병렬 탐색 & 워커 수별 속도 향상 측정')
+    parser.add_argument('--fen', default=None)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--workers', type=int, nargs='+', default=None,
+                        help='측정할 워커 수 목록 (기본: 1, 2, 4, ... cpu 수까지)')
+    parser.add_argument('--json', help='결과를 JSON 파일로 저장')
+    args = parser.parse_args(argv)
+
+    counts = args.workers
+    if not counts:
+        cpus = os.cpu_count() or 1
+        counts, n = [], 1
+        while n < cpus:
+            counts.append(n); n *= 2
+        counts.append(cpus)
+    rows = speedup_curve(args.fen, args.depth, counts)
+    print(f"{'workers':>7} {'seconds':>9} {'nodes':>9} {'nps':>8} {'speedup':>7}  move")
+    for r in rows:
+        print(f"{r['workers']:>7} {r['seconds']:>9.3f} {r['nodes']:>9} {r['nps']:>8} {r['speedup']:>7.2f}  {r['move']}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'fen': args.fen, 'depth': args.depth, 'cpus': os.cpu_count(), 'runs': rows}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from board import Board, move_name
+
+# ─── 기준 포지션 & 알려진 노드 수 ──────────────────────
+# (이름, FEN, [depth1, depth2, ...])
+POSITIONS = [
+    ('startpos',  'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+     [20, 400, 8902, 197281, 4865609]),
+    ('kiwipete',  'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+     [48, 2039, 97862, 4085603]),
+    ('ep-pins',   '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+     [14, 191, 2812, 43238, 674624]),
+    ('castling',  'r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1',
+     [26, 568, 13744, 314346]),
+    ('promo-mix', 'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+     [6, 264, 9467, 422333]),
+    ('promo',     'n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1',
+     [24, 496, 9483, 182838]),
+    ('pos5',      'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+     [44, 1486, 62379, 2103487]),
+    ('ep-check',  '8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1',
+     [15, 126, 1928, 13931, 206379, 1440467]),
+    ('ep-illegal', '3k4/3p4/8/K1P4r/8/8/8/8 b - - 0 1',
+     [18, 92, 1670, 10138, 185429, 1134888]),
+]
+
+def perft(board, depth):
+    # depth 수 뒤의 리프 노드 수 (마지막 수는 개수만 센다)
+    moves = board.legal_moves('white' if board.white_to_move else 'black')
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+    nodes = 0
+    for from_pos, to_pos, promo in moves:
+        board.make_move(from_pos, to_pos, promo)
+        nodes += perft(board, depth - 1)
+        board.unmake_move()
+    return nodes
+
+
+def divide(board, depth):
+    # 첫 수별 하위 노드 수
+    result = {}
+    for move in board.legal_moves('white' if board.white_to_move else 'black'):
+        board.make_move(*move)
+        result[move_name(move)] = perft(board, depth - 1)
+        board.unmake_move()
+    return result
+
+
+def run_case(name, fen, depth, expected, use_bitboards=True):
+    board = Board.from_fen(fen, use_bitboards)
+    start = time.perf_counter()
+    nodes = perft(board, depth)
+    elapsed = time.perf_counter() - start
+    return {
+        'name': name, 'fen': fen, 'depth': depth,
+        'nodes': nodes, 'expected': expected,
+        'ok': expected is None or nodes == expected,
+        'seconds': round(elapsed, 4),
+        'nps': int(nodes / elapsed) if elapsed > 0 else 0,
+    }
+
+
+def _git_revision():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _report(results, use_bitboards, json_path):
+    total_nodes = sum(r['nodes'] for r in results)
+    total_secs  = sum(r['seconds'] for r in results)
+    for r in results:
+        status = 'ok' if r['ok'] else f"FAIL (expected {r['expected']})"
+        print(f"{r['name']:<11} depth {r['depth']}  {r['nodes']:>10} nodes  "
+              f"{r['seconds']:>8.3f}s  {r['nps']:>9} nps  {status}")
+    nps = int(total_nodes / total_secs) if total_secs > 0 else 0
+    print(f"total       {total_nodes} nodes  {total_secs:.3f}s  {nps} nps")
+    if json_path:
+        report = {
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'backend': 'bitboard' if use_bitboards else 'grid',
+            'results': results,
+            'total_nodes': total_nodes,
+            'total_seconds': round(total_secs, 4),
+            'nps': nps,
+        }
+        with open(json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+    return all(r['ok'] for r in results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='perft / divide 로 수 생성 정확도·속도 측정')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_suite = sub.add_parser('suite', help='기준 포지션 전체를 알려진 노드 수와 비교')
+    p_suite.add_argument('--max-depth', type=int, default=3)
+
+    p_perft = sub.add_parser('perft', help='한 포지션의 perft')
+    p_divide = sub.add_parser('divide', help='첫 수별 perft')
+    for p in (p_perft, p_divide):
+        p.add_argument('depth', type=int)
+        p.add_argument('--position', default='startpos', choices=[n for n, _, _ in POSITIONS])
+        p.add_argument('--fen', help='기준 포지션 대신 임의 FEN')
+
+    for p in (p_suite, p_perft, p_divide):
+        p.add_argument('--grid', action='store_true', help='비트보드 없이 grid 경로로 실행')
+        p.add_argument('--json', help='결과를 JSON 파일로 저장')
+    args = parser.parse_args(argv)
+    use_bitboards = not args.grid
+
+    if args.command == 'suite':
+        results = []
+        for name, fen, counts in POSITIONS:
+            for depth in range(1, min(args.max_depth, len(counts)) + 1):
+                results.append(run_case(name, fen, depth, counts[depth - 1], use_bitboards))
+        return 0 if _report(results, use_bitboards, args.json) else 1
+
+    known = {n: (fen, counts) for n, fen, counts in POSITIONS}
+    fen, counts = (args.fen, []) if args.fen else known[args.position]
+    expected = counts[args.depth - 1] if args.depth <= len(counts) else None
+
+    if args.command == 'divide':
+        board = Board.from_fen(fen, use_bitboards)
+        start = time.perf_counter()
+        split = divide(board, args.depth)
+        elapsed = time.perf_counter() - start
+        for move, nodes in sorted(split.items()):
+            print(f'{move}: {nodes}')
+        total = sum(split.values())
+        print(f'\nmoves {len(split)}  nodes {total}  {elapsed:.3f}s')
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump({'fen': fen, 'depth': args.depth, 'divide': split, 'nodes': total,
+                           'expected': expected, 'seconds': round(elapsed, 4)}, f, indent=2)
+        return 0 if expected is None or total == expected else 1
+
+    name = 'fen' if args.fen else args.position
+    result = run_case(name, fen, args.depth, expected, use_bitboards)
+    return 0 if _report([result], use_bitboards, args.json) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,341 @@
+import argparse
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from board import FEN_LETTERS, Board, move_name
+
+# ─── PGN 스트리밍 읽기 · SAN 해석 · 재생 ────────────────
+# 파일 전체를 메모리에 올리지 않고 한 판씩 generator 로 흘려 보낸다
+SAN_PIECES = {'N': 'knight', 'B': 'bishop', 'R': 'rook', 'Q': 'queen', 'K': 'king'}
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+GAME_START = b'\n[Event '
+CHUNK_BYTES = 8 << 20 # 병렬 재생 청크 상한 — 큰 파일은 청크를 늘려 한 번에 들고 있는 결과를 제한
+
+_TAG_RE = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+_SAN_RE = re.compile(r'^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?$')
+_MOVE_NUMBER_RE = re.compile(r'^\d+\.+')
+
+
+# ─── 읽기 ───────────────────────────────────────────
+def _lines(source, start=0, end=None):
+    # 경로 / 바이너리 파일 객체 / bytes·mmap 버퍼 → 바이트 줄 generator
+    # 버퍼는 복사 없이 [start, end) 구간만 줄 단위로 잘라 읽는다
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            yield from f
+    elif isinstance(source, (bytes, bytearray, mmap.mmap)):
+        end = len(source) if end is None else end
+        while start < end:
+            stop = source.find(b'\n', start, end)
+            stop = end if stop < 0 else stop + 1
+            yield source[start:stop]
+            start = stop
+    else:
+        yield from source
+
+
+def iter_games(source, start=0, end=None):
+    # (헤더 dict, 수순 문자열) 를 한 판씩 내보낸다
+    # start/end 는 버퍼의 바이트 구간 (병렬 청크용)
+    # 판 경계: 수순 뒤의 헤더, 빈 줄로 끝난 헤더 묶음 뒤의 헤더 (수순 없는 판),
+    # 결과 토큰으로 끝난 수순 뒤의 빈 줄 (헤더 없는 판)
+    headers, movetext = {}, []
+    headers_done = False # 헤더 묶음 뒤에 빈 줄이 나왔음
+    for raw in _lines(source, start, end):
+        line = raw.decode('utf-8', 'replace').strip()
+        if line.startswith('['):
+            if movetext or headers_done:
+                yield headers, '\n'.join(movetext)
+                headers, movetext, headers_done = {}, [], False
+            m = _TAG_RE.match(line)
+            if m:
+                headers[m.group(1)] = m.group(2).replace('\\"', '"').replace('\\\\', '\\')
+        elif not line:
+            if movetext and movetext[-1].split()[-1] in RESULTS:
+                yield headers, '\n'.join(movetext)
+                headers, movetext, headers_done = {}, [], False
+            elif headers and not movetext:
+                headers_done = True
+        elif not line.startswith('%'):
+            movetext.append(line)
+    if headers or movetext:
+        yield headers, '\n'.join(movetext)
+
+
+def san_tokens(movetext):
+    # 주석 {…} ;…줄끝 변화수 (…) NAG $n 수 번호 결과를 걷어내고 SAN 토큰만
+    tokens = []
+    depth = 0
+    i, n = 0, len(movetext)
+    while i < n:
+        ch = movetext[i]
+        if ch == '{':
+            close = movetext.find('}', i)
+            i = n if close < 0 else close + 1
+            continue
+        if ch == ';':
+            close = movetext.find('\n', i)
+            i = n if close < 0 else close + 1
+            continue
+        if ch == '(':
+            depth += 1; i += 1; continue
+        if ch == ')':
+            depth -= 1; i += 1; continue
+        if ch.isspace():
+            i += 1; continue
+        j = i
+        while j < n and not movetext[j].isspace() and movetext[j] not in '{}();':
+            j += 1
+        token = movetext[i:j]
+        i = j
+        if depth > 0 or token.startswith('$') or token in RESULTS:
+            continue
+        token = _MOVE_NUMBER_RE.sub('', token)
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+# ─── SAN 해석 ───────────────────────────────────────
+def decode_san(board, san):
+    # SAN ('Nbd7', 'exd8=Q+', 'O-O') → (from_pos, to_pos, promotion), 합법수 표에서 찾는다
+    moves = board.move_table()[1]
+    text = san.rstrip('+#!?')
+    if text in ('O-O', '0-0', 'O-O-O', '0-0-0'):
+        tx = 6 if len(text) == 3 else 2
+        for move in moves:
+            (fx, fy), (mx, _), _ = move
+            if board.grid[fy][fx].ptype == 'king' and mx == tx and abs(mx - fx) == 2:
+                return move
+        raise ValueError(f'캐슬링 불가: {san}')
+
+    m = _SAN_RE.match(text)
+    if not m:
+        raise ValueError(f'SAN 형식 오류: {san}')
+    letter, from_file, from_rank, dest, promo_letter = m.groups()
+    ptype = SAN_PIECES[letter] if letter else 'pawn'
+    to_pos = ('abcdefgh'.index(dest[0]), 8 - int(dest[1]))
+    fx_want = 'abcdefgh'.index(from_file) if from_file else None
+    fy_want = 8 - int(from_rank) if from_rank else None
+    promo = SAN_PIECES[promo_letter] if promo_letter else None
+
+    found = []
+    for move in moves:
+        from_pos, mto, mpromo = move
+        if mto != to_pos:
+            continue
+        fx, fy = from_pos
+        if board.grid[fy][fx].ptype != ptype:
+            continue
+        if (fx_want is not None and fx != fx_want) or (fy_want is not None and fy != fy_want):
+            continue
+        # 승격 표기가 빠진 수는 퀸으로 본다
+        if mpromo != (promo or ('queen' if mpromo else None)):
+            continue
+        found.append(move)
+    if len(found) != 1:
+        raise ValueError(f"{'모호한' if found else '불법'} 수: {san}")
+    return found[0]
+
+
+def encode_san(board, move):
+    # (from_pos, to_pos, promotion) → SAN, 두기 전 포지션 기준 (+/# 포함)
+    from_pos, to_pos, promo = move
+    fx, fy = from_pos
+    tx, ty = to_pos
+    piece = board.grid[fy][fx]
+    dest = 'abcdefgh'[tx] + str(8 - ty)
+    if piece.ptype == 'king' and abs(tx - fx) == 2:
+        san = 'O-O' if tx == 6 else 'O-O-O'
+    elif piece.ptype == 'pawn':
+        capture = fx != tx
+        san = ('abcdefgh'[fx] + 'x' if capture else '') + dest
+        if promo:
+            san += '=' + FEN_LETTERS[promo].upper()
+    else:
+        letter = FEN_LETTERS[piece.ptype].upper()
+        # 같은 종류 기물이 같은 칸으로 갈 수 있으면 파일 → 랭크 → 둘 다 순으로 구분
+        rivals = [f for f, t, _ in board.move_table()[1]
+                  if t == to_pos and f != from_pos and board.grid[f[1]][f[0]].ptype == piece.ptype]
+        if not rivals:
+            hint = ''
+        elif all(f[0] != fx for f in rivals):
+            hint = 'abcdefgh'[fx]
+        elif all(f[1] != fy for f in rivals):
+            hint = str(8 - fy)
+        else:
+            hint = 'abcdefgh'[fx] + str(8 - fy)
+        san = letter + hint + ('x' if board.grid[ty][tx] else '') + dest
+    board.make_move(from_pos, to_pos, promo)
+    status = board.status()
+    board.unmake_move()
+    if status == 'checkmate':
+        san += '#'
+    elif status == 'check':
+        san += '+'
+    return san
+
+
+def format_game(headers, sans, result='*'):
+    # 헤더 dict + SAN 목록 → PGN 텍스트 한 판 (수순은 80자 근처에서 줄바꿈)
+    fen = headers.get('FEN')
+    fields = fen.split() if fen else []
+    # 4필드 FEN (반수·수 번호 없음) 은 1수부터
+    black_first = len(fields) > 1 and fields[1] == 'b'
+    number = int(fields[5]) if len(fields) > 5 and fields[5].isdigit() else 1
+    lines = [f'[{k} "{v}"]' for k, v in headers.items()]
+    words = []
+    for i, san in enumerate(sans):
+        white_ply = (i % 2 == 0) != black_first
+        if white_ply:
+            words.append(f'{number}.')
+        elif i == 0:
+            words.append(f'{number}...')
+        words.append(san)
+        if not white_ply:
+            number += 1
+    words.append(result)
+    text, line = [], ''
+    for word in words:
+        if line and len(line) + 1 + len(word) > 79:
+            text.append(line); line = word
+        else:
+            line = f'{line} {word}' if line else word
+    text.append(line)
+    return '\n'.join(lines) + '\n\n' + '\n'.join(text) + '\n\n'
+
+
+# ─── 재생 ───────────────────────────────────────────
+def replay_game(headers, movetext, use_bitboards=True):
+    # 한 판을 Board.move_piece 로 끝까지 두고 검증 결과를 dict 로
+    fen = headers.get('FEN')
+    board = Board.from_fen(fen, use_bitboards) if fen else Board(use_bitboards)
+    plies = 0
+    error = None
+    for san in san_tokens(movetext):
+        try:
+            move = decode_san(board, san)
+        except ValueError as e:
+            error = f'ply {plies + 1}: {e}'
+            break
+        if not board.move_piece(*move):
+            error = f'ply {plies + 1}: move_piece 가 거부함 {san} ({move_name(move)})'
+            break
+        plies += 1
+    status = board.status()
+    claimed = headers.get('Result', '*')
+    # 기보가 메이트로 끝났다면 결과 헤더와 맞아야 한다
+    if error is None and status == 'checkmate':
+        expected = '0-1' if board.white_to_move else '1-0'
+        if claimed not in (expected, '*'):
+            error = f'결과 불일치: 메이트({expected}) 인데 {claimed}'
+    return {
+        'white': headers.get('White'), 'black': headers.get('Black'),
+        'result': claimed, 'plies': plies, 'status': status,
+        'fen': board.to_fen(), 'error': error,
+    }
+
+
+def replay(source, use_bitboards=True, start=0, end=None):
+    # 한 판씩 재생 결과를 내보내는 generator
+    for headers, movetext in iter_games(source, start, end):
+        yield replay_game(headers, movetext, use_bitboards)
+
+
+# ─── 병렬 ───────────────────────────────────────────
+def split_chunks(path, count):
+    # 파일을 대략 count 등분하되 경계를 '[Event ' 헤더 시작에 맞춘다
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    bounds = [0]
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for i in range(1, count):
+            pos = mm.find(GAME_START, max(size * i // count, bounds[-1]))
+            if pos < 0:
+                break
+            if pos + 1 > bounds[-1]:
+                bounds.append(pos + 1)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def _replay_chunk(path, start, end, use_bitboards):
+    # 워커: 파일을 mmap 해서 [start, end) 구간의 판만 재생
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return list(replay(mm, use_bitboards, start, end))
+
+
+def replay_parallel(path, workers=None, use_bitboards=True, chunks_per_worker=4):
+    # 파일 청크를 프로세스 풀에 나눠 재생, 청크 순서대로 판별 결과를 내보낸다
+    workers = workers or os.cpu_count() or 1
+    chunks = split_chunks(path, max(workers * chunks_per_worker, os.path.getsize(path) // CHUNK_BYTES))
+    if workers == 1:
+        for start, end in chunks:
+            yield from _replay_chunk(path, start, end, use_bitboards)
+        return
+    # 제출은 workers*2 개까지만 앞서 보내고, 내보낸 청크의 결과는 바로 버린다
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for start, end in chunks:
+            pending.append(pool.submit(_replay_chunk, path, start, end, use_bitboards))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='PGN 데이터베이스를 Board 로 재생해 검증 · 처리량 측정')
+    parser.add_argument('pgn')
+    parser.add_argument('--workers', type=int, default=None, help='프로세스 수 (기본: cpu 수)')
+    parser.add_argument('--grid', action='store_true', help='비트보드 없이 grid 경로로 실행')
+    parser.add_argument('--out', help='판별 결과를 한 줄에 한 판씩 JSON 으로 저장 (.jsonl)')
+    parser.add_argument('--json', help='요약 통계를 JSON 파일로 저장')
+    args = parser.parse_args(argv)
+
+    games = plies = errors = 0
+    results = Counter()
+    out = open(args.out, 'w') if args.out else None
+    start = time.perf_counter()
+    try:
+        for record in replay_parallel(args.pgn, args.workers, not args.grid):
+            games += 1
+            plies += record['plies']
+            results[record['result']] += 1
+            if record['error']:
+                errors += 1
+                print(f"game {games}: {record['error']}", file=sys.stderr)
+            if out:
+                out.write(json.dumps(record) + '\n')
+    finally:
+        if out:
+            out.close()
+    elapsed = time.perf_counter() - start
+
+    summary = {
+        'file': args.pgn, 'bytes': os.path.getsize(args.pgn),
+        'workers': args.workers or os.cpu_count() or 1,
+        'games': games, 'plies': plies, 'errors': errors,
+        'seconds': round(elapsed, 4),
+        'games_per_sec': round(games / elapsed, 2) if elapsed > 0 else 0.0,
+        'plies_per_sec': int(plies / elapsed) if elapsed > 0 else 0,
+        'results': dict(results),
+    }
+    print(f"{games} games  {plies} plies  {errors} errors  {elapsed:.3f}s  "
+          f"{summary['games_per_sec']} games/s  {summary['plies_per_sec']} plies/s")
+    print('results:', '  '.join(f'{k} {v}' for k, v in sorted(results.items())))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
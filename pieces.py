@@ -1,165 +1,144 @@
-import os
-import sys
-
-# ─── frozen vs. 개발 환경 분기 ────────────────────
-if getattr(sys, 'frozen', False):
-    # PyInstaller onefile 로 묶였을 때
-    BASE_DIR = sys._MEIPASS
-else:
-    # .py 로 실행할 때
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-
-# ─── assets/pieces 폴더 경로 결정 ───────────────────
-# game.py 에서와 같은 상위 assets 폴더를 찾기 위해
-ASSETS_DIR = os.path.normpath(os.path.join(BASE_DIR, '..', 'assets'))
-# 대소문자나 위치가 다를 경우를 대비해… (필요 없으면 지워도 됩니다)
-if not os.path.isdir(ASSETS_DIR):
-    alt = os.path.join(BASE_DIR, 'assets')
-    if os.path.isdir(alt):
-        ASSETS_DIR = alt
-    else:
-        raise FileNotFoundError(f"assets 폴더를 찾을 수 없습니다: {ASSETS_DIR!r} 또는 {alt!r}")
-
-PIECES_DIR = os.path.join(ASSETS_DIR, 'pieces')
-
-# ─── 이미지 파일명 매핑 ─────────────────────────────
-IMAGE_FILES = {
-    'white': {
-        'pawn':   'W Pawn.png',
-        'rook':   'W Rook.png',
-        'knight': 'W Knight.png',
-        'bishop': 'W Bishop.png',
-        'queen':  'W Queen.png',
-        'king':   'W King.png',
-    },
-    'black': {
-        'pawn':   'B Pawn.png',
-        'rook':   'B Rook.png',
-        'knight': 'B Knight.png',
-        'bishop': 'B Bishop.png',
-        'queen':  'B Queen.png',
-        'king':   'B King.png',
-    }
-}
-
-class Piece:
-    def __init__(self, color, ptype):
-        self.color = color
-        self.ptype = ptype
-        self.has_moved = False
-        self.image_path = os.path.join(PIECES_DIR, IMAGE_FILES[color][ptype])
-
-    def get_valid_moves(self, pos, board):
-        return []
-
-class Pawn(Piece):
-    def __init__(self, color):
-        super().__init__(color, 'pawn')
-
-    def get_valid_moves(self, pos, board):
-        x, y = pos
-        moves = []
-        # dir: 흰색은 위(-1), 검은색은 아래(+1) 방향으로 전진
-        dir = -1 if self.color == 'white' else 1
-        # 1) 한 칸 전진
-        if 0 <= y + dir < 8 and board.grid[y + dir][x] is None:
-            moves.append((x, y + dir))
-            # 2) 두 칸 전진 (첫 이동 시)
-            if not self.has_moved and board.grid[y + 2*dir][x] is None:
-                moves.append((x, y + 2*dir))
-        # 3) 일반 대각선 캡처
-        for dx in (-1, 1):
-            nx, ny = x + dx, y + dir
-            if 0 <= nx < 8 and 0 <= ny < 8:
-                target = board.grid[ny][nx]
-                if target and target.color != self.color:
-                    moves.append((nx, ny))
-        # 4) 앙파상 (en passant)
-        last = board.move_history[-1] if board.move_history else None
-        if last and isinstance(last[0], Pawn) and abs(last[2][1] - last[1][1]) == 2:
-            lx, ly = last[2]
-            if ly == y and abs(lx - x) == 1:
-                moves.append((lx, y + dir))
-        # 5) ‘내가 이 수를 두면 내 킹이 체크가 되지 않는가?’ 필터
-        return [m for m in moves if not board._would_cause_check(pos, m)]
-
-class Rook(Piece):
-    def __init__(self, color):
-        super().__init__(color, 'rook')
-    # 4방향 슬라이딩 : 빈 칸이면 계속, 상대 기물이면 그 칸까지 이동하고 “벽”처럼 멈춤, 같은 색 기물이 나오면 그 방향은 중단
-    def get_valid_moves(self, pos, board):
-        moves = []
-        for dx, dy in [(1,0),(-1,0),(0,1),(0,-1)]:
-            x, y = pos
-            while True:
-                x += dx; y += dy
-                if not (0 <= x < 8 and 0 <= y < 8): break
-                target = board.grid[y][x]
-                if target is None:
-                    moves.append((x,y)); continue
-                if target.color != self.color:
-                    moves.append((x,y))
-                break
-        return [m for m in moves if not board._would_cause_check(pos, m)]
-
-class Bishop(Piece):
-    def __init__(self, color):
-        super().__init__(color, 'bishop')
-    # 4대각선 슬라이딩 : 룩과 마찬가지로, 빈 칸은 지나가고 적 기물이 있으면 멈춤
-    def get_valid_moves(self, pos, board):
-        moves = []
-        for dx, dy in [(1,1),(1,-1),(-1,1),(-1,-1)]:
-            x, y = pos
-            while True:
-                x += dx; y += dy
-                if not (0 <= x < 8 and 0 <= y < 8): break
-                target = board.grid[y][x]
-                if target is None:
-                    moves.append((x,y)); continue
-                if target.color != self.color:
-                    moves.append((x,y))
-                break
-        return [m for m in moves if not board._would_cause_check(pos, m)]
-
-class Knight(Piece):
-    def __init__(self, color):
-        super().__init__(color, 'knight')
-    # 8가지 L자 점프 : 장애물 무시, 중간 칸 체크 없이 점프, 빈 칸·적 기물 모두 이동 가능
-    def get_valid_moves(self, pos, board):
-        moves = []
-        for dx, dy in [(2,1),(2,-1),(-2,1),(-2,-1),(1,2),(1,-2),(-1,2),(-1,-2)]:
-            x, y = pos[0] + dx, pos[1] + dy
-            if 0 <= x < 8 and 0 <= y < 8:
-                target = board.grid[y][x]
-                if target is None or target.color != self.color:
-                    moves.append((x,y))
-        return [m for m in moves if not board._would_cause_check(pos, m)]
-
-class Queen(Piece):
-    def __init__(self, color):
-        super().__init__(color, 'queen')
-
-    def get_valid_moves(self, pos, board):
-        # 룩 + 비숍 이동을 합친다
-        return Rook(self.color).get_valid_moves(pos, board) + Bishop(self.color).get_valid_moves(pos, board)
-
-class King(Piece):
-    def __init__(self, color):
-        super().__init__(color, 'king')
-
-    def get_valid_moves(self, pos, board):
-        moves = []
-        # 1) 인접 8칸 이동
-        for dx in (-1,0,1):
-            for dy in (-1,0,1):
-                if dx==0 and dy==0: continue
-                x, y = pos[0] + dx, pos[1] + dy
-                if 0 <= x < 8 and 0 <= y < 8:
-                    target = board.grid[y][x]
-                    if target is None or target.color != self.color:
-                        moves.append((x,y))
-        # 2) 캐슬링 (킹이 움직인 적 없고, 현재 체크 상태도 아니면)
-        if not self.has_moved and not board.is_in_check(self.color):
-            if board._can_castle_kingside(self.color): moves.append((pos[0]+2,pos[1]))
-            if board._can_castle_queenside(self.color): moves.append((pos[0]-2,pos[1]))
-        return [m for m in moves if not board._would_cause_check(pos, m)]
+from zobrist import CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ
+
+# 색별 캐슬링 권한 비트
+CASTLE_WHITE, CASTLE_BLACK = CASTLE_WK | CASTLE_WQ, CASTLE_BK | CASTLE_BQ
+
+class Piece:
+    # 색·종류마다 인스턴스가 하나뿐인 불변 플라이웨이트 (Pawn('white') 는 항상 같은 객체)
+    # 움직였는지 여부는 기물이 아니라 Board 의 캐슬링 권한 비트·앙파상 칸이 기억한다
+    __slots__ = ('color',)
+    ptype = None
+    _instances = {}
+
+    def __new__(cls, color):
+        piece = Piece._instances.get((cls, color))
+        if piece is None:
+            piece = object.__new__(cls)
+            object.__setattr__(piece, 'color', color)
+            Piece._instances[(cls, color)] = piece
+        return piece
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} 는 불변 객체입니다')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} 는 불변 객체입니다')
+
+    def __reduce__(self):
+        # pickle·deepcopy 도 같은 인스턴스로
+        return type(self), (self.color,)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.color!r})'
+
+    def get_valid_moves(self, pos, board):
+        # 비트보드가 있으면 보드의 전체 합법수 생성기(핀·체크 계산 1회)에서 바로 가져온다
+        if board.bb is not None:
+            return board.legal_targets(pos)
+        # 없으면 의사합법수를 만들고 ‘내가 이 수를 두면 내 킹이 체크가 되지 않는가?’ 필터
+        return [m for m in self._pseudo_moves(pos, board) if not board._would_cause_check(pos, m)]
+
+    def _pseudo_moves(self, pos, board):
+        return []
+
+    def _slide_moves(self, pos, board, dirs):
+        # 슬라이딩 : 빈 칸이면 계속, 상대 기물이면 그 칸까지 이동하고 “벽”처럼 멈춤, 같은 색 기물이 나오면 그 방향은 중단
+        moves = []
+        for dx, dy in dirs:
+            x, y = pos
+            while True:
+                x += dx; y += dy
+                if not (0 <= x < 8 and 0 <= y < 8): break
+                target = board.grid[y][x]
+                if target is None:
+                    moves.append((x,y)); continue
+                if target.color != self.color:
+                    moves.append((x,y))
+                break
+        return moves
+
+class Pawn(Piece):
+    __slots__ = ()
+    ptype = 'pawn'
+
+    def _pseudo_moves(self, pos, board):
+        x, y = pos
+        moves = []
+        # dir: 흰색은 위(-1), 검은색은 아래(+1) 방향으로 전진
+        dir = -1 if self.color == 'white' else 1
+        # 1) 한 칸 전진
+        if 0 <= y + dir < 8 and board.grid[y + dir][x] is None:
+            moves.append((x, y + dir))
+            # 2) 두 칸 전진 (시작 줄에 있을 때)
+            if y == (6 if self.color == 'white' else 1) and board.grid[y + 2*dir][x] is None:
+                moves.append((x, y + 2*dir))
+        # 3) 일반 대각선 캡처
+        for dx in (-1, 1):
+            nx, ny = x + dx, y + dir
+            if 0 <= nx < 8 and 0 <= ny < 8:
+                target = board.grid[ny][nx]
+                if target and target.color != self.color:
+                    moves.append((nx, ny))
+        # 4) 앙파상 (en passant): 보드가 기억하는 앙파상 칸으로 대각선 이동
+        ep = board.ep_square
+        if ep and ep[1] == y + dir and abs(ep[0] - x) == 1 and (self.color == 'white') == board.white_to_move:
+            moves.append(ep)
+        return moves
+
+class Rook(Piece):
+    __slots__ = ()
+    ptype = 'rook'
+    # 4방향 슬라이딩
+    def _pseudo_moves(self, pos, board):
+        return self._slide_moves(pos, board, [(1,0),(-1,0),(0,1),(0,-1)])
+
+class Bishop(Piece):
+    __slots__ = ()
+    ptype = 'bishop'
+    # 4대각선 슬라이딩 : 룩과 마찬가지로, 빈 칸은 지나가고 적 기물이 있으면 멈춤
+    def _pseudo_moves(self, pos, board):
+        return self._slide_moves(pos, board, [(1,1),(1,-1),(-1,1),(-1,-1)])
+
+class Knight(Piece):
+    __slots__ = ()
+    ptype = 'knight'
+    # 8가지 L자 점프 : 장애물 무시, 중간 칸 체크 없이 점프, 빈 칸·적 기물 모두 이동 가능
+    def _pseudo_moves(self, pos, board):
+        moves = []
+        for dx, dy in [(2,1),(2,-1),(-2,1),(-2,-1),(1,2),(1,-2),(-1,2),(-1,-2)]:
+            x, y = pos[0] + dx, pos[1] + dy
+            if 0 <= x < 8 and 0 <= y < 8:
+                target = board.grid[y][x]
+                if target is None or target.color != self.color:
+                    moves.append((x,y))
+        return moves
+
+class Queen(Piece):
+    __slots__ = ()
+    ptype = 'queen'
+
+    def _pseudo_moves(self, pos, board):
+        # 룩 + 비숍 방향을 합친다 (임시 Rook/Bishop 객체 없이)
+        return self._slide_moves(pos, board, [(1,0),(-1,0),(0,1),(0,-1),(1,1),(1,-1),(-1,1),(-1,-1)])
+
+class King(Piece):
+    __slots__ = ()
+    ptype = 'king'
+
+    def _pseudo_moves(self, pos, board):
+        moves = []
+        # 1) 인접 8칸 이동
+        for dx in (-1,0,1):
+            for dy in (-1,0,1):
+                if dx==0 and dy==0: continue
+                x, y = pos[0] + dx, pos[1] + dy
+                if 0 <= x < 8 and 0 <= y < 8:
+                    target = board.grid[y][x]
+                    if target is None or target.color != self.color:
+                        moves.append((x,y))
+        # 2) 캐슬링 (보드에 권한이 남아 있고, 현재 체크 상태도 아니면)
+        rights = CASTLE_WHITE if self.color == 'white' else CASTLE_BLACK
+        if board.castling_rights() & rights and not board.is_in_check(self.color):
+            if board._can_castle_kingside(self.color): moves.append((pos[0]+2,pos[1]))
+            if board._can_castle_queenside(self.color): moves.append((pos[0]-2,pos[1]))
+        return moves
@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+# ─── 에셋 경로 · 이미지 로더 (한 곳에서만) ──────────────────
+# 임포트만으로는 파일시스템도 pygame 도 건드리지 않는다 → board·pieces·엔진은 에셋 없이 동작
+# assets 폴더는 처음 필요할 때 한 번 찾고, 없으면 그때 FileNotFoundError
+
+# ─── 이미지 파일명 매핑 ─────────────────────────────
+BOARD_FILE = 'board.png'
+IMAGE_FILES = {
+    'white': {
+        'pawn':   'W Pawn.png',
+        'rook':   'W Rook.png',
+        'knight': 'W Knight.png',
+        'bishop': 'W Bishop.png',
+        'queen':  'W Queen.png',
+        'king':   'W King.png',
+    },
+    'black': {
+        'pawn':   'B Pawn.png',
+        'rook':   'B Rook.png',
+        'knight': 'B Knight.png',
+        'bishop': 'B Bishop.png',
+        'queen':  'B Queen.png',
+        'king':   'B King.png',
+    }
+}
+
+_assets_dir = None
+
+
+def base_dir():
+    if getattr(sys, 'frozen', False):
+        # PyInstaller onefile 로 묶였을 때
+        return sys._MEIPASS
+    # .py 로 실행할 때
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def assets_dir():
+    # 기본: BASE_DIR/../assets, 없으면: BASE_DIR/assets
+    global _assets_dir
+    if _assets_dir is None:
+        base = base_dir()
+        candidates = (os.path.normpath(os.path.join(base, '..', 'assets')), os.path.join(base, 'assets'))
+        for path in candidates:
+            if os.path.isdir(path):
+                _assets_dir = path
+                break
+        else:
+            raise FileNotFoundError(f"assets 폴더를 찾을 수 없습니다: {candidates[0]!r} 또는 {candidates[1]!r}")
+    return _assets_dir
+
+
+def board_image_path():
+    return os.path.join(assets_dir(), BOARD_FILE)
+
+
+def piece_image_path(color, ptype):
+    return os.path.join(assets_dir(), 'pieces', IMAGE_FILES[color][ptype])
+
+
+class ImageLoader:
+    # 보드·기물 PNG 13장을 백그라운드 스레드에서 한 번에 읽고 디코딩
+    # 메인 스레드는 그동안 창·폰트를 만들고, get() 은 끝날 때까지만 기다린다
+    # convert()/convert_alpha() 는 화면이 생긴 뒤 메인 스레드에서 (호출하는 쪽 몫)
+    def __init__(self):
+        self.images = {} # 'board' 또는 (color, ptype) → 디코딩된 Surface
+        self.error = None
+        self.seconds = None # 디코딩에 걸린 시간
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def preload(self):
+        # 여러 번 불러도 스레드는 하나
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._load_all, name='asset-preload', daemon=True)
+                self.thread.start()
+        return self
+
+    def _load_all(self):
+        start = time.perf_counter()
+        try:
+            import pygame
+            self.images['board'] = pygame.image.load(board_image_path())
+            for color, files in IMAGE_FILES.items():
+                for ptype in files:
+                    self.images[(color, ptype)] = pygame.image.load(piece_image_path(color, ptype))
+        except Exception as e:
+            # 메인 스레드의 get() 에서 다시 던진다
+            self.error = e
+        self.seconds = time.perf_counter() - start
+
+    def wait(self):
+        self.preload().thread.join()
+        if self.error is not None:
+            raise self.error
+        return self
+
+    def get(self, key):
+        return self.wait().images[key]
+
+
+images = ImageLoader()
+
+
+# ─── 시작 시간 측정 ─────────────────────────────────
+# 매번 새 인터프리터로 재야 임포트 캐시(sys.modules) 영향이 없다
+STARTUP_PROBES = {
+    # 헤드리스: 규칙·엔진만 (pygame·에셋 없이 동작해야 한다)
+    'headless': "import board, engine; board.Board().move_table()",
+    # GUI: pygame·game 임포트 + 이미지 13장 디코딩 (창은 열지 않는다)
+    'gui': "import game, resources; resources.images.wait()",
+}
+
+
+def measure_startup(probe, runs=5):
+    # python -c 한 번의 전체 시간 (인터프리터 기동 포함)과 probe 코드 자체의 시간, 초 단위 중앙값
+    code = ("import time; _t = time.perf_counter()\n" + STARTUP_PROBES[probe]
+            + "\nprint(time.perf_counter() - _t)")
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT='1', SDL_VIDEODRIVER='dummy')
+    wall, inner = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, '-c', code], cwd=cwd, env=env,
+                             capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        if out.returncode != 0:
+            raise RuntimeError(f'{probe} 시작 측정 실패:\n{out.stderr}')
+        wall.append(elapsed)
+        inner.append(float(out.stdout.split()[-1]))
+    return {'probe': probe, 'runs': runs,
+            'wall_ms': round(statistics.median(wall) * 1000, 1),
+            'import_ms': round(statistics.median(inner) * 1000, 1)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='에셋 위치 확인 / 시작 시간 측정')
+    parser.add_argument('--startup', nargs='*', choices=sorted(STARTUP_PROBES), default=None,
+                        help='새 프로세스로 시작 시간 측정 (기본: 전부)')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--json', help='측정 결과를 JSON 파일로 저장')
+    args = parser.parse_args(argv)
+
+    if args.startup is None:
+        print(assets_dir())
+        images.wait()
+        print(f'{len(images.images)} images decoded in {images.seconds * 1000:.1f} ms')
+        return 0
+
+    rows = []
+    for probe in args.startup or sorted(STARTUP_PROBES):
+        row = measure_startup(probe, args.runs)
+        rows.append(row)
+        print(f"{probe:<9} wall {row['wall_ms']:>7.1f} ms  import {row['import_ms']:>7.1f} ms  "
+              f"(median of {row['runs']})")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,283 @@
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from board import Board, move_name
+from perft import perft
+from uci import parse_move
+from zobrist import PositionCache
+
+# ─── 로컬 포지션 분석 서비스 (HTTP 또는 유닉스 소켓) ──────────
+# POST /analyze  {"positions": [FEN | "startpos" | {"fen", "moves", "perft"}], "perft": 깊이}
+#   → 합법수 · 체크/메이트/스테일메이트 · perft 노드 수를 포지션 순서대로
+# GET  /stats    요청 수 · 캐시 적중률 · 요청 지연(p50/p95/p99) · 처리량
+# 포지션은 미리 띄워 둔 프로세스 풀에 나눠 보내고, 결과는 메인 프로세스의 LRU 캐시에 남긴다
+MAX_BATCH       = 10000 # 요청 하나의 최대 포지션 수
+MAX_PERFT       = 5
+LATENCY_WINDOW  = 1000 # 지연 백분위를 계산할 최근 요청 수
+RECENT_SECONDS  = 60 # 최근 처리량 구간
+CHUNKS_PER_WORKER = 2
+
+
+# ─── 워커 프로세스 쪽 ────────────────────────────────
+_warm = False
+
+
+def _warm_up():
+    # 풀 생성 직후 호출: 임포트·공격 테이블 계산·첫 수 생성을 미리 끝낸다
+    global _warm
+    if not _warm:
+        Board().move_table()
+        _warm = True
+    return os.getpid()
+
+
+def _warm_up_task(_):
+    return _warm_up()
+
+
+def analyze_position(fen, moves=(), depth=0):
+    # 포지션 하나 → 결과 dict (잘못된 FEN·수는 'error')
+    try:
+        board = Board() if fen == 'startpos' else Board.from_fen(fen)
+    except (ValueError, IndexError) as e:
+        return {'error': f'잘못된 FEN: {e}'}
+    for text in moves:
+        move = parse_move(board, text)
+        if move is None:
+            return {'error': f'불법 수: {text}'}
+        board.make_move(*move)
+    _, legal, _, status = board.move_table()
+    result = {
+        'fen': board.to_fen(),
+        'side': 'white' if board.white_to_move else 'black',
+        'status': status,
+        'in_check': status in ('check', 'checkmate'),
+        'legal_moves': [move_name(m) for m in legal],
+        'fifty_move': board.is_fifty_move_draw(),
+    }
+    if depth:
+        result['perft'] = perft(board, depth)
+    return result
+
+
+def _analyze_chunk(items):
+    _warm_up()
+    return [analyze_position(fen, moves, depth) for fen, moves, depth in items]
+
+
+# ─── 메인 프로세스 쪽 ────────────────────────────────
+def _cache_key(fen, moves, depth):
+    # 공백만 정리한 FEN + 수순 + perft 깊이 (결과에 FEN 을 그대로 돌려주므로 반수·수 번호까지 포함)
+    return (' '.join(fen.split()), moves, depth)
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class AnalysisService:
+    def __init__(self, workers=None, cache_size=100000):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        # 워커를 미리 띄워 둔다
+        list(self.pool.map(_warm_up_task, range(self.workers)))
+        self.cache = PositionCache(cache_size)
+        self.lock = threading.Lock() # 캐시·통계는 요청 스레드들이 함께 쓴다
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.positions = 0
+        self.computed = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW) # 최근 요청 지연 (초)
+        self.recent = deque() # (끝난 시각, 포지션 수) — 최근 RECENT_SECONDS 초
+
+    def analyze(self, specs, depth=0):
+        # specs → 결과 목록 (같은 순서), 캐시에 없는 포지션만 워커 풀로
+        start = time.perf_counter()
+        if len(specs) > MAX_BATCH:
+            raise ValueError(f'포지션이 너무 많음: {len(specs)} > {MAX_BATCH}')
+        items = []
+        for spec in specs:
+            if isinstance(spec, str):
+                spec = {'fen': spec}
+            if not isinstance(spec, dict) or not isinstance(spec.get('fen'), str):
+                raise ValueError(f'잘못된 포지션: {spec!r}')
+            d = spec.get('perft', depth)
+            if not isinstance(d, int) or not 0 <= d <= MAX_PERFT:
+                raise ValueError(f'perft 깊이는 0..{MAX_PERFT}: {d!r}')
+            moves = spec.get('moves', [])
+            if not isinstance(moves, list) or not all(isinstance(m, str) for m in moves):
+                raise ValueError(f'moves 는 UCI 수 문자열 목록: {moves!r}')
+            items.append((spec['fen'], tuple(moves), d))
+
+        results = [None] * len(items)
+        missing = {} # 캐시 키 → [결과 목록의 인덱스]
+        with self.lock:
+            for i, item in enumerate(items):
+                key = _cache_key(*item)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    results[i] = cached
+                else:
+                    missing.setdefault(key, []).append(i)
+        work = [items[indices[0]] for indices in missing.values()]
+        if work:
+            size = max(1, -(-len(work) // (self.workers * CHUNKS_PER_WORKER)))
+            chunks = [work[i:i + size] for i in range(0, len(work), size)]
+            computed = [r for chunk in self.pool.map(_analyze_chunk, chunks) for r in chunk]
+            with self.lock:
+                for (key, indices), result in zip(missing.items(), computed):
+                    if 'error' not in result:
+                        self.cache.put(key, result)
+                    for i in indices:
+                        results[i] = result
+
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.requests += 1
+            self.positions += len(items)
+            self.computed += len(work)
+            self.latencies.append(elapsed)
+            self.recent.append((time.time(), len(items)))
+        return {'results': results, 'positions': len(items), 'cached': len(items) - len(work),
+                'ms': round(elapsed * 1000, 3)}
+
+    def stats(self):
+        now = time.time()
+        with self.lock:
+            while self.recent and self.recent[0][0] < now - RECENT_SECONDS:
+                self.recent.popleft()
+            latencies = list(self.latencies)
+            uptime = now - self.started
+            lookups = self.cache.hits + self.cache.misses
+            return {
+                'uptime_s': round(uptime, 1),
+                'workers': self.workers,
+                'requests': self.requests,
+                'errors': self.errors,
+                'positions': self.positions,
+                'computed': self.computed,
+                'cache': {'size': len(self.cache.data), 'maxsize': self.cache.maxsize,
+                          'hits': self.cache.hits, 'misses': self.cache.misses,
+                          'hit_rate': round(self.cache.hits / lookups, 4) if lookups else 0.0},
+                'latency_ms': {
+                    'window': len(latencies),
+                    'mean': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+                    'p50': round(_percentile(latencies, 0.50) * 1000, 3),
+                    'p95': round(_percentile(latencies, 0.95) * 1000, 3),
+                    'p99': round(_percentile(latencies, 0.99) * 1000, 3),
+                    'max': round(max(latencies, default=0.0) * 1000, 3),
+                },
+                'throughput': {
+                    'positions_per_sec': round(self.positions / uptime, 2) if uptime > 0 else 0.0,
+                    'recent_positions_per_sec': round(sum(n for _, n in self.recent) / RECENT_SECONDS, 2),
+                },
+            }
+
+    def close(self):
+        self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ─── HTTP ───────────────────────────────────────────
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1' # keep-alive: 도구가 연결 하나로 요청을 이어 보낼 수 있게
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._send(200, self.server.service.stats())
+        else:
+            self._send(404, {'error': f'없는 경로: {self.path}'})
+
+    def do_POST(self):
+        if self.path != '/analyze':
+            self._send(404, {'error': f'없는 경로: {self.path}'})
+            return
+        service = self.server.service
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            positions = body['positions'] if isinstance(body, dict) else body
+            if not isinstance(positions, list):
+                raise ValueError('positions 는 목록이어야 함')
+            reply = service.analyze(positions, body.get('perft', 0) if isinstance(body, dict) else 0)
+        except (ValueError, KeyError) as e:
+            with service.lock:
+                service.errors += 1
+            self._send(400, {'error': str(e)})
+            return
+        self._send(200, reply)
+
+    def _send(self, code, obj):
+        data = json.dumps(obj).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            sys.stderr.write(f'{self.command} {self.path} {fmt % args}\n')
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service, host='127.0.0.1', port=8765, unix_path=None, verbose=False):
+    if unix_path:
+        if os.path.exists(unix_path):
+            os.unlink(unix_path)
+        server = UnixHTTPServer(unix_path, _Handler)
+    else:
+        server = ThreadingHTTPServer((host, port), _Handler)
+        server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='로컬 포지션 분석 서비스 (합법수·체크·메이트·perft)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='TCP 대신 유닉스 소켓 경로로 듣기')
+    parser.add_argument('--workers', type=int, default=None, help='프로세스 수 (기본: cpu 수)')
+    parser.add_argument('--cache', type=int, default=100000, help='결과 캐시 항목 수')
+    parser.add_argument('--verbose', action='store_true', help='요청마다 한 줄 로그')
+    args = parser.parse_args(argv)
+
+    with AnalysisService(args.workers, args.cache) as service:
+        server = make_server(service, args.host, args.port, args.unix, args.verbose)
+        where = args.unix or f'http://{args.host}:{args.port}'
+        print(f'listening on {where} ({service.workers} workers)', flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if args.unix and os.path.exists(args.unix):
+                os.unlink(args.unix)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from board import Board, move_name
+from engine import Engine
+
+# ─── 화면 없이 대국을 대량으로 돌리는 시뮬레이터 ───────────
+# pygame 을 임포트하지 않는다 → CI·분석 서버에서 그대로 실행 가능
+PLAYERS = ('random', 'engine')
+
+# 워커 프로세스마다 엔진 하나를 만들어 재사용
+_worker_engine = None
+
+
+def _engine():
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = Engine(tt_bits=16)
+    return _worker_engine
+
+
+def choose_move(board, player, rng, depth):
+    moves = board.move_table()[1]
+    if player == 'random':
+        return rng.choice(moves)
+    return _engine().search(board, max_depth=depth).move or rng.choice(moves)
+
+
+def _check_board(board):
+    # 규칙 회귀 검사: FEN 왕복 · 증분 해시 == 처음부터 다시 계산한 해시
+    fen = board.to_fen()
+    fresh = Board.from_fen(fen, board.bb is not None)
+    if fresh.to_fen() != fen:
+        raise AssertionError(f'FEN 왕복 불일치: {fen} → {fresh.to_fen()}')
+    if fresh.hash != board.hash:
+        raise AssertionError(f'증분 해시 불일치: {fen}')
+
+
+def play_game(index, seed, white='random', black='random', max_plies=300, depth=2,
+              check=False, use_bitboards=True):
+    # 한 판을 끝까지 두고 결과·기보를 dict 로 돌려준다
+    rng = random.Random(seed)
+    board = Board(use_bitboards)
+    start_fen = board.to_fen()
+    players = {True: white, False: black}
+    moves = []
+    result, reason = '*', 'max-plies'
+    start = time.perf_counter()
+    try:
+        while len(moves) < max_plies:
+            status = board.status()
+            if status == 'checkmate':
+                result, reason = ('0-1' if board.white_to_move else '1-0'), 'checkmate'; break
+            if status == 'stalemate':
+                result, reason = '1/2-1/2', 'stalemate'; break
+            if board.is_threefold_repetition():
+                result, reason = '1/2-1/2', 'threefold'; break
+            if board.is_fifty_move_draw():
+                result, reason = '1/2-1/2', 'fifty-move'; break
+            move = choose_move(board, players[board.white_to_move], rng, depth)
+            if not board.move_piece(*move):
+                raise AssertionError(f'합법수 표의 수가 거부됨: {move_name(move)} @ {board.to_fen()}')
+            moves.append(move_name(move))
+            if check:
+                _check_board(board)
+        if check:
+            # 전부 되돌리면 시작 포지션으로 돌아와야 한다
+            end_fen = board.to_fen()
+            while board.undo_stack:
+                board.unmake_move()
+            if board.to_fen() != start_fen:
+                raise AssertionError(f'unmake 후 시작 포지션 불일치: {board.to_fen()}')
+            fen = end_fen
+        else:
+            fen = board.to_fen()
+        error = None
+    except Exception:
+        result, reason = '*', 'error'
+        fen = board.to_fen()
+        error = traceback.format_exc()
+    return {
+        'game': index, 'seed': seed, 'white': white, 'black': black,
+        'result': result, 'reason': reason, 'plies': len(moves),
+        'seconds': round(time.perf_counter() - start, 4),
+        'moves': moves, 'fen': fen, 'error': error,
+    }
+
+
+def _play_task(args):
+    return play_game(*args)
+
+
+def simulate(games, white='random', black='random', workers=None, seed=0, max_plies=300,
+             depth=2, check=False, use_bitboards=True, on_game=None):
+    # games 판을 프로세스 풀에 나눠 두고 요약 통계를 돌려준다
+    workers = workers or os.cpu_count() or 1
+    tasks = [(i, seed + i, white, black, max_plies, depth, check, use_bitboards) for i in range(games)]
+    results = Counter()
+    reasons = Counter()
+    plies = 0
+    errors = 0
+    start = time.perf_counter()
+    if workers == 1:
+        records = map(_play_task, tasks)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        records = pool.map(_play_task, tasks, chunksize=max(1, games // (workers * 8)))
+    try:
+        for record in records:
+            results[record['result']] += 1
+            reasons[record['reason']] += 1
+            plies += record['plies']
+            errors += record['error'] is not None
+            if on_game:
+                on_game(record)
+    finally:
+        if pool:
+            pool.shutdown()
+    elapsed = time.perf_counter() - start
+    return {
+        'games': games, 'workers': workers, 'white': white, 'black': black,
+        'seed': seed, 'max_plies': max_plies, 'depth': depth,
+        'backend': 'bitboard' if use_bitboards else 'grid',
+        'plies': plies, 'errors': errors,
+        'seconds': round(elapsed, 4),
+        'games_per_sec': round(games / elapsed, 2) if elapsed > 0 else 0.0,
+        'plies_per_sec': int(plies / elapsed) if elapsed > 0 else 0,
+        'results': dict(results), 'reasons': dict(reasons),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='화면 없이 대국 N 판을 병렬로 시뮬레이션')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--white', choices=PLAYERS, default='random')
+    parser.add_argument('--black', choices=PLAYERS, default='random')
+    parser.add_argument('--workers', type=int, default=None, help='프로세스 수 (기본: cpu 수, 1 이면 풀 없이)')
+    parser.add_argument('--seed', type=int, default=0, help='i 번째 판의 시드는 seed + i')
+    parser.add_argument('--max-plies', type=int, default=300)
+    parser.add_argument('--depth', type=int, default=2, help='engine 플레이어 탐색 깊이')
+    parser.add_argument('--check', action='store_true', help='매 수 FEN 왕복·해시, 끝나면 unmake 전체를 검사')
+    parser.add_argument('--grid', action='store_true', help='비트보드 없이 grid 경로로 실행')
+    parser.add_argument('--out', help='기보를 한 줄에 한 판씩 JSON 으로 저장 (.jsonl)')
+    parser.add_argument('--json', help='요약 통계를 JSON 파일로 저장')
+    args = parser.parse_args(argv)
+
+    out = open(args.out, 'w') if args.out else None
+
+    def on_game(record):
+        if out:
+            out.write(json.dumps(record) + '\n')
+        if record['error']:
+            print(f"game {record['game']} (seed {record['seed']}) 오류:\n{record['error']}", file=sys.stderr)
+
+    try:
+        summary = simulate(args.games, args.white, args.black, args.workers, args.seed,
+                           args.max_plies, args.depth, args.check, not args.grid, on_game)
+    finally:
+        if out:
+            out.close()
+
+    print(f"{summary['games']} games  {summary['plies']} plies  {summary['seconds']:.3f}s  "
+          f"{summary['games_per_sec']} games/s  {summary['plies_per_sec']} plies/s  "
+          f"({summary['workers']} workers, {summary['backend']})")
+    print('results:', '  '.join(f'{k} {v}' for k, v in sorted(summary['results'].items())))
+    print('reasons:', '  '.join(f'{k} {v}' for k, v in sorted(summary['reasons'].items())))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+    return 1 if summary['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,364 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from bitboard import COLORS, PTYPES
+from evaluation import PIECE_VALUES
+
+# ─── 후퇴 분석(retrograde) 엔드게임 테이블 ──────────────
+# 서명: 백 기물 + 흑 기물 글자 ('KQK', 'KPK', 'KRKB' …), 항상 백이 강한 쪽
+# 색인: 기물 칸(sq = y*8 + x)을 서명 순서대로 64진수로 이은 뒤 *2 + (흑 차례면 1)
+# 값 1바이트: 0 = 무승부, 255 = 불가능한 배치, 그 외 d+1 (d = 메이트까지 반수, 차례인 쪽 기준
+#   d 홀수 → 이김, d 짝수 → 짐) — 앙파상·캐슬링·50수 규칙은 표에 없다
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TB_DIR   = os.path.join(BASE_DIR, 'tablebases')
+HEADER   = struct.Struct('<4s8sI') # 매직, 서명, 항목 수
+MAGIC    = b'CTB1'
+ILLEGAL  = 255
+MAX_DTM  = 253
+
+ORDER   = 'KQRBNP' # 서명 안 기물 순서
+LETTERS = {'king': 'K', 'queen': 'Q', 'rook': 'R', 'bishop': 'B', 'knight': 'N', 'pawn': 'P'}
+VALUES  = {LETTERS[p]: PIECE_VALUES[i] for i, p in enumerate(PTYPES)}
+
+_tables = {} # 서명 → 열린 Tablebase (없으면 None)
+
+
+def set_directory(path):
+    # 표 파일 위치를 바꾸고 열린 표를 모두 닫는다
+    global TB_DIR
+    TB_DIR = path
+    for table in _tables.values():
+        if table:
+            table.close()
+    _tables.clear()
+
+
+def split_signature(sig):
+    # 'KRKB' → ('KR', 'KB')
+    cut = sig.index('K', 1)
+    return sig[:cut], sig[cut:]
+
+
+def _strength(letters):
+    return sum(VALUES[l] for l in letters), len(letters)
+
+
+def is_dead_draw(sig):
+    # 킹끼리, 또는 한쪽에 나이트·비숍 하나뿐 → 메이트 불가
+    white, black = split_signature(sig)
+    extra = white[1:] + black[1:]
+    return extra in ('', 'B', 'N')
+
+
+def position_key(white, black, white_to_move):
+    # white/black: [(글자, sq)] (킹 포함) → (서명, 색인)
+    # 흑이 더 강하면 색을 바꾸고 위아래를 뒤집어 백이 강한 쪽이 되게 한다
+    if _strength([l for l, _ in black]) > _strength([l for l, _ in white]):
+        white, black = [(l, sq ^ 56) for l, sq in black], [(l, sq ^ 56) for l, sq in white]
+        white_to_move = not white_to_move
+    pieces = (sorted(white, key=lambda p: (ORDER.index(p[0]), p[1]))
+              + sorted(black, key=lambda p: (ORDER.index(p[0]), p[1])))
+    index = 0
+    for _, sq in pieces:
+        index = index * 64 + sq
+    sig = ''.join(l for l, _ in pieces[:len(white)]) + ''.join(l for l, _ in pieces[len(white):])
+    return sig, index * 2 + (0 if white_to_move else 1)
+
+
+def board_pieces(board):
+    # Board → ([(글자, sq)] 백, [(글자, sq)] 흑)
+    sides = ([], [])
+    for ci, color in enumerate(COLORS):
+        for (x, y), p in board.piece_lists[color].items():
+            sides[ci].append((LETTERS[p.ptype], y * 8 + x))
+    return sides
+
+
+# ─── 표 파일 ────────────────────────────────────────
+class Tablebase:
+    # 표 파일 하나를 mmap 으로 열어 두고 색인 → 값 바이트를 바로 읽는다
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, sig, self.count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f'테이블 파일이 아님: {path}')
+        self.signature = sig.rstrip(b'\0').decode()
+
+    def value(self, index):
+        return self.mm[HEADER.size + index]
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
+
+
+def table_path(sig):
+    return os.path.join(TB_DIR, sig + '.tb')
+
+
+def open_table(sig):
+    # 서명의 표 (파일이 없으면 None), 한 번 열면 계속 재사용
+    if sig not in _tables:
+        path = table_path(sig)
+        _tables[sig] = Tablebase(path) if os.path.exists(path) else None
+    return _tables[sig]
+
+
+def available():
+    # 디렉터리에 있는 표 서명 목록
+    if not os.path.isdir(TB_DIR):
+        return []
+    return sorted(name[:-3] for name in os.listdir(TB_DIR) if name.endswith('.tb'))
+
+
+def max_pieces():
+    # 조회할 수 있는 최대 기물 수 (표가 없으면 0)
+    return max((len(sig) for sig in available()), default=0)
+
+
+def decode(value):
+    # 값 바이트 → (wdl, dtm): wdl 1 이김 / 0 무승부 / -1 짐 (차례인 쪽 기준), dtm 반수
+    if value == ILLEGAL:
+        return None
+    if value == 0:
+        return 0, 0
+    dtm = value - 1
+    return (1 if dtm % 2 else -1), dtm
+
+
+# ─── 조회 ───────────────────────────────────────────
+def probe(board):
+    # Board → (wdl, dtm) 또는 None (표 없음 / 캐슬링 권한 / 앙파상 가능)
+    if board.castling_rights():
+        return None
+    white, black = board_pieces(board)
+    if board.ep_square is not None and any(l == 'P' for l, _ in white) and any(l == 'P' for l, _ in black):
+        return None
+    sig, index = position_key(white, black, board.white_to_move)
+    if is_dead_draw(sig):
+        return 0, 0
+    table = open_table(sig)
+    if table is None:
+        return None
+    return decode(table.value(index))
+
+
+def best_move(board):
+    # 표만으로 최선수: 이기면 가장 빠른 메이트, 지면 가장 오래 버티기
+    # → (move, wdl, dtm) 또는 None (표로 풀 수 없는 포지션)
+    color = 'white' if board.white_to_move else 'black'
+    best = None
+    for move in board.legal_moves(color):
+        board.make_move(*move)
+        hit = probe(board)
+        board.unmake_move()
+        if hit is None:
+            return None
+        wdl, dtm = -hit[0], hit[1] + 1
+        # 이김(빠를수록) > 무승부 > 짐(늦을수록)
+        rank = (wdl, -dtm if wdl > 0 else dtm if wdl < 0 else 0)
+        if best is None or rank > best[0]:
+            best = (rank, move, wdl, dtm if wdl else 0)
+    return best[1:] if best else None
+
+
+# ─── 생성 ───────────────────────────────────────────
+def _decode_index(index, n):
+    # 배치 색인 (차례 제외) → [sq, ...]
+    squares = [0] * n
+    for i in range(n - 1, -1, -1):
+        index, squares[i] = divmod(index, 64)
+    return squares
+
+
+def _valid_placement(squares, slots):
+    if len(set(squares)) != len(squares):
+        return False
+    for i, (letter, color) in enumerate(slots):
+        sq = squares[i]
+        if letter == 'P' and (sq < 8 or sq >= 56):
+            return False
+        # 같은 색·종류 기물은 칸 오름차순 배치만 쓴다 (나머지는 같은 포지션)
+        if i and slots[i - 1] == (letter, color) and squares[i - 1] > sq:
+            return False
+    return True
+
+
+def _external_value(sig, index, progress):
+    # 캡처·승격으로 다른 서명이 된 후속 포지션의 값 (필요하면 그 표부터 만든다)
+    if is_dead_draw(sig):
+        return 0
+    table = open_table(sig)
+    if table is None:
+        generate(sig, progress=progress)
+        _tables.pop(sig, None)
+        table = open_table(sig)
+    return table.value(index)
+
+
+def generate(sig, progress=print):
+    # sig 표를 만들어 TB_DIR/sig.tb 로 저장
+    # 1) 모든 배치 × 차례를 Board 규칙으로 펼쳐 후속 포지션을 모은다
+    # 2) 메이트에서 출발해 선행 포지션으로 거꾸로 전파 (반수 단위 층별)
+    from board import Board, FEN_PIECES
+
+    white_letters, black_letters = split_signature(sig)
+    if position_key([(l, 0) for l in white_letters], [(l, 0) for l in black_letters], True)[0] != sig:
+        raise ValueError(f'정규 서명이 아님 (백이 강한 쪽, 기물 순서 {ORDER}): {sig}')
+    slots = [(l, 'white') for l in white_letters] + [(l, 'black') for l in black_letters]
+    n = len(slots)
+    size = 2 * 64 ** n
+    start = time.perf_counter()
+    if progress:
+        progress(f'{sig}: {size} 포지션 펼치는 중')
+
+    values = bytearray(size)
+    remaining = array('H', bytes(2 * size)) # 아직 '상대 이김' 으로 확인되지 않은 후속 수
+    edges_src, edges_dst = array('I'), array('I')
+    external = {} # 반수 → [이 값의 외부 후속 포지션을 가진 포지션]
+    frontier = [] # 메이트 (0 반수 짐)
+
+    board = Board(setup=False, cache_size=16)
+    pieces = [FEN_PIECES[l.lower()](color) for l, color in slots]
+    placed = []
+    step = max(1, size // 20)
+    for placement in range(size // 2):
+        squares = _decode_index(placement, n)
+        if not _valid_placement(squares, slots):
+            values[2 * placement] = values[2 * placement + 1] = ILLEGAL
+            continue
+        for x, y in placed:
+            board.grid[y][x] = None
+        placed = [(sq % 8, sq // 8) for sq in squares]
+        for piece, (x, y) in zip(pieces, placed):
+            board.grid[y][x] = piece
+        owner = {sq: i for i, sq in enumerate(squares)}
+
+        for stm in (True, False):
+            index = 2 * placement + (0 if stm else 1)
+            board.white_to_move = stm
+            board._rebuild_indices()
+            color, other = ('white', 'black') if stm else ('black', 'white')
+            if board.is_in_check(other):
+                values[index] = ILLEGAL
+                continue
+            moves = board.legal_moves(color)
+            if not moves:
+                if board.is_in_check(color):
+                    values[index] = 1
+                    frontier.append(index)
+                continue
+            remaining[index] = len(moves)
+            for (fx, fy), (tx, ty), promo in moves:
+                mover = owner[fy * 8 + fx]
+                target = owner.get(ty * 8 + tx)
+                white, black = [], []
+                for i, (letter, pc) in enumerate(slots):
+                    if i == target:
+                        continue
+                    if i == mover:
+                        letter, sq = (LETTERS[promo] if promo else letter), ty * 8 + tx
+                    else:
+                        sq = squares[i]
+                    (white if pc == 'white' else black).append((letter, sq))
+                succ_sig, succ = position_key(white, black, not stm)
+                if succ_sig == sig:
+                    edges_src.append(index)
+                    edges_dst.append(succ)
+                    continue
+                value = _external_value(succ_sig, succ, progress)
+                if value:
+                    external.setdefault(value - 1, []).append(index)
+        if progress and (placement + 1) % step == 0:
+            progress(f'{sig}: {100 * (placement + 1) // (size // 2)}%  {time.perf_counter() - start:.1f}s')
+
+    # 선행 포지션 목록 (CSR): preds[offsets[q]:offsets[q+1]] = q 로 가는 수를 가진 포지션들
+    offsets = array('I', bytes(4 * (size + 1)))
+    for q in edges_dst:
+        offsets[q + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+    fill = array('I', offsets)
+    preds = array('I', bytes(4 * len(edges_dst)))
+    for p, q in zip(edges_src, edges_dst):
+        preds[fill[q]] = p
+        fill[q] += 1
+    del edges_src, edges_dst, fill
+
+    # 층 L 에서 값이 정해진 포지션 q → 선행 포지션 p 에 반영
+    #   q 가 L 반수에 짐(L 짝수) → p 는 L+1 에 이김
+    #   q 가 L 반수에 이김(L 홀수) → p 의 남은 후속 수 -1, 0 이 되면 p 는 L+1 에 짐
+    level = 0
+    last_external = max(external, default=-1)
+    while (frontier or level <= last_external) and level < MAX_DTM:
+        found = []
+        sources = [preds[offsets[q]:offsets[q + 1]] for q in frontier]
+        sources.append(external.get(level, ()))
+        for group in sources:
+            for p in group:
+                if values[p]:
+                    continue
+                if level % 2 == 0:
+                    values[p] = level + 2
+                    found.append(p)
+                else:
+                    remaining[p] -= 1
+                    if remaining[p] == 0:
+                        values[p] = level + 2
+                        found.append(p)
+        frontier = found
+        level += 1
+
+    os.makedirs(TB_DIR, exist_ok=True)
+    path = table_path(sig)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(HEADER.pack(MAGIC, sig.encode(), size))
+        f.write(values)
+    os.replace(path + '.tmp', path)
+    if progress:
+        wins = sum(1 for v in values if v and v != ILLEGAL and (v - 1) % 2)
+        longest = max((v - 1 for v in values if v and v != ILLEGAL), default=0)
+        progress(f'{sig}: 완료 {time.perf_counter() - start:.1f}s, 이기는 포지션 {wins}, '
+                 f'최장 메이트 {longest} 반수 → {path}')
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='후퇴 분석 엔드게임 테이블 만들기 / 조회')
+    parser.add_argument('--dir', default=None, help=f'표 디렉터리 (기본: {TB_DIR})')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_gen = sub.add_parser('generate', help='서명별 표 만들기 (예: KQK KRK KPK)')
+    p_gen.add_argument('signatures', nargs='+')
+    p_probe = sub.add_parser('probe', help='FEN 포지션 조회와 표 최선수')
+    p_probe.add_argument('fen')
+    args = parser.parse_args(argv)
+    if args.dir:
+        set_directory(args.dir)
+
+    if args.command == 'generate':
+        for sig in args.signatures:
+            generate(sig.upper())
+        return 0
+
+    from board import Board, move_name
+    board = Board.from_fen(args.fen)
+    hit = probe(board)
+    if hit is None:
+        print('표 없음')
+        return 1
+    wdl, dtm = hit
+    print({1: f'이김, {dtm} 반수 뒤 메이트', 0: '무승부', -1: f'짐, {dtm} 반수 뒤 메이트'}[wdl])
+    best = best_move(board)
+    if best:
+        print('최선수', move_name(best[0]))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,25 @@
+from board import Board, move_name
+from book import polyglot_key
+
+# Polyglot 명세에 실린 참조 키 (앙파상 열은 잡을 수 있을 때만 들어간다)
+KNOWN_KEYS = [
+    ([], 0x463B96181691FC9C),
+    (['e2e4'], 0x823C9B50FD114196),
+    (['e2e4', 'd7d5'], 0x0756B94461C50FB0),
+    (['e2e4', 'd7d5', 'e4e5'], 0x662FAFB965DB29D4),
+    (['e2e4', 'd7d5', 'e4e5', 'f7f5'], 0x22A48B5A8E47FF78),
+    (['e2e4', 'd7d5', 'e4e5', 'f7f5', 'e1e2'], 0x652A607CA3F242C1),
+    (['e2e4', 'd7d5', 'e4e5', 'f7f5', 'e1e2', 'e8f7'], 0x00FDD303C946BDD9),
+    (['a2a4', 'b7b5', 'h2h4', 'b5b4', 'c2c4'], 0x3C8123EA7B067637),
+    (['a2a4', 'b7b5', 'h2h4', 'b5b4', 'c2c4', 'b4c3', 'a1a3'], 0x5C3F9B829B279560),
+]
+
+
+def test_polyglot_known_keys():
+    for use_bitboards in (True, False):
+        for moves, key in KNOWN_KEYS:
+            board = Board(use_bitboards)
+            for text in moves:
+                move = next(m for m in board.move_table()[1] if move_name(m) == text)
+                board.make_move(*move)
+            assert polyglot_key(board) == key, (moves, hex(polyglot_key(board)))
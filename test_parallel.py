@@ -0,0 +1,16 @@
+from board import Board, move_name
+from engine import Engine
+from parallel import ParallelSearch
+
+# 1수 메이트 (Qxf7#) 와 깊이 3 까지 가는 Bxf7+ 가 다른 워커로 나뉘는 포지션
+SCHOLAR_FEN = 'r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5Q2/PPPP1PPP/RNB1K1NR w KQkq - 0 1'
+
+
+def test_parallel_prefers_shallow_mate():
+    board = Board.from_fen(SCHOLAR_FEN)
+    assert move_name(Engine().search(board.copy(), max_depth=3).move) == 'f3f7'
+    for workers in (2, 4):
+        with ParallelSearch(workers) as searcher:
+            result = searcher.search(board, max_depth=3)
+        assert move_name(result.move) == 'f3f7', workers
+        assert result.score >= 99000
@@ -0,0 +1,32 @@
+from pgn import iter_games, san_tokens
+
+EMPTY_THEN_GAME = b'''[Event "empty"]
+[Result "*"]
+
+[Event "second"]
+[Result "1-0"]
+
+1. e4 e5 2. Qh5 Nc6 3. Bc4 Nf6 4. Qxf7# 1-0
+'''
+
+HEADERLESS = b'''1. e4 e5 2. Nf3 *
+
+1. d4 d5
+2. c4 1/2-1/2
+
+1. c4 *
+'''
+
+
+def test_empty_movetext_game_keeps_its_own_headers():
+    games = list(iter_games(EMPTY_THEN_GAME))
+    assert [h['Event'] for h, _ in games] == ['empty', 'second']
+    assert games[0][1] == ''
+    assert games[1][0]['Result'] == '1-0'
+    assert san_tokens(games[1][1])[-1] == 'Qxf7#'
+
+
+def test_headerless_games_split_on_blank_lines():
+    games = list(iter_games(HEADERLESS))
+    assert [san_tokens(m) for _, m in games] == [['e4', 'e5', 'Nf3'], ['d4', 'd5', 'c4'], ['c4']]
+    assert all(h == {} for h, _ in games)
@@ -0,0 +1,248 @@
+import queue
+import sys
+import threading
+
+from board import Board, move_name
+from engine import Engine, TranspositionTable, format_info
+
+# ─── UCI 프로토콜 프런트엔드 ───────────────────────────
+# stdin 은 전용 스레드가 줄 단위로 queue 에 넣고, 명령 처리는 메인 스레드, 탐색은 탐색 스레드
+# → 탐색 중에도 stop·isready·ponderhit 에 바로 답한다 (pygame 을 임포트하지 않음)
+ENGINE_NAME   = 'Python Chess'
+ENGINE_AUTHOR = 'Sdubs99'
+
+# 시간 관리 (초)
+MOVE_OVERHEAD      = 0.05 # GUI·파이프 지연 몫으로 남겨 두는 시간
+DEFAULT_MOVES_TO_GO = 30 # movestogo 가 없을 때 남은 시간을 나눌 수
+MIN_TIME           = 0.01
+
+# Hash 옵션 (MB) → TT 크기, 파이썬 튜플 항목 하나를 대략 100바이트로 본다
+TT_ENTRY_BYTES = 100
+DEFAULT_HASH   = 32
+
+
+def allocate_time(remaining, increment=0.0, movestogo=None, overhead=MOVE_OVERHEAD):
+    # 한 수에 쓸 시간 한계 (초): 평균 몫(남은 시간 / 남은 수 + 증분 3/4)의 두 배
+    # 엔진은 한계의 절반이 지나면 다음 깊이를 시작하지 않으므로 보통 평균 몫 근처에서 끝난다
+    # 남은 시간의 절반은 넘기지 않는다
+    share = remaining / (movestogo or DEFAULT_MOVES_TO_GO) + increment * 0.75
+    limit = min(share * 2, (remaining - overhead) * 0.5)
+    return max(limit, MIN_TIME)
+
+
+def parse_move(board, text):
+    # UCI 수 'e7e8q' → 현재 포지션의 합법수 튜플 (합법이 아니면 None)
+    for move in board.move_table()[1]:
+        if move_name(move) == text:
+            return move
+    return None
+
+
+def hash_bits(megabytes):
+    return max(10, (megabytes * (1 << 20) // TT_ENTRY_BYTES).bit_length() - 1)
+
+
+class UCI:
+    def __init__(self, out=None):
+        self.out = out or sys.stdout
+        self.out_lock = threading.Lock() # 메인·탐색 스레드가 함께 쓴다
+        self.engine = Engine(hash_bits(DEFAULT_HASH))
+        self.board = Board()
+        self.base = 'startpos' # 현재 보드의 시작 포지션 ('startpos' 또는 FEN)
+        self.played = [] # base 이후 보드에 둔 수 (UCI 표기)
+        self.thread = None
+        self.release = threading.Event() # infinite·ponder 탐색은 stop/ponderhit 전까지 bestmove 를 보내지 않는다
+        self.pending_time = None # ponderhit 때 걸 시간 한계
+
+    def send(self, line):
+        with self.out_lock:
+            self.out.write(line + '\n')
+            self.out.flush()
+
+    # ─── 입력 루프 ──────────────────────────────────
+    def run(self, stream=None):
+        stream = stream or sys.stdin
+        lines = queue.Queue()
+
+        def reader():
+            for line in iter(stream.readline, ''):
+                lines.put(line)
+            lines.put(None) # EOF → quit
+
+        threading.Thread(target=reader, name='uci-stdin', daemon=True).start()
+        while True:
+            line = lines.get()
+            if line is None or not self.handle(line):
+                break
+        self.stop_search()
+
+    def handle(self, line):
+        # 명령 한 줄 처리, quit 이면 False
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        if command == 'quit':
+            return False
+        if command == 'uci':
+            self.send(f'id name {ENGINE_NAME}')
+            self.send(f'id author {ENGINE_AUTHOR}')
+            self.send(f'option name Hash type spin default {DEFAULT_HASH} min 1 max 4096')
+            self.send('option name Ponder type check default true')
+            self.send('uciok')
+        elif command == 'isready':
+            self.send('readyok')
+        elif command == 'setoption':
+            self.set_option(args)
+        elif command == 'ucinewgame':
+            self.stop_search()
+            self.engine.tt.clear()
+            self.set_position(['startpos'], force=True)
+        elif command == 'position':
+            self.stop_search()
+            self.set_position(args)
+        elif command == 'go':
+            self.go(args)
+        elif command == 'stop':
+            self.stop_search()
+        elif command == 'ponderhit':
+            self.ponderhit()
+        elif command == 'd':
+            self.send(self.board.to_fen())
+        else:
+            self.send(f'info string unknown command {command}')
+        return True
+
+    def set_option(self, args):
+        # setoption name <이름> [value <값>]
+        if 'name' not in args:
+            return
+        i = args.index('name') + 1
+        j = args.index('value') if 'value' in args else len(args)
+        name, value = ' '.join(args[i:j]).lower(), ' '.join(args[j + 1:])
+        if name == 'hash' and value.isdigit():
+            self.stop_search()
+            self.engine.tt = TranspositionTable(hash_bits(int(value)))
+
+    # ─── position ──────────────────────────────────
+    def set_position(self, args, force=False):
+        # position startpos|fen <FEN> [moves m1 m2 ...]
+        # 같은 시작 포지션이면 보드를 새로 만들지 않고 공통 접두 이후만 unmake/make
+        if 'moves' in args:
+            k = args.index('moves')
+            spec, moves = args[:k], args[k + 1:]
+        else:
+            spec, moves = args, []
+        if not spec:
+            return
+        base = 'startpos' if spec[0] == 'startpos' else ' '.join(spec[1:])
+        if force or base != self.base:
+            try:
+                board = Board() if base == 'startpos' else Board.from_fen(base)
+            except (ValueError, IndexError):
+                self.send(f'info string invalid fen {base}')
+                return
+            self.board, self.base, self.played = board, base, []
+        common = 0
+        limit = min(len(moves), len(self.played))
+        while common < limit and moves[common] == self.played[common]:
+            common += 1
+        while len(self.played) > common:
+            self.board.unmake_move()
+            self.played.pop()
+        for text in moves[common:]:
+            move = parse_move(self.board, text)
+            if move is None:
+                self.send(f'info string illegal move {text}')
+                break
+            self.board.make_move(*move)
+            self.played.append(text)
+
+    # ─── go / stop / ponderhit ────────────────────────
+    def go(self, args):
+        self.stop_search()
+        opts = {}
+        searchmoves = None
+        i = 0
+        while i < len(args):
+            key = args[i]
+            if key in ('infinite', 'ponder'):
+                opts[key] = True
+                i += 1
+            elif key == 'searchmoves':
+                searchmoves = []
+                i += 1
+                while i < len(args):
+                    move = parse_move(self.board, args[i])
+                    if move is None:
+                        break
+                    searchmoves.append(move)
+                    i += 1
+            elif i + 1 < len(args) and args[i + 1].lstrip('-').isdigit():
+                opts[key] = int(args[i + 1])
+                i += 2
+            else:
+                i += 1
+
+        if 'movetime' in opts:
+            time_limit = max(opts['movetime'] / 1000 - MOVE_OVERHEAD, MIN_TIME)
+        else:
+            side = 'w' if self.board.white_to_move else 'b'
+            remaining = opts.get(side + 'time')
+            time_limit = None if remaining is None else allocate_time(
+                remaining / 1000, opts.get(side + 'inc', 0) / 1000, opts.get('movestogo'))
+        hold = opts.get('infinite') or opts.get('ponder')
+        # ponder: 시간은 ponderhit 부터 센다
+        self.pending_time = time_limit if opts.get('ponder') else None
+        if hold:
+            time_limit = None
+            self.release.clear()
+        else:
+            self.release.set()
+
+        self.engine.stop_requested = False
+        args = (self.board.copy(), opts.get('depth', 64), time_limit, opts.get('nodes'), searchmoves)
+        self.thread = threading.Thread(target=self._search, args=args, name='uci-search', daemon=True)
+        self.thread.start()
+
+    def _search(self, board, depth, time_limit, nodes, searchmoves):
+        result = self.engine.search(board, depth, time_limit, nodes,
+                                    on_iteration=lambda info: self.send(format_info(info)),
+                                    moves=searchmoves)
+        if result.depth == 0 and result.infos:
+            # 엔드게임 표에서 바로 고른 수는 반복 콜백 없이 info 하나만 남긴다
+            self.send(format_info(result.infos[-1]))
+        # infinite·ponder 는 탐색이 일찍 끝나도 stop/ponderhit 을 기다린다
+        self.release.wait()
+        if result.move is None:
+            self.send('bestmove 0000')
+        elif len(result.pv) > 1 and result.pv[0] == result.move:
+            self.send(f'bestmove {move_name(result.move)} ponder {move_name(result.pv[1])}')
+        else:
+            self.send(f'bestmove {move_name(result.move)}')
+
+    def stop_search(self):
+        if self.thread is not None and self.thread.is_alive():
+            self.engine.stop()
+            self.release.set()
+            self.thread.join()
+        self.thread = None
+
+    def ponderhit(self):
+        # 예측이 맞음: 폰더링하던 탐색을 그대로 이어가며 지금부터 시간 한계를 건다
+        if self.pending_time is not None:
+            self.engine.ponderhit(self.pending_time)
+            self.pending_time = None
+            self.release.set()
+        else:
+            # 시간 정보 없이 폰더링했으면 바로 결과를 낸다
+            self.stop_search()
+
+
+def main(argv=None):
+    UCI().run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+import random
+from collections import OrderedDict
+
+# ─── Zobrist 키 ─────────────────────────────────────
+# 고정 시드 → 프로세스가 달라도 같은 포지션은 같은 해시
+_rng = random.Random(0x5EED_C4E55)
+
+# PIECE_KEYS[색][종류][sq] (색·종류 인덱스는 bitboard.COLOR_INDEX / PTYPE_INDEX)
+PIECE_KEYS  = [[[_rng.getrandbits(64) for _ in range(64)] for _ in range(6)] for _ in range(2)]
+SIDE_KEY    = _rng.getrandbits(64) # 흑 차례일 때 XOR
+CASTLE_KEYS = [_rng.getrandbits(64) for _ in range(16)] # 캐슬링 권한 4비트 조합
+EP_KEYS     = [_rng.getrandbits(64) for _ in range(8)] # 앙파상 파일
+
+# 캐슬링 권한 비트
+CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ = 1, 2, 4, 8
+
+
+class PositionCache:
+    # 해시 → 값 을 담는 크기 제한 LRU 캐시
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.data    = OrderedDict()
+        self.hits    = 0
+        self.misses  = 0
+
+    def get(self, key):
+        value = self.data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.maxsize:
+            self.data.popitem(last=False) # 가장 오래 안 쓴 항목 제거
+
+    def clear(self):
+        self.data.clear()